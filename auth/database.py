@@ -3,6 +3,7 @@ from typing import Optional
 import uuid
 from auth.security import get_password_hash, verify_password
 from auth.models import UserCreate, User
+from config import config
 
 class UserDatabase:
     def __init__(self, db_url: str):
@@ -11,7 +12,11 @@ class UserDatabase:
 
     async def initialize(self):
         """Initialize database connection pool and create tables"""
-        self.pool = await asyncpg.create_pool(self.db_url)
+        self.pool = await asyncpg.create_pool(
+            self.db_url,
+            min_size=config.database.POOL_MIN_SIZE,
+            max_size=config.database.POOL_MAX_SIZE,
+        )
 
         # Create users table if it doesn't exist
         async with self.pool.acquire() as conn:
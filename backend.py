@@ -1,25 +1,50 @@
-import logging
+import asyncio
+import os
+import uuid
 import uvicorn
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends, status
-from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
-from invitation_agent.agent import invitation_agent
-
-from shared.model import EmailModel, InvitationInfo, ChatRequest, ChatResponse, UserContext, SessionInfo, SessionListResponse, ChatMessage, ChatHistoryResponse
-from utils.logger import setup_logger
-from utils.utils import call_agent_async
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from invitation_agent.draft_cache import draft_cache
+
+from shared.model import EmailModel, WhatsAppModel, InvitationInfo, ChatRequest, ChatResponse, JobResponse, UserContext, SessionInfo, SessionListResponse, ChatMessage, ChatHistoryResponse, RsvpRecipient, RsvpResponse
+from utils.logger import log_context, setup_logger
+from utils.utils import call_agent_async, run_until_disconnected, ClientDisconnected
+from utils.scheduler import TurnScheduler, SchedulerBusy
+from utils.invalidation import invalidator
+from utils.readiness import Readiness
+from utils.tracing import setup_tracing, shutdown_tracing, traced, tracer
+from utils.metrics import MetricsDatabase, TurnMetrics, registry
 from auth.models import UserCreate, UserLogin, Token, User
 from auth.database import UserDatabase
 from auth.security import create_access_token
 from auth.dependencies import get_current_user
+from rsvp.callbacks import set_invitation_recorder
+from rsvp.classifier import ReplyClassifier
+from rsvp.database import RsvpDatabase
+from rsvp.models import STATUSES, WHATSAPP, EMAIL
+from rsvp.sources import WhatsAppReplySource, EmailReplySource
+from rsvp.tracker import RsvpTracker
+from jobs.database import JobDatabase
+from jobs.worker import JobWorkerPool
+from jobs.webhooks import WebhookRejected, resolve_webhook
 from datetime import timedelta, datetime
+from typing import Optional
 from config import config
 
-logger = setup_logger(__name__, logging.DEBUG)
+logger = setup_logger(__name__)
 
-session_service = DatabaseSessionService(db_url=config.DB_URL)
+# Created per process in lifespan; engines and connections must not be shared across forked workers
+session_service = None
 user_db = UserDatabase(db_url=config.DB_URL)
+rsvp_db = RsvpDatabase()
+metrics_db = MetricsDatabase()
+job_db = JobDatabase()
+turn_scheduler = TurnScheduler(
+    max_concurrent=config.backend.MAX_CONCURRENT_TURNS,
+    max_per_user=config.backend.MAX_TURNS_PER_USER,
+    max_queued=config.backend.MAX_QUEUED_TURNS,
+)
 
 APP_NAME = config.APP_NAME
 
@@ -27,37 +52,205 @@ def create_initial_state(user_context: UserContext) -> dict:
     """Create initial state with user context"""
     invitation_info_init = InvitationInfo()
     email_init = EmailModel()
+    whatsapp_init = WhatsAppModel()
 
     return {
         "user_context": user_context.model_dump(),
         "invitation_info": invitation_info_init.model_dump(),
         "email": email_init.model_dump(),
+        "whatsapp": whatsapp_init.model_dump(),
     }
 
+def create_rsvp_tracker() -> RsvpTracker:
+    """Create the RSVP tracker with every reply source that is configured"""
+    sources = {}
+    if os.path.isfile(config.rsvp.MESSAGES_DB_PATH):
+        sources[WHATSAPP] = WhatsAppReplySource(config.rsvp.MESSAGES_DB_PATH)
+    if config.email.EMAIL_HOST_USER and config.email.EMAIL_HOST_PASSWORD:
+        sources[EMAIL] = EmailReplySource(
+            config.rsvp.IMAP_SERVER,
+            config.rsvp.IMAP_PORT,
+            config.email.EMAIL_HOST_USER,
+            config.email.EMAIL_HOST_PASSWORD,
+        )
+
+    return RsvpTracker(rsvp_db, ReplyClassifier(model=config.rsvp.MODEL), sources)
+
+def create_context_cache_config():
+    """Context caching for the static agent instructions, or None when disabled"""
+    from google.adk.agents.context_cache_config import ContextCacheConfig
+
+    if not config.agent.CONTEXT_CACHE_ENABLED:
+        return None
+    return ContextCacheConfig(
+        cache_intervals=config.agent.CONTEXT_CACHE_INTERVALS,
+        ttl_seconds=config.agent.CONTEXT_CACHE_TTL_SECONDS,
+        min_tokens=config.agent.CONTEXT_CACHE_MIN_TOKENS,
+    )
+
+def create_runner():
+    """Build the agents and their runner.
+
+    google-adk, google-genai and the agent modules take seconds to import,
+    so they are loaded here, in each worker's lifespan, rather than when
+    this module is imported.
+    """
+    from google.adk.apps import App as AgentApp
+    from google.adk.runners import Runner
+    from invitation_agent.agent import invitation_agent
+
+    return Runner(
+        app=AgentApp(
+            name=APP_NAME,
+            root_agent=invitation_agent,
+            context_cache_config=create_context_cache_config(),
+        ),
+        session_service=session_service,
+    )
+
 # Store runner globally
 runner = None
+rsvp_tracker = None
+fast_path = None
+job_workers = None
+whatsapp_mcp_pool = None
+warm_up_task = None
+readiness = Readiness()
+
+async def warm_database():
+    """Open and check the pool's idle connections"""
+    async def ping():
+        async with user_db.pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+
+    await asyncio.gather(*(ping() for _ in range(config.database.POOL_MIN_SIZE)))
+
+async def warm_session_service():
+    """Create the session service, its tables and first connection"""
+    global session_service
+
+    def create():
+        from google.adk.sessions import DatabaseSessionService
+        return DatabaseSessionService(db_url=config.DB_URL)
+
+    # Importing ADK and creating the schema block, so keep them off the event loop
+    session_service = await asyncio.to_thread(create)
+    await session_service.list_sessions(app_name=APP_NAME, user_id="__warm_up__")
+
+async def warm_agents():
+    """Build the runner and fast path, then start taking chat turns and jobs"""
+    global runner, fast_path, job_workers
+    from utils.fast_path import FastPathRouter
+
+    agent_runner = await asyncio.to_thread(create_runner)
+    # Structured commands (reset, show, resend, sessions) skip the model
+    fast_path = FastPathRouter(session_service, APP_NAME, fetch_user_sessions)
+    runner = agent_runner
+
+    # Chat jobs queued with /chat?async=true
+    if config.jobs.WORKERS > 0:
+        job_workers = JobWorkerPool(
+            job_db,
+            run_job,
+            workers=config.jobs.WORKERS,
+            poll_interval=config.jobs.POLL_SECONDS,
+            stale_after=2 * config.jobs.TIMEOUT_SECONDS,
+            webhook_timeout=config.jobs.WEBHOOK_TIMEOUT_SECONDS,
+            webhook_secret=config.jobs.WEBHOOK_SECRET,
+            webhook_allowed_hosts=config.jobs.WEBHOOK_ALLOWED_HOSTS,
+        )
+        await job_workers.start()
+        logger.info(f"Started {config.jobs.WORKERS} chat job worker(s)")
+
+async def warm_whatsapp_mcp():
+    """Open WhatsApp MCP sessions now so delegations skip the handshake and tool discovery"""
+    global whatsapp_mcp_pool
+    from invitation_agent.sub_agents.whatsapp_agent.agent import whatsapp_mcp_pool
+
+    await whatsapp_mcp_pool.start()
+    await whatsapp_mcp_pool.list_tools()
+
+async def warm_model():
+    """Send a one-token request so DNS, TLS and credentials are ready for the first turn"""
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client()
+    await client.aio.models.generate_content(
+        model=config.agent.DEFAULT_MODEL,
+        contents="ping",
+        config=types.GenerateContentConfig(max_output_tokens=1),
+    )
+
+async def warm_up():
+    """Warm every dependency in order; /ready reports the results"""
+    timeout = config.backend.WARM_UP_TIMEOUT_SECONDS
+    if await readiness.check("database", warm_database, timeout=timeout):
+        if await readiness.check("session_service", warm_session_service, timeout=timeout):
+            await readiness.check("agents", warm_agents, timeout=timeout)
+    await readiness.check("whatsapp_mcp", warm_whatsapp_mcp, required=False, timeout=timeout)
+    if config.backend.WARM_UP_MODEL:
+        await readiness.check("model", warm_model, required=False, timeout=timeout)
+    readiness.done = True
+    logger.info(f"Warm-up finished: {readiness.report()['status']}")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize runner and user database
-    global runner
+    # Startup: Initialize user database, then warm up the agents in the background
+    global rsvp_tracker, warm_up_task
     logger.info("Starting invite-agent application")
 
+    # Fail at startup rather than on the first email
+    config.email.validate()
+
+    # Per process, since the span exporter thread does not survive a fork
+    setup_tracing()
+
+    logger.info(f"Initializing worker process {os.getpid()}")
+
     # Initialize user database
     await user_db.initialize()
     logger.info("User database initialized")
 
-    runner = Runner(
-        agent=invitation_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-    )
+    # Other workers drop in-memory cache entries that this one replaces
+    await invalidator.initialize(config.DB_URL, user_db.pool)
+    await turn_scheduler.initialize(config.DB_URL)
+
+    # Per-session token and latency accounting
+    await metrics_db.initialize(user_db.pool)
+
+    # Drafts of identical invitations are shared across sessions and workers
+    await draft_cache.initialize(user_db.pool)
+
+    # Initialize RSVP tracking; agents report sent invitations to the tracker
+    await rsvp_db.initialize(user_db.pool)
+    rsvp_tracker = create_rsvp_tracker()
+    set_invitation_recorder(rsvp_tracker.record_invitations)
+    if config.rsvp.ENABLED:
+        rsvp_tracker.start(config.rsvp.SCAN_INTERVAL_SECONDS)
+        logger.info(f"RSVP tracking started for: {', '.join(rsvp_tracker.sources) or 'no sources'}")
+
+    await job_db.initialize(user_db.pool)
+
+    # Serve /health right away; /ready answers 503 until the warm-up is done
+    warm_up_task = asyncio.create_task(warm_up())
 
     yield
 
     # Shutdown
     logger.info("Shutting down invite-agent application")
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+        await asyncio.gather(warm_up_task, return_exceptions=True)
+    if job_workers:
+        await job_workers.stop()
+    await rsvp_tracker.stop()
+    if whatsapp_mcp_pool:
+        await whatsapp_mcp_pool.close()
+    await invalidator.close()
+    await turn_scheduler.close()
     await user_db.close()
+    shutdown_tracing()
 
 app = FastAPI(title="Invitation Assistant API", lifespan=lifespan)
 
@@ -152,38 +345,122 @@ async def get_current_user_info(current_user: str = Depends(get_current_user)):
             detail=f"Error fetching user info: {str(e)}"
         )
 
+async def run_turn(user_id: str, session_id: str, message: str, bypass_cache: bool = False,
+                   request: Optional[Request] = None, timeout: float = config.backend.CHAT_TIMEOUT_SECONDS) -> Optional[str]:
+    """Run one chat turn, cancelled when `request` disconnects or after `timeout` seconds"""
+    turn_metrics = TurnMetrics(session_id=session_id, user_id=user_id)
+
+    async def turn():
+        # One turn per session at a time, within the per-user and global limits
+        async with turn_scheduler.slot(user_id, session_id):
+            # Answer structured commands directly, without a model call
+            fast_response = await fast_path.handle(
+                user_id=user_id,
+                session_id=session_id,
+                message=message
+            )
+            if fast_response is not None:
+                return fast_response
+
+            # Call agent
+            with draft_cache.bypass(bypass_cache):
+                return await call_agent_async(
+                    runner=runner,
+                    user_id=user_id,
+                    session_id=session_id,
+                    query=message,
+                    metrics=turn_metrics
+                )
+
+    # Records logged during the turn carry its session and user
+    with log_context(session_id=session_id, user_id=user_id):
+        try:
+            return await run_until_disconnected(
+                turn(),
+                request,
+                timeout=timeout,
+                poll_interval=config.backend.DISCONNECT_POLL_SECONDS,
+            )
+        finally:
+            await metrics_db.save(turn_metrics)
+
+async def run_job(job: dict) -> str:
+    """Run a queued chat job; used by the job workers"""
+    try:
+        response = await run_turn(
+            user_id=job['user_id'],
+            session_id=job['session_id'],
+            message=job['message'],
+            bypass_cache=job['bypass_cache'],
+            timeout=config.jobs.TIMEOUT_SECONDS,
+        )
+    except SchedulerBusy:
+        raise RuntimeError("The assistant was busy, please try again")
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"The turn did not finish within {config.jobs.TIMEOUT_SECONDS:g} seconds")
+    return response if response else "No response from agent"
+
+def job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        job_id=job['id'],
+        session_id=job['session_id'],
+        status=job['status'],
+        response=job['response'],
+        error=job['error'],
+        created_at=job['created_at'],
+        finished_at=job['finished_at'],
+    )
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, current_user: str = Depends(get_current_user)):
+@traced("POST /chat")
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    async_mode: bool = Query(False, alias="async"),
+    current_user: str = Depends(get_current_user)
+):
     """
     Chat endpoint to interact with the invitation agent (protected)
     Requires authentication token
+
+    With ?async=true the turn is queued as a job and 202 is returned with
+    the job id; poll /jobs/{job_id} or pass webhook_url for the result.
     """
     if not runner:
-        raise HTTPException(status_code=503, detail="Service not initialized")
+        raise HTTPException(status_code=503, detail="Service is starting up, please try again shortly")
 
     try:
         # Use authenticated username as user_id
         user_id = current_user
 
         # Get user information from database
-        user_data = await user_db.get_user_by_username(user_id)
+        with tracer.start_as_current_span("db.get_user"):
+            user_data = await user_db.get_user_by_username(user_id)
         if not user_data:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
 
+        # Refuse webhooks aimed at internal services before queueing anything
+        if async_mode and request.webhook_url:
+            try:
+                await resolve_webhook(str(request.webhook_url), config.jobs.WEBHOOK_ALLOWED_HOSTS)
+            except WebhookRejected as e:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
         # Determine session: use provided session_id or create new
         session_id = request.session_id
 
         if session_id:
             # Verify session exists
             try:
-                await session_service.get_session(
-                    app_name=APP_NAME,
-                    user_id=user_id,
-                    session_id=session_id
-                )
+                with tracer.start_as_current_span("session.get"):
+                    await session_service.get_session(
+                        app_name=APP_NAME,
+                        user_id=user_id,
+                        session_id=session_id
+                    )
                 logger.info(f"Using session: {session_id} for user: {user_id}")
             except:
                 # Invalid session, create new
@@ -200,21 +477,57 @@ async def chat(request: ChatRequest, current_user: str = Depends(get_current_use
 
             # Create new session with user context in state
             initial_state = create_initial_state(user_context)
-            new_session = await session_service.create_session(
-                app_name=APP_NAME,
-                user_id=user_id,
-                state=initial_state,
-            )
+            with tracer.start_as_current_span("session.create"):
+                new_session = await session_service.create_session(
+                    app_name=APP_NAME,
+                    user_id=user_id,
+                    state=initial_state,
+                )
             session_id = new_session.id
             logger.info(f"Created session: {session_id} for user: {user_id}")
 
-        # Call agent
-        response = await call_agent_async(
-            runner=runner,
-            user_id=user_id,
-            session_id=session_id,
-            query=request.message
-        )
+        if async_mode:
+            # Answer right away; a job worker runs the turn
+            job = await job_db.create(
+                job_id=str(uuid.uuid4()),
+                user_id=user_id,
+                session_id=session_id,
+                message=request.message,
+                bypass_cache=request.bypass_cache,
+                webhook_url=str(request.webhook_url) if request.webhook_url else None,
+            )
+            if job_workers:
+                job_workers.notify()
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=job_response(job).model_dump(mode="json"),
+                headers={"Location": f"/jobs/{job['id']}"},
+            )
+
+        try:
+            response = await run_turn(
+                user_id=user_id,
+                session_id=session_id,
+                message=request.message,
+                bypass_cache=request.bypass_cache,
+                request=http_request,
+                timeout=config.backend.CHAT_TIMEOUT_SECONDS,
+            )
+        except SchedulerBusy:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="The assistant is busy. Please try again shortly."
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Agent turn timed out for session {session_id}")
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="The assistant took too long to respond. Please try again."
+            )
+        except ClientDisconnected:
+            # Nobody is waiting for the response anymore
+            logger.info(f"Client disconnected, cancelled agent turn for session {session_id}")
+            raise HTTPException(status_code=499, detail="Client closed request")
 
         return ChatResponse(
             response=response if response else "No response from agent",
@@ -226,6 +539,82 @@ async def chat(request: ChatRequest, current_user: str = Depends(get_current_use
         logger.error(f"Error processing chat request: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, current_user: str = Depends(get_current_user)):
+    """
+    Get the status and result of a chat job (protected)
+    """
+    try:
+        job = await job_db.get(job_id, current_user)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching job: {str(e)}")
+
+async def fetch_user_sessions(user_id: str) -> list[SessionInfo]:
+    """Load session summaries for a user, most recently updated first"""
+    # Query sessions directly from the database using user_db connection
+    async with user_db.pool.acquire() as conn:
+        # First, check what columns exist in the sessions table
+        try:
+            rows = await conn.fetch('''
+                SELECT id, create_time, update_time, state
+                FROM sessions
+                WHERE app_name = $1 AND user_id = $2
+                ORDER BY update_time DESC
+            ''', APP_NAME, user_id)
+        except Exception as e:
+            # If timestamp columns don't exist, try without them
+            logger.warning(f"Timestamp columns not found, trying alternative query: {str(e)}")
+            rows = await conn.fetch('''
+                SELECT id, state
+                FROM sessions
+                WHERE app_name = $1 AND user_id = $2
+                ORDER BY id DESC
+            ''', APP_NAME, user_id)
+
+        sessions = []
+        for row in rows:
+            # Try to extract preview from state
+            preview = None
+
+            if row['state']:
+                # State might be a JSON string or dict
+                state = row['state']
+
+                # If state is a string, parse it as JSON
+                if isinstance(state, str):
+                    import json
+                    try:
+                        state = json.loads(state)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse state as JSON: {state}")
+                        state = None
+
+                if state and isinstance(state, dict):
+                    invitation_info = state.get('invitation_info', {})
+                    if invitation_info and invitation_info.get('agenda_name'):
+                        preview = invitation_info.get('agenda_name')
+
+            created_at = row.get('create_time', datetime.now())
+            updated_at = row.get('update_time', datetime.now())
+
+            sessions.append(SessionInfo(
+                session_id=row['id'],
+                created_at=created_at,
+                updated_at=updated_at,
+                preview=preview
+            ))
+
+        return sessions
+
 @app.get("/sessions", response_model=SessionListResponse)
 async def get_user_sessions(current_user: str = Depends(get_current_user)):
     """
@@ -235,61 +624,9 @@ async def get_user_sessions(current_user: str = Depends(get_current_user)):
         raise HTTPException(status_code=503, detail="Database not initialized")
 
     try:
-        # Query sessions directly from the database using user_db connection
-        async with user_db.pool.acquire() as conn:
-            # First, check what columns exist in the sessions table
-            try:
-                rows = await conn.fetch('''
-                    SELECT id, create_time, update_time, state
-                    FROM sessions
-                    WHERE app_name = $1 AND user_id = $2
-                    ORDER BY update_time DESC
-                ''', APP_NAME, current_user)
-            except Exception as e:
-                # If timestamp columns don't exist, try without them
-                logger.warning(f"Timestamp columns not found, trying alternative query: {str(e)}")
-                rows = await conn.fetch('''
-                    SELECT id, state
-                    FROM sessions
-                    WHERE app_name = $1 AND user_id = $2
-                    ORDER BY id DESC
-                ''', APP_NAME, current_user)
-
-            sessions = []
-            for row in rows:
-                # Try to extract preview from state
-                preview = None
-
-                if row['state']:
-                    # State might be a JSON string or dict
-                    state = row['state']
-
-                    # If state is a string, parse it as JSON
-                    if isinstance(state, str):
-                        import json
-                        try:
-                            state = json.loads(state)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse state as JSON: {state}")
-                            state = None
-
-                    if state and isinstance(state, dict):
-                        invitation_info = state.get('invitation_info', {})
-                        if invitation_info and invitation_info.get('agenda_name'):
-                            preview = invitation_info.get('agenda_name')
-                
-                created_at = row.get('create_time', datetime.now())
-                updated_at = row.get('update_time', datetime.now())
-
-                sessions.append(SessionInfo(
-                    session_id=row['id'],
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    preview=preview
-                ))
-
-            logger.info(f"Retrieved {len(sessions)} sessions for user: {current_user}")
-            return SessionListResponse(sessions=sessions)
+        sessions = await fetch_user_sessions(current_user)
+        logger.info(f"Retrieved {len(sessions)} sessions for user: {current_user}")
+        return SessionListResponse(sessions=sessions)
 
     except Exception as e:
         logger.error(f"Error fetching sessions: {str(e)}")
@@ -378,6 +715,43 @@ async def get_session_history(session_id: str, current_user: str = Depends(get_c
             detail=f"Error fetching chat history: {str(e)}"
         )
 
+@app.get("/sessions/{session_id}/rsvp", response_model=RsvpResponse)
+async def get_session_rsvp(session_id: str, current_user: str = Depends(get_current_user)):
+    """
+    Get RSVP status of every invitation recipient in a session
+    """
+    if not user_db or not user_db.pool:
+        raise HTTPException(status_code=503, detail="Database not initialized")
+
+    try:
+        async with user_db.pool.acquire() as conn:
+            # Verify the session belongs to the user
+            session = await conn.fetchrow('''
+                SELECT id FROM sessions
+                WHERE id = $1 AND app_name = $2 AND user_id = $3
+            ''', session_id, APP_NAME, current_user)
+
+            if not session:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Session not found or access denied"
+                )
+
+        counts = {status: 0 for status in STATUSES}
+        counts.update(await rsvp_db.get_counts(session_id))
+        recipients = [RsvpRecipient(**row) for row in await rsvp_db.get_recipients(session_id)]
+
+        return RsvpResponse(session_id=session_id, counts=counts, recipients=recipients)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching RSVP status: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching RSVP status: {str(e)}"
+        )
+
 @app.delete("/sessions/{session_id}")
 async def delete_session(session_id: str, current_user: str = Depends(get_current_user)):
     """
@@ -407,6 +781,9 @@ async def delete_session(session_id: str, current_user: str = Depends(get_curren
                 WHERE id = $1 AND app_name = $2 AND user_id = $3
             ''', session_id, APP_NAME, current_user)
 
+            await rsvp_db.delete_session(session_id)
+            await metrics_db.delete_session(session_id)
+
             logger.info(f"Deleted session {session_id} for user: {current_user}")
             return {"message": "Session deleted successfully", "session_id": session_id}
 
@@ -426,5 +803,25 @@ async def health():
     """
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness check: 200 once the database, session service and agents are
+    warmed up, 503 before that. Reports the warm-up latency of each dependency.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=readiness.report(),
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Agent, tool and turn latency (p50/p95) and token usage in Prometheus text format.
+    The numbers are those of the worker process that answers the request.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
-    uvicorn.run("backend:app", host=config.backend.HOST, port=config.backend.PORT)
\ No newline at end of file
+    # Each worker process imports this module and runs lifespan on its own
+    uvicorn.run("backend:app", host=config.backend.HOST, port=config.backend.PORT, workers=config.backend.WORKERS)
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Compare prompt tokens and first-token latency with the state injected into
+the system instruction against the static/dynamic split served from the
+context cache.
+
+Runs a scripted conversation against the root agent with FakeLlm, so no API
+key is needed. Each turn updates invitation_info and then answers. In the
+inline setup every state change alters the system instruction and
+invalidates the cached prefix.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_context_cache.py --turns 8
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from fake_llm import FakeLlm
+from invitation_agent.agent import invitation_agent, STATIC_INSTRUCTION, INSTRUCTION
+from shared.model import UserContext, InvitationInfo, EmailModel
+from utils.prompt import instruction_with_state
+
+FIELDS = [
+    ("agenda_name", "Rapat Koordinasi Q4"),
+    ("scheduled_at", "2025-11-14 10:00"),
+    ("location", "Ruang Meeting Lt. 3"),
+    ("recipients", ["Andi", "Sari", "Dewi"]),
+    ("tone", "formal"),
+    ("notes", "Mohon membawa laporan kuartal"),
+]
+
+
+def script(turns: int) -> list:
+    """One update_invitation_info call and one answer per turn"""
+    responses = []
+    info = {}
+    for turn in range(turns):
+        field, value = FIELDS[turn % len(FIELDS)]
+        info = {**info, field: value}
+        responses.append({"name": "update_invitation_info", "args": {"invitation_info": info}})
+        responses.append(f"Noted the {field.replace('_', ' ')}. Anything else?")
+    return responses
+
+
+async def run(name: str, agent, cache_config, turns: int) -> dict:
+    runner = Runner(
+        app=App(name="bench", root_agent=agent, context_cache_config=cache_config),
+        session_service=InMemorySessionService(),
+    )
+    session = await runner.session_service.create_session(
+        app_name="bench",
+        user_id="bench",
+        state={
+            "user_context": UserContext(username="budi", full_name="Budi Santoso", user_id="1").model_dump(),
+            "invitation_info": InvitationInfo().model_dump(),
+            "email": EmailModel().model_dump(),
+        },
+    )
+
+    turn_times = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        message = types.Content(role="user", parts=[types.Part(text=f"Detail number {turn + 1}")])
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+        turn_times.append(time.perf_counter() - started)
+
+    calls = agent.model.calls
+    prompt = sum(c["prompt"] for c in calls)
+    cached = sum(c["cached"] for c in calls)
+    return {
+        "name": name,
+        "calls": len(calls),
+        "prompt": prompt,
+        "cached": cached,
+        "uncached": prompt - cached,
+        "latency": sum(c["latency"] for c in calls) / len(calls),
+        "turn": sum(turn_times) / len(turn_times),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    # min_tokens=0: the fake has no cache size floor; Gemini requires at least 1024 tokens
+    cache_config = ContextCacheConfig(min_tokens=0)
+    inline = instruction_with_state(STATIC_INSTRUCTION + INSTRUCTION)
+
+    setups = [
+        ("inline, no cache", {"static_instruction": None, "instruction": inline}, None),
+        ("inline, cache", {"static_instruction": None, "instruction": inline}, cache_config),
+        ("split, cache", {}, cache_config),
+    ]
+
+    print(f"{'setup':<17} {'calls':>5} {'prompt':>8} {'cached':>8} {'uncached':>8} {'ttft ms':>8} {'turn ms':>8}")
+    for name, update, config in setups:
+        agent = invitation_agent.clone(update={**update, "model": FakeLlm(script=script(args.turns))})
+        result = await run(name, agent, config, args.turns)
+        print(
+            f"{result['name']:<17} {result['calls']:>5} {result['prompt']:>8} {result['cached']:>8} "
+            f"{result['uncached']:>8} {result['latency'] * 1000:>8.1f} {result['turn'] * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,360 @@
+"""
+End-to-end benchmark of backend.app with every external service faked.
+
+The backend runs in this process behind an ASGI transport. ScenarioLlm
+stands in for Gemini in every agent, SmtpSink receives the emails of
+send_mail and BridgeStub answers the bridge's /api/send and /api/download.
+The WhatsApp MCP server runs as usual, on a synthetic messages.db made by
+generate_history.py. Nothing leaves the machine and no API key is needed.
+
+Each user runs a full invitation in a new session per round: create it,
+write the email, write the WhatsApp message, then send both. Then each
+user lists its sessions and reads their history, and every read-only MCP
+tool plus send_message and download_media is called directly. Throughput
+and p50/p99 latency are printed per endpoint and tool.
+
+--save writes the results to a JSON file. --compare fails (exit status 1)
+when a p50 or p99 latency grew, or the throughput fell, by more than
+--tolerance against such a file.
+
+Speculative drafts and RSVP classification call Gemini outside the agents,
+so they are switched off. Requires PostgreSQL (DB_URL) like the backend.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_e2e.py --users 16 --rounds 3
+    PYTHONPATH=. python benchmarks/bench_e2e.py --save baseline.json
+    PYTHONPATH=. python benchmarks/bench_e2e.py --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+MCP_SERVER = os.path.join(ROOT, "whatsapp-mcp", "whatsapp-mcp-server")
+
+sys.path.insert(0, BENCHMARKS)
+sys.path.insert(0, os.path.join(MCP_SERVER, "benchmarks"))
+
+from fakes import BridgeStub, SmtpSink
+from generate_history import generate, phone_number
+from load_test import login, percentile
+
+# One invitation per round; ScenarioLlm picks its tool calls from these words
+SCENARIO = [
+    "Create an invitation for Rapat Koordinasi Q4 {round}",
+    "Write the email invitation to guest{user}@example.com",
+    "Write the whatsapp invitation to {phone}",
+    "Yes, send it",
+]
+
+
+class Stats:
+    """Latencies and errors per endpoint or tool, and the wall time of the phase of the same name"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.wall: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float, ok: bool = True):
+        self.latencies.setdefault(name, [])
+        self.errors.setdefault(name, 0)
+        if ok:
+            self.latencies[name].append(seconds)
+        else:
+            self.errors[name] += 1
+
+    def results(self) -> dict:
+        results = {}
+        for name, latencies in self.latencies.items():
+            wall = self.wall.get(name, 0.0)
+            results[name] = {
+                "count": len(latencies),
+                "errors": self.errors[name],
+                "rps": len(latencies) / wall if wall else 0.0,
+                "p50": statistics.median(latencies) if latencies else 0.0,
+                "p99": percentile(latencies, 0.99),
+            }
+        return results
+
+
+async def timed(stats: Stats, name: str, request) -> httpx.Response:
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        stats.record(name, 0.0, ok=False)
+        return None
+    stats.record(name, time.perf_counter() - start, ok=response.status_code == 200)
+    return response
+
+
+async def run_user(client: httpx.AsyncClient, stats: Stats, user: int, token: str, rounds: int) -> list[str]:
+    headers = {"Authorization": f"Bearer {token}"}
+    sessions = []
+    for round in range(rounds):
+        session_id = None
+        for message in SCENARIO:
+            text = message.format(round=round, user=user, phone=phone_number(user))
+            response = await timed(stats, "POST /chat", client.post(
+                "/chat", json={"message": text, "session_id": session_id}, headers=headers,
+            ))
+            if response is not None and response.status_code == 200:
+                session_id = response.json()["session_id"]
+        if session_id:
+            sessions.append(session_id)
+    return sessions
+
+
+async def run_reads(client: httpx.AsyncClient, stats: Stats, token: str, sessions: list[str], reads: int, path: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(reads):
+        if path == "/sessions":
+            await timed(stats, "GET /sessions", client.get("/sessions", headers=headers))
+        elif sessions:
+            session_id = sessions[i % len(sessions)]
+            await timed(stats, "GET /sessions/{id}/history", client.get(f"/sessions/{session_id}/history", headers=headers))
+
+
+async def phase(stats: Stats, name: str, coroutines):
+    start = time.perf_counter()
+    results = await asyncio.gather(*coroutines)
+    stats.wall[name] = time.perf_counter() - start
+    return results
+
+
+def mcp_calls(db_path: str, rng: random.Random) -> dict:
+    """Arguments for each MCP tool, sampled from the synthetic history"""
+    conn = sqlite3.connect(db_path)
+    try:
+        chats = [row[0] for row in conn.execute("SELECT jid FROM chats ORDER BY RANDOM() LIMIT 100")]
+        messages = conn.execute("SELECT id, chat_jid FROM messages ORDER BY RANDOM() LIMIT 100").fetchall()
+        media = conn.execute("SELECT id, chat_jid FROM messages WHERE media_type IS NOT NULL LIMIT 100").fetchall()
+    finally:
+        conn.close()
+
+    direct = [jid for jid in chats if jid.endswith("@s.whatsapp.net")] or chats
+    calls = {
+        "search_contacts": lambda: {"query": phone_number(rng.randrange(100))[:9]},
+        "list_chats": lambda: {"query": None, "limit": 20},
+        "list_messages": lambda: {"query": rng.choice(["meeting", "party", "lunch"]), "limit": 20},
+        "get_chat": lambda: {"chat_jid": rng.choice(chats)},
+        "get_direct_chat_by_contact": lambda: {"sender_phone_number": rng.choice(direct).split("@")[0]},
+        "get_contact_chats": lambda: {"jid": rng.choice(direct)},
+        "get_last_interaction": lambda: {"jid": rng.choice(direct)},
+        "get_message_context": lambda: {"message_id": rng.choice(messages)[0]},
+        "get_new_messages": lambda: {"after_rowid": 0, "limit": 100},
+        "send_message": lambda: {"recipient": rng.choice(direct).split("@")[0], "message": "Benchmark invitation"},
+    }
+    if media:
+        calls["download_media"] = lambda: dict(zip(("message_id", "chat_jid"), rng.choice(media)))
+    return calls
+
+
+async def run_mcp(pool, stats: Stats, db_path: str, calls_per_tool: int, concurrency: int, seed: int):
+    calls = mcp_calls(db_path, random.Random(seed))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(name: str):
+        async with semaphore:
+            session = await pool.create_session()
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(name, arguments=calls[name]())
+                ok = not result.isError
+            except Exception:
+                ok = False
+            stats.record(f"mcp {name}", time.perf_counter() - start, ok=ok)
+
+    for name in calls:
+        await phase(stats, f"mcp {name}", [call(name) for _ in range(calls_per_tool)])
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Nothing is listening on port {port}")
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        response = await client.get("/ready")
+        if response.status_code == 200:
+            return
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Backend did not become ready: {response.json()}")
+
+
+def use_model(agent, llm):
+    """Make `llm` the model of `agent` and all its sub-agents"""
+    agent.model = llm
+    for sub_agent in agent.sub_agents:
+        use_model(sub_agent, llm)
+
+
+async def run_backend(args, smtp: SmtpSink, bridge: BridgeStub, db_path: str) -> tuple[Stats, dict]:
+    # The backend reads its configuration when it is imported
+    import backend
+    from fake_llm import ScenarioLlm
+    from invitation_agent.agent import invitation_agent
+
+    llm = ScenarioLlm(base_latency=args.model_latency)
+    use_model(invitation_agent, llm)
+
+    stats = Stats()
+    transport = httpx.ASGITransport(app=backend.app)
+    async with backend.app.router.lifespan_context(backend.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=120) as client:
+            await wait_until_ready(client)
+
+            prefix = uuid.uuid4().hex[:6]
+            tokens = await asyncio.gather(*(login(client, f"bench_{prefix}_{i}") for i in range(args.users)))
+
+            sessions = await phase(stats, "POST /chat", [
+                run_user(client, stats, user, token, args.rounds) for user, token in enumerate(tokens)
+            ])
+            await phase(stats, "GET /sessions", [
+                run_reads(client, stats, token, [], args.reads, "/sessions") for token in tokens
+            ])
+            await phase(stats, "GET /sessions/{id}/history", [
+                run_reads(client, stats, token, user_sessions, args.reads, "history")
+                for token, user_sessions in zip(tokens, sessions)
+            ])
+
+        await run_mcp(backend.whatsapp_mcp_pool, stats, db_path, args.mcp_calls, args.mcp_concurrency, args.seed)
+
+    totals = {
+        "model_calls": len(llm.calls),
+        "prompt_tokens": sum(call["prompt"] for call in llm.calls),
+        "emails_sent": smtp.messages,
+        "whatsapp_sent": bridge.requests["/api/send"],
+        "media_downloaded": bridge.requests["/api/download"],
+    }
+    return stats, totals
+
+
+def print_results(results: dict, totals: dict):
+    print(f"{'endpoint':<40} {'count':>7} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['count']:>7} {result['errors']:>7} {result['rps']:>9.1f} "
+              f"{result['p50'] * 1000:>9.1f} {result['p99'] * 1000:>9.1f}")
+    print()
+    print(", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in totals.items()))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of more than `tolerance` (a fraction) against the baseline results"""
+    regressions = []
+    for name, before in baseline.items():
+        after = results.get(name)
+        if after is None:
+            continue
+        for metric in ("p50", "p99"):
+            if before[metric] and after[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric] * 1000:.1f} -> {after[metric] * 1000:.1f} ms")
+        if before["rps"] and after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {before['rps']:.1f} -> {after['rps']:.1f} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=2, help="Invitations per user, one session each")
+    parser.add_argument("--reads", type=int, default=10, help="GET /sessions and history requests per user")
+    parser.add_argument("--mcp-calls", type=int, default=50, help="Calls per MCP tool")
+    parser.add_argument("--mcp-concurrency", type=int, default=8)
+    parser.add_argument("--mcp-port", type=int, default=8000, help="Port the WhatsApp MCP server listens on")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Base seconds per fake model call")
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(workdir.name, "messages.db")
+    generate(db_path, contacts=args.contacts, groups=args.groups, messages=args.messages, seed=args.seed)
+
+    smtp = SmtpSink()
+    bridge = BridgeStub()
+    smtp.start()
+    bridge.start()
+
+    mcp_env = {
+        **os.environ,
+        "MESSAGES_DB_PATH": db_path,
+        "WHATSAPP_BRIDGE_URL": bridge.url,
+        "MEDIA_CACHE_DIR": os.path.join(workdir.name, "media-cache"),
+    }
+    mcp_server = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=MCP_SERVER, env=mcp_env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    os.environ.update({
+        "AGENT_MODEL": "fake-gemini",
+        "AGENT_LITE_MODEL": "fake-gemini",
+        "SPECULATIVE_DRAFTS_ENABLED": "false",
+        "RSVP_ENABLED": "false",
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp.port),
+        "WHATSAPP_MCP_URL": f"http://127.0.0.1:{args.mcp_port}/sse",
+        "MESSAGES_DB_PATH": db_path,
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+    os.environ.setdefault("EMAIL_HOST_USER", "bench@example.com")
+    os.environ.setdefault("EMAIL_HOST_PASSWORD", "bench")
+
+    try:
+        wait_for_port(args.mcp_port)
+        stats, totals = asyncio.run(run_backend(args, smtp, bridge, db_path))
+    finally:
+        mcp_server.terminate()
+        mcp_server.wait(timeout=30)
+        smtp.stop()
+        bridge.stop()
+        workdir.cleanup()
+
+    results = stats.results()
+    print_results(results, totals)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"results": results, "totals": totals}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
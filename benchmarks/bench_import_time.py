@@ -0,0 +1,94 @@
+"""
+Import-time profile of the backend and a check against a startup target.
+
+Runs `python -X importtime -c "import backend"` in fresh interpreters and
+reports the median wall time, the median of the cumulative import time and
+the slowest top-level packages. The agents (google-adk, google-genai, MCP)
+are imported in each worker's lifespan, so they are profiled separately
+and not counted against the target.
+
+Exits with status 1 when the median import of backend exceeds --target.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_import_time.py --runs 5 --target 1.5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str) -> tuple[float, dict[str, int], dict[str, int]]:
+    """Import `module` in a new interpreter; returns wall seconds, self and cumulative µs per module"""
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    self_us, cumulative_us = defaultdict(int), {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us[match.group(4)] += int(match.group(1))
+            cumulative_us[match.group(4)] = int(match.group(2))
+    return wall, self_us, cumulative_us
+
+
+def by_package(self_us: dict[str, int]) -> list[tuple[str, int]]:
+    packages = defaultdict(int)
+    for module, us in self_us.items():
+        packages[module.split(".")[0]] += us
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def report(module: str, runs: int, top: int) -> float:
+    walls, totals, last = [], [], {}
+    for _ in range(runs):
+        wall, self_us, cumulative_us = profile(module)
+        walls.append(wall)
+        totals.append(cumulative_us.get(module, 0) / 1e6)
+        last = self_us
+
+    wall = statistics.median(walls)
+    print(f"import {module}: {wall:.3f} s wall, {statistics.median(totals):.3f} s importing (median of {runs})")
+    for package, us in by_package(last)[:top]:
+        print(f"  {package:<32} {us / 1000:>9.1f} ms")
+    return wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level packages to list")
+    parser.add_argument("--target", type=float, default=1.5, help="Maximum median seconds for import backend")
+    args = parser.parse_args()
+
+    # Only needed so importing the agents does not fail on missing settings
+    os.environ.setdefault("EMAIL_HOST_USER", "bench@example.com")
+    os.environ.setdefault("EMAIL_HOST_PASSWORD", "bench")
+
+    wall = report("backend", args.runs, args.top)
+    print()
+    report("invitation_agent.agent", args.runs, args.top)
+    print()
+
+    if wall > args.target:
+        print(f"FAIL: import backend took {wall:.3f} s, target is {args.target:.3f} s")
+        sys.exit(1)
+    print(f"OK: import backend took {wall:.3f} s, target is {args.target:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
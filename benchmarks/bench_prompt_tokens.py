@@ -0,0 +1,107 @@
+"""
+Measure instruction tokens per turn with ADK's default state injection
+(str() of each state dict) against the compact state serializer.
+
+Only the instruction differs between the two, so the conversation history is
+left out. The instruction is resent on every model call of a turn, including
+each tool-call iteration, so per-turn tokens are instruction tokens times the
+number of model calls.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_prompt_tokens.py
+"""
+import argparse
+import re
+
+from invitation_agent import agent as invitation
+from invitation_agent.sub_agents.email_agent import agent as email
+from invitation_agent.sub_agents.whatsapp_agent import agent as whatsapp
+from shared.model import UserContext, InvitationInfo, EmailModel, WhatsAppModel
+from utils.prompt import STATE_PATTERN, render_instruction
+
+# Static guidelines and the state section, as the model receives them
+INSTRUCTIONS = {
+    "invitation_agent": invitation.STATIC_INSTRUCTION + invitation.INSTRUCTION,
+    "email_agent": email.STATIC_INSTRUCTION + email.INSTRUCTION,
+    "whatsapp_agent": whatsapp.STATIC_INSTRUCTION + whatsapp.INSTRUCTION,
+}
+
+USER_CONTEXT = UserContext(username="budi", full_name="Budi Santoso", user_id="42").model_dump()
+
+INFO_PARTIAL = InvitationInfo(agenda_name="Rapat Koordinasi Q4", scheduled_at="2025-11-14 10:00").model_dump()
+
+INFO_FULL = InvitationInfo(
+    agenda_name="Rapat Koordinasi Q4",
+    location="Ruang Meeting Lt. 3",
+    scheduled_at="2025-11-14 10:00",
+    recipients=["Andi", "Sari", "Dewi"],
+    tone="formal",
+).model_dump()
+
+EMAIL_DRAFT = EmailModel(
+    subject="Undangan Rapat Koordinasi Q4",
+    body="Yth. Bapak/Ibu,\n\nDengan hormat, kami mengundang Anda untuk menghadiri Rapat Koordinasi Q4.\n\n"
+         "Agenda: Rapat Koordinasi Q4\nLokasi: Ruang Meeting Lt. 3\nTanggal: 14 November 2025\nWaktu: 10:00\n\n"
+         "Atas perhatiannya kami ucapkan terima kasih.\n\nHormat kami,\nBudi Santoso",
+    email_recipients=["andi@example.com", "sari@example.com", "dewi@example.com"],
+).model_dump()
+
+WHATSAPP_DRAFT = WhatsAppModel(
+    message="Halo, kami mengundang Anda ke Rapat Koordinasi Q4 pada 14 November 2025 pukul 10:00 "
+            "di Ruang Meeting Lt. 3. Mohon konfirmasi kehadiran Anda. Terima kasih, Budi Santoso",
+    recipients=["6281234567890", "6281298765432", "6281311122233"],
+).model_dump()
+
+# (agent, invitation_info, email, whatsapp, model calls in the turn) for a typical invitation
+SCENARIO = [
+    ("invitation_agent", InvitationInfo().model_dump(), EmailModel().model_dump(), WhatsAppModel().model_dump(), 1),
+    ("invitation_agent", INFO_PARTIAL, EmailModel().model_dump(), WhatsAppModel().model_dump(), 3),
+    ("invitation_agent", INFO_FULL, EmailModel().model_dump(), WhatsAppModel().model_dump(), 2),
+    ("invitation_agent", INFO_FULL, EmailModel().model_dump(), WhatsAppModel().model_dump(), 2),
+    ("email_agent", INFO_FULL, EmailModel().model_dump(), WhatsAppModel().model_dump(), 3),
+    ("email_agent", INFO_FULL, EMAIL_DRAFT, WhatsAppModel().model_dump(), 3),
+    ("whatsapp_agent", INFO_FULL, EMAIL_DRAFT, WhatsAppModel().model_dump(), 3),
+    ("whatsapp_agent", INFO_FULL, EMAIL_DRAFT, WHATSAPP_DRAFT, 3),
+]
+
+
+def render_default(template: str, state: dict) -> str:
+    """ADK's default injection: str() of the state value"""
+    return STATE_PATTERN.sub(lambda m: str(state[m.group(1)]), template)
+
+
+def token_counter(model: str):
+    """Count with the local Gemini tokenizer if sentencepiece is installed, else estimate"""
+    try:
+        from google.genai.local_tokenizer import LocalTokenizer
+        tokenizer = LocalTokenizer(model_name=model)
+        return lambda text: tokenizer.count_tokens(text).total_tokens, "gemini tokenizer"
+    except Exception:
+        return lambda text: (len(text) + 3) // 4, "estimate: 4 characters per token"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    args = parser.parse_args()
+
+    count, method = token_counter(args.model)
+    print(f"Token counting: {method}\n")
+    print(f"{'turn':>4}  {'agent':<17} {'calls':>5} {'default':>8} {'compact':>8} {'saved':>6}")
+
+    totals = [0, 0]
+    for turn, (agent, invitation_info, email, whatsapp, calls) in enumerate(SCENARIO, 1):
+        state = {"user_context": USER_CONTEXT, "invitation_info": invitation_info, "email": email, "whatsapp": whatsapp}
+        template = INSTRUCTIONS[agent]
+        before = count(render_default(template, state)) * calls
+        after = count(render_instruction(template, state)) * calls
+        totals[0] += before
+        totals[1] += after
+        print(f"{turn:>4}  {agent:<17} {calls:>5} {before:>8} {after:>8} {1 - after / before:>6.1%}")
+
+    print(f"\n{'total':>4}  {'':<17} {'':>5} {totals[0]:>8} {totals[1]:>8} {1 - totals[1] / totals[0]:>6.1%}")
+    print(f"per turn average: {totals[0] / len(SCENARIO):.0f} -> {totals[1] / len(SCENARIO):.0f} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Local stand-in for Gemini used by the benchmarks.
+
+FakeLlm answers from a script instead of calling the API. Its token counts and
+latency follow what Gemini's explicit context caching would bill. With
+cache_config set on the request, a cached prefix is reused while the system
+instruction, tools and first N contents are unchanged. The prefix is chosen
+the same way ADK does: everything before the last batch of user contents.
+Latency is a base delay plus a per-token cost for uncached prompt tokens.
+
+ScenarioLlm answers from the request instead of a script, so it can stand in
+for every agent of the backend at once (see bench_e2e.py).
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import AsyncGenerator, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+
+def count_tokens(text: str) -> int:
+    """Rough Gemini token count: 4 characters per token"""
+    return (len(text) + 3) // 4
+
+
+def content_text(content: types.Content) -> str:
+    return json.dumps(content.model_dump(exclude_none=True, mode="json"), sort_keys=True)
+
+
+class FakeLlm(BaseLlm):
+    """Scripted model with simulated explicit context caching"""
+
+    model: str = "fake-gemini"
+    script: list[Union[str, dict]] = Field(default_factory=list)
+    """Responses in call order: text, or {"name": ..., "args": ...} for a function call"""
+    base_latency: float = 0.02
+    latency_per_token: float = 0.00002
+    calls: list[dict] = Field(default_factory=list)
+    """Token accounting of every call: prompt, cached, candidates, latency"""
+
+    _caches: dict = PrivateAttr(default_factory=dict)
+    _position: int = PrivateAttr(default=0)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        config = llm_request.config
+        system = str(config.system_instruction or "") if config else ""
+        tools = json.dumps([t.model_dump(exclude_none=True, mode="json") for t in (config.tools or [])], sort_keys=True) if config else ""
+        contents = [content_text(c) for c in llm_request.contents]
+
+        prompt_tokens = count_tokens(system) + count_tokens(tools) + sum(count_tokens(c) for c in contents)
+        cached_tokens = self._cached_tokens(llm_request, system, tools, contents)
+
+        latency = self.base_latency + (prompt_tokens - cached_tokens) * self.latency_per_token
+        await asyncio.sleep(latency)
+
+        part = self._next_part(llm_request)
+        candidates_tokens = count_tokens(content_text(types.Content(role="model", parts=[part])))
+        self.calls.append({
+            "prompt": prompt_tokens,
+            "cached": cached_tokens,
+            "candidates": candidates_tokens,
+            "latency": latency,
+        })
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                cached_content_token_count=cached_tokens or None,
+                candidates_token_count=candidates_tokens,
+                total_token_count=prompt_tokens + candidates_tokens,
+            ),
+        )
+
+    def _next_part(self, llm_request: LlmRequest) -> types.Part:
+        if self._position >= len(self.script):
+            return types.Part(text="OK")
+        item = self.script[self._position]
+        self._position += 1
+        if isinstance(item, dict):
+            return types.Part(function_call=types.FunctionCall(name=item["name"], args=item.get("args", {})))
+        return types.Part(text=item)
+
+    def _cached_tokens(self, llm_request: LlmRequest, system: str, tools: str, contents: list[str]) -> int:
+        cache_config = llm_request.cache_config
+        if not cache_config:
+            return 0
+
+        now = time.monotonic()
+        for key, cache in list(self._caches.items()):
+            if now > cache["expires"] or cache["uses"] >= cache_config.cache_intervals:
+                del self._caches[key]
+                continue
+            count = cache["count"]
+            if count <= len(contents) and self._fingerprint(system, tools, contents[:count]) == cache["fingerprint"]:
+                cache["uses"] += 1
+                return cache["tokens"]
+
+        # Cache everything before the last continuous batch of user contents
+        count = len(llm_request.contents)
+        while count > 0 and llm_request.contents[count - 1].role == "user":
+            count -= 1
+        tokens = count_tokens(system) + count_tokens(tools) + sum(count_tokens(c) for c in contents[:count])
+        if tokens >= cache_config.min_tokens:
+            fingerprint = self._fingerprint(system, tools, contents[:count])
+            self._caches[fingerprint] = {
+                "count": count,
+                "fingerprint": fingerprint,
+                "tokens": tokens,
+                "uses": 0,
+                "expires": now + cache_config.ttl_seconds,
+            }
+        return 0
+
+    @staticmethod
+    def _fingerprint(system: str, tools: str, contents: list[str]) -> str:
+        digest = hashlib.sha256(system.encode())
+        digest.update(tools.encode())
+        for content in contents:
+            digest.update(content.encode())
+        return digest.hexdigest()
+
+
+# Tool calls per user intent, in order, and the agent owning each tool
+PLANS = {
+    "send": ["send_invitations"],
+    "whatsapp": ["search_contacts", "update_whatsapp_state"],
+    "email": ["update_email_state"],
+    "create": ["update_invitation_info"],
+}
+# The agents' dynamic instructions are sent as user content starting with this
+INSTRUCTION_HEADER = "Here is the current user information"
+OWNERS = {
+    "send_invitations": "invitation_agent",
+    "update_invitation_info": "invitation_agent",
+    "update_email_state": "email_agent",
+    "search_contacts": "whatsapp_agent",
+    "update_whatsapp_state": "whatsapp_agent",
+}
+
+
+class ScenarioLlm(FakeLlm):
+    """Deterministic model for the invitation agents that needs no script.
+
+    The intent of the latest user message ("send", "whatsapp", "email",
+    anything else creates an invitation) picks a list of tool calls. Each
+    request answers with the next call of that list not yet answered in this
+    turn, transferring to the owning agent when the tool belongs to another
+    agent, and with a short text once every call has a response. The answer
+    depends only on the request, so one instance may serve any number of
+    concurrent sessions.
+
+    Assign one instance as the model of every agent to count all calls.
+    """
+
+    def _next_part(self, llm_request: LlmRequest) -> types.Part:
+        tools = {
+            declaration.name
+            for tool in ((llm_request.config.tools if llm_request.config else None) or [])
+            for declaration in (tool.function_declarations or [])
+        }
+        message, answered = self._current_turn(llm_request.contents)
+        intent = next((word for word in ("send", "whatsapp", "email") if word in message.lower()), "create")
+
+        for name in PLANS[intent]:
+            if name in answered:
+                continue
+            if name in tools:
+                return types.Part(function_call=types.FunctionCall(name=name, args=self._args(name, message)))
+            if "transfer_to_agent" in tools and "transfer_to_agent" not in answered:
+                return types.Part(function_call=types.FunctionCall(
+                    name="transfer_to_agent", args={"agent_name": OWNERS[name]}
+                ))
+            break
+        return types.Part(text=f"Done ({intent}): {', '.join(sorted(answered)) or 'nothing to do'}.")
+
+    @staticmethod
+    def _current_turn(contents: list[types.Content]) -> tuple[str, set[str]]:
+        """The latest user message and the tools this agent got responses from since"""
+        answered = set()
+        for content in reversed(contents):
+            parts = content.parts or []
+            responses = [part.function_response.name for part in parts if part.function_response]
+            if responses:
+                answered.update(responses)
+                continue
+            texts = [part.text.strip() for part in parts if part.text]
+            # Events of other agents are passed as user content starting with "For context:"
+            if content.role == "user" and texts and texts[0] != "For context:" and not texts[0].startswith(INSTRUCTION_HEADER):
+                return " ".join(texts), answered
+        return "", answered
+
+    @staticmethod
+    def _args(name: str, message: str) -> dict:
+        emails = re.findall(r"[\w.+-]+@[\w-]+\.[\w.]+", message)
+        phones = re.findall(r"\b\d{8,15}\b", message)
+        if name == "update_invitation_info":
+            return {"invitation_info": {
+                "agenda_name": message[:60],
+                "location": "Ruang Meeting Lt. 3",
+                "scheduled_at": "2025-11-14 10:00",
+                "recipients": ["Andi", "Sari"],
+                "tone": "formal",
+            }}
+        if name == "update_email_state":
+            return {"email": {
+                "subject": "Undangan Rapat Koordinasi",
+                "body": "Dengan hormat, kami mengundang Anda ke rapat koordinasi. " * 8,
+                "email_recipients": emails,
+                "confirmed": True,
+            }}
+        if name == "search_contacts":
+            return {"query": phones[0] if phones else "Contact"}
+        if name == "update_whatsapp_state":
+            return {"whatsapp": {
+                "message": "Halo, Anda diundang ke rapat koordinasi besok pukul 10.00.",
+                "recipients": phones,
+                "confirmed": True,
+            }}
+        return {}
@@ -0,0 +1,167 @@
+"""
+Local stand-ins for the services the backend sends invitations through.
+
+SmtpSink accepts mail the way smtp.gmail.com does for send_mail (EHLO,
+STARTTLS, AUTH, MAIL, RCPT, DATA) and only counts the messages. BridgeStub
+answers the WhatsApp bridge's /api/send and /api/download like a connected
+bridge would. Both run in background threads so they do not compete with
+the backend for its event loop.
+"""
+import datetime
+import json
+import os
+import socketserver
+import ssl
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def self_signed_context(directory: str) -> ssl.SSLContext:
+    """Server TLS context with a throwaway certificate for localhost"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, "smtp-sink.pem")
+    with open(cert_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path)
+    return context
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        tls = False
+        self.reply("220 smtp-sink ready")
+        while line := self.rfile.readline():
+            verb = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                # smtplib uses the last line as the end of the reply
+                self.reply("250-smtp-sink")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 SIZE 35882577" if tls else "250 STARTTLS")
+            elif verb == "STARTTLS":
+                self.reply("220 Ready to start TLS")
+                self.connection = sink.ssl_context.wrap_socket(self.connection, server_side=True)
+                self.rfile = self.connection.makefile("rb")
+                self.wfile = self.connection.makefile("wb", buffering=0)
+                tls = True
+            elif verb == "AUTH":
+                self.reply("235 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    size += len(data)
+                sink.received(size)
+                self.reply("250 Queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SmtpSink:
+    """SMTP server on localhost that accepts and discards every message"""
+
+    def __init__(self, port: int = 0):
+        self._directory = tempfile.TemporaryDirectory()
+        self.ssl_context = self_signed_context(self._directory.name)
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", port), _SmtpHandler)
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.port = self.server.server_address[1]
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def received(self, size: int):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._directory.cleanup()
+
+
+class _BridgeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server.stub
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub.requests[self.path] += 1
+
+        if self.path == "/api/send":
+            body = {"success": True, "message": f"Message sent to {payload.get('recipient')}"}
+        elif self.path == "/api/download":
+            path = os.path.join(stub.media_dir, f"{payload.get('message_id', 'media')}.jpg")
+            with open(path, "wb") as f:
+                f.write(stub.media)
+            body = {"success": True, "message": "Downloaded image", "filename": os.path.basename(path), "path": path}
+        else:
+            self.send_error(404)
+            return
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BridgeStub:
+    """The WhatsApp bridge REST API on localhost, with every send succeeding"""
+
+    def __init__(self, port: int = 0, media_size: int = 64 * 1024):
+        self._directory = tempfile.TemporaryDirectory()
+        self.media_dir = self._directory.name
+        self.media = os.urandom(media_size)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _BridgeHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.requests = Counter()
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._directory.cleanup()
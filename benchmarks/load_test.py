@@ -0,0 +1,146 @@
+"""
+Load test of /chat against 1, 2, 4 and 8 backend worker processes.
+
+For each worker count the backend is started with BACKEND_WORKERS set, a
+pool of users is registered and each user sends chat messages in a closed
+loop for a fixed duration. Throughput, latency percentiles and the speedup
+over one worker are printed per worker count.
+
+The default message is the "show" fast-path command. It authenticates,
+loads the session and writes two events, so it exercises the web tier,
+the session store and PostgreSQL without spending model quota. Pass
+--message with a normal sentence to include agent turns.
+
+Requires PostgreSQL (DB_URL) like the backend itself.
+
+Usage:
+    PYTHONPATH=. python benchmarks/load_test.py --workers 1 2 4 8 --users 64 --duration 30
+    PYTHONPATH=. python benchmarks/load_test.py --url http://localhost:8001 --users 64   # running backend
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend.py")
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def login(client: httpx.AsyncClient, username: str) -> str:
+    password = "load-test-password"
+    await client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "full_name": f"Load Test {username}",
+        "password": password,
+    })
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def user_loop(client: httpx.AsyncClient, token: str, message: str, deadline: float,
+                    latencies: list[float], errors: list[int]):
+    headers = {"Authorization": f"Bearer {token}"}
+    session_id = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post("/chat", json={"message": message, "session_id": session_id}, headers=headers)
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        if response.status_code != 200:
+            errors.append(response.status_code)
+            continue
+        latencies.append(time.perf_counter() - start)
+        session_id = response.json()["session_id"]
+
+
+async def run_load(url: str, users: int, duration: float, message: str) -> dict:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        prefix = uuid.uuid4().hex[:6]
+        tokens = await asyncio.gather(*(login(client, f"load_{prefix}_{i}") for i in range(users)))
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(user_loop(client, t, message, deadline, latencies, errors) for t in tokens))
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": percentile(latencies, 0.95),
+    }
+
+
+async def wait_until_healthy(url: str, timeout: float = 60):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Backend at {url} did not become healthy")
+
+
+async def run_with_workers(workers: int, port: int, args) -> dict:
+    env = {**os.environ, "BACKEND_WORKERS": str(workers), "BACKEND_PORT": str(port), "BACKEND_HOST": "127.0.0.1"}
+    process = subprocess.Popen([sys.executable, BACKEND], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_until_healthy(url)
+        # Let every worker finish its lifespan startup before measuring
+        await asyncio.sleep(2)
+        return await run_load(url, args.users, args.duration, args.message)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def print_row(label: str, result: dict, baseline: float):
+    speedup = result["rps"] / baseline if baseline else 0.0
+    print(f"{label:>8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+          f"{result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} {speedup:>8.2f}x")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--url", help="Test an already running backend instead of starting one")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--message", default="show")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>9}")
+    if args.url:
+        print_row("-", await run_load(args.url, args.users, args.duration, args.message), 0)
+        return
+
+    baseline = 0.0
+    for workers in args.workers:
+        result = await run_with_workers(workers, args.port, args)
+        baseline = baseline or result["rps"] / workers
+        print_row(str(workers), result, baseline)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
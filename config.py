@@ -23,6 +23,11 @@ else:
 class DatabaseConfig:
     """Database configuration settings"""
     DB_URL: str = os.getenv("DB_URL", "postgresql://localhost:5432/invitation_agent")
+    # asyncpg pool per backend process; each process also keeps up to
+    # MAX_CONCURRENT_TURNS connections for session locks, so size
+    # max_connections for WORKERS times (POOL_MAX_SIZE + MAX_CONCURRENT_TURNS)
+    POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
 
 
 class EmailConfig:
@@ -53,6 +58,23 @@ class BackendConfig:
     APP_NAME: str = os.getenv("APP_NAME", "Invitation Assistant")
     HOST: str = os.getenv("BACKEND_HOST", "0.0.0.0")
     PORT: int = int(os.getenv("BACKEND_PORT", "8001"))
+    # Backend processes; each initializes its own runner, pools and MCP connections
+    WORKERS: int = int(os.getenv("BACKEND_WORKERS", "1"))
+    # Startup warm-up reported by /ready; each dependency gets this long
+    WARM_UP_TIMEOUT_SECONDS: float = float(os.getenv("WARM_UP_TIMEOUT_SECONDS", "60"))
+    # Also send a one-token model request during warm-up (billed)
+    WARM_UP_MODEL: bool = os.getenv("WARM_UP_MODEL", "false").lower() == "true"
+    # Deadline of one agent turn; keep it below the frontend's 60 s request timeout
+    CHAT_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_TIMEOUT_SECONDS", "55"))
+    # How often a running turn checks whether the client has disconnected
+    DISCONNECT_POLL_SECONDS: float = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+    # Agent turns running at once per process across all users; size to the
+    # model quota divided by the number of workers
+    # (requests per minute / model calls per turn * average turn seconds / 60)
+    MAX_CONCURRENT_TURNS: int = int(os.getenv("MAX_CONCURRENT_TURNS", "16"))
+    MAX_TURNS_PER_USER: int = int(os.getenv("MAX_TURNS_PER_USER", "2"))
+    # Turns waiting for their session or a slot beyond this are rejected with 429
+    MAX_QUEUED_TURNS: int = int(os.getenv("MAX_QUEUED_TURNS", "100"))
 
 
 class FrontendConfig:
@@ -63,6 +85,102 @@ class FrontendConfig:
     SHARE: bool = os.getenv("FRONTEND_SHARE", "false").lower() == "true"
 
 
+class AgentConfig:
+    """Agent model and context caching configuration"""
+    DEFAULT_MODEL: str = os.getenv("AGENT_MODEL", "gemini-2.5-flash")
+    LITE_MODEL: str = os.getenv("AGENT_LITE_MODEL", "gemini-2.5-flash-lite")
+    INVITATION_AGENT_MODEL: str = os.getenv("INVITATION_AGENT_MODEL", DEFAULT_MODEL)
+    EMAIL_AGENT_MODEL: str = os.getenv("EMAIL_AGENT_MODEL", DEFAULT_MODEL)
+    WHATSAPP_AGENT_MODEL: str = os.getenv("WHATSAPP_AGENT_MODEL", DEFAULT_MODEL)
+
+    # Model per agent and turn type. "confirm" turns are short confirmations
+    # ("yes, send it"). On the root agent they only delegate, so they use the
+    # lite model. Sub-agents also draft in the invocation the root agent
+    # delegated to them with that same message, so they keep their full model
+    # unless overridden.
+    MODELS: dict = {
+        "invitation_agent": {
+            "default": INVITATION_AGENT_MODEL,
+            "confirm": os.getenv("INVITATION_AGENT_CONFIRM_MODEL", LITE_MODEL),
+        },
+        "email_agent": {
+            "default": EMAIL_AGENT_MODEL,
+            "confirm": os.getenv("EMAIL_AGENT_CONFIRM_MODEL", EMAIL_AGENT_MODEL),
+        },
+        "whatsapp_agent": {
+            "default": WHATSAPP_AGENT_MODEL,
+            "confirm": os.getenv("WHATSAPP_AGENT_CONFIRM_MODEL", WHATSAPP_AGENT_MODEL),
+        },
+    }
+
+    # Draft email and WhatsApp invitations in the background once invitation_info is complete
+    SPECULATIVE_DRAFTS_ENABLED: bool = os.getenv("SPECULATIVE_DRAFTS_ENABLED", "true").lower() == "true"
+
+    # Reuse drafts of identical invitations across sessions (in-process LRU + PostgreSQL)
+    DRAFT_CACHE_ENABLED: bool = os.getenv("DRAFT_CACHE_ENABLED", "true").lower() == "true"
+    DRAFT_CACHE_TTL_SECONDS: int = int(os.getenv("DRAFT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    DRAFT_CACHE_MAX_ENTRIES: int = int(os.getenv("DRAFT_CACHE_MAX_ENTRIES", "1024"))
+
+    # Explicit context caching of static instructions and tools (Gemini API)
+    CONTEXT_CACHE_ENABLED: bool = os.getenv("CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    CONTEXT_CACHE_TTL_SECONDS: int = int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "1800"))
+    CONTEXT_CACHE_INTERVALS: int = int(os.getenv("CONTEXT_CACHE_INTERVALS", "10"))
+    # Gemini rejects caches below its minimum size (1024 tokens for 2.5 Flash)
+    CONTEXT_CACHE_MIN_TOKENS: int = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+
+
+class WhatsAppConfig:
+    """WhatsApp MCP server connection"""
+    MCP_URL: str = os.getenv("WHATSAPP_MCP_URL", "http://localhost:8000/sse")
+    MCP_TIMEOUT_SECONDS: float = float(os.getenv("WHATSAPP_MCP_TIMEOUT_SECONDS", "5"))
+    MCP_SSE_READ_TIMEOUT_SECONDS: float = float(os.getenv("WHATSAPP_MCP_SSE_READ_TIMEOUT_SECONDS", "300"))
+    # Warm client sessions per backend process, shared by every user
+    MCP_POOL_SIZE: int = int(os.getenv("WHATSAPP_MCP_POOL_SIZE", "2"))
+    MCP_HEALTH_CHECK_SECONDS: float = float(os.getenv("WHATSAPP_MCP_HEALTH_CHECK_SECONDS", "30"))
+
+
+class RsvpConfig:
+    """RSVP tracking configuration"""
+    ENABLED: bool = os.getenv("RSVP_ENABLED", "true").lower() == "true"
+    SCAN_INTERVAL_SECONDS: int = int(os.getenv("RSVP_SCAN_INTERVAL_SECONDS", "60"))
+    MODEL: str = os.getenv("RSVP_MODEL", "gemini-2.5-flash")
+    MESSAGES_DB_PATH: str = os.getenv("MESSAGES_DB_PATH", str(BASE_DIR / "whatsapp-mcp" / "whatsapp-bridge" / "store" / "messages.db"))
+    IMAP_SERVER: str = os.getenv("IMAP_SERVER", "imap.gmail.com")
+    IMAP_PORT: int = int(os.getenv("IMAP_PORT", "993"))
+
+
+class JobsConfig:
+    """Background chat job configuration (/chat?async=true)"""
+    # Workers running jobs in this process; 0 for processes that only enqueue
+    WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+    TIMEOUT_SECONDS: float = float(os.getenv("JOB_TIMEOUT_SECONDS", "300"))
+    WEBHOOK_TIMEOUT_SECONDS: float = float(os.getenv("JOB_WEBHOOK_TIMEOUT_SECONDS", "10"))
+    # Signs webhook bodies (X-Signature-256: sha256=<hmac>) when set
+    WEBHOOK_SECRET: str = os.getenv("JOB_WEBHOOK_SECRET", "")
+    # Comma-separated webhook hosts; when set no other host is called, and
+    # these may resolve to private addresses. Otherwise any public host
+    WEBHOOK_ALLOWED_HOSTS: list[str] = [h for h in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+
+
+class LoggingConfig:
+    """Logging configuration"""
+    LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    # "text" for humans, "json" for log collectors
+    FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+    # Share of per-event debug records (agent events, tool outputs) that are logged
+    EVENT_SAMPLE_RATE: float = float(os.getenv("LOG_EVENT_SAMPLE_RATE", "0.1"))
+
+
+class TracingConfig:
+    """OpenTelemetry tracing configuration"""
+    # none, console, file or otlp (endpoint from OTEL_EXPORTER_OTLP_ENDPOINT)
+    EXPORTER: str = os.getenv("TRACING_EXPORTER", "none").lower()
+    FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+    # Share of new traces recorded; spans follow their parent's decision
+    SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+
+
 class Config:
     """Main configuration class that aggregates all config sections"""
     database = DatabaseConfig
@@ -70,6 +188,12 @@ class Config:
     auth = AuthConfig
     backend = BackendConfig
     frontend = FrontendConfig
+    agent = AgentConfig
+    whatsapp = WhatsAppConfig
+    rsvp = RsvpConfig
+    jobs = JobsConfig
+    logging = LoggingConfig
+    tracing = TracingConfig
 
     # Direct access to commonly used values
     DB_URL = DatabaseConfig.DB_URL
@@ -0,0 +1,18 @@
+"""
+Gunicorn settings for running the backend with several uvicorn workers:
+
+    gunicorn backend:app -c gunicorn.conf.py
+"""
+from config import config
+
+bind = f"{config.backend.HOST}:{config.backend.PORT}"
+workers = config.backend.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Every worker imports the app and runs lifespan itself, so the runner,
+# database pools and MCP connections are created per process
+preload_app = False
+
+# Longer than the slowest synchronous turn (CHAT_TIMEOUT_SECONDS)
+timeout = int(config.backend.CHAT_TIMEOUT_SECONDS) + 30
+graceful_timeout = 30
@@ -1 +1,9 @@
-from . import agent
+import importlib
+
+
+def __getattr__(name):
+    # Imported on first use, so importing a helper module such as
+    # invitation_agent.draft_cache does not build every agent
+    if name == "agent":
+        return importlib.import_module(f"{__name__}.agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
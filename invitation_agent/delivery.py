@@ -0,0 +1,106 @@
+"""
+Send confirmed email and WhatsApp invitations concurrently
+"""
+import asyncio
+import time
+
+from google.adk.tools.tool_context import ToolContext
+
+from .sub_agents.email_agent.tools import send_mail
+from .sub_agents.whatsapp_agent.agent import create_whatsapp_toolset
+from rsvp.callbacks import mcp_succeeded, report_sent_invitation
+from utils.logger import setup_logger
+from utils.tracing import traced
+
+logger = setup_logger(__name__)
+
+# Only used for delivery; whatsapp_agent itself can only search contacts
+whatsapp_toolset = create_whatsapp_toolset(['send_message'])
+
+
+async def _send_email(email: dict, tool_context: ToolContext) -> dict:
+    args = {
+        "receiver": email.get("email_recipients") or [],
+        "subject": email.get("subject", ""),
+        "body": email.get("body", ""),
+        "attachments": email.get("attachments") or None,
+    }
+    result = await asyncio.to_thread(send_mail, **args)
+
+    session = tool_context._invocation_context.session
+    await report_sent_invitation(session.id, session.user_id, "send_mail", args, result)
+    return {"success": result.startswith("Email successfully sent"), "result": result, "sent": args}
+
+
+async def _send_whatsapp_message(tool, recipient: str, message: str, tool_context: ToolContext) -> dict:
+    args = {"recipient": recipient, "message": message}
+    try:
+        result = await tool.run_async(args=args, tool_context=tool_context)
+    except Exception as e:
+        logger.error(f"Failed to send whatsapp message to {recipient}: {str(e)}")
+        return {"recipient": recipient, "success": False, "result": str(e)}
+
+    session = tool_context._invocation_context.session
+    await report_sent_invitation(session.id, session.user_id, "send_message", args, result)
+    return {"recipient": recipient, "success": mcp_succeeded(result)}
+
+
+async def _send_whatsapp(whatsapp: dict, tool_context: ToolContext) -> dict:
+    try:
+        tools = await whatsapp_toolset.get_tools()
+        send_message = next(tool for tool in tools if tool.name == "send_message")
+    except Exception as e:
+        logger.error(f"WhatsApp MCP server unavailable: {str(e)}")
+        return {"success": False, "result": f"WhatsApp is unavailable: {str(e)}"}
+
+    results = await asyncio.gather(*(
+        _send_whatsapp_message(send_message, recipient, whatsapp.get("message", ""), tool_context)
+        for recipient in whatsapp.get("recipients") or []
+    ))
+    return {"success": bool(results) and all(r["success"] for r in results), "recipients": list(results)}
+
+
+@traced()
+async def send_invitations(tool_context: ToolContext) -> dict:
+    """Send every confirmed invitation (email and whatsapp) at the same time.
+
+    Args:
+        tool_context: Context for accessing and updating session state.
+
+    Returns:
+        Delivery result per channel
+    """
+    logger.info("--- Tool: send_invitations called ---")
+
+    email = dict(tool_context.state.get("email") or {})
+    whatsapp = dict(tool_context.state.get("whatsapp") or {})
+
+    channels = {}
+    if email.get("confirmed") and email.get("email_recipients"):
+        channels["email"] = _send_email(email, tool_context)
+    if whatsapp.get("confirmed") and whatsapp.get("recipients"):
+        channels["whatsapp"] = _send_whatsapp(whatsapp, tool_context)
+
+    if not channels:
+        return {"message": "There are no confirmed invitations to send. Confirm the email or whatsapp message first."}
+
+    started = time.perf_counter()
+    results = dict(zip(channels, await asyncio.gather(*channels.values())))
+    sent_email = results.get("email", {}).pop("sent", None)
+    logger.info(f"Sent {', '.join(channels)} invitations in {time.perf_counter() - started:.2f}s")
+
+    # Sent drafts are no longer pending. Failed sends stay confirmed so a
+    # retry only goes to the recipients that did not get the invitation.
+    if results.get("email", {}).get("success"):
+        tool_context.state["email"] = {**email, "confirmed": False}
+        # What the fast path's "resend" sends again, exactly as delivered
+        tool_context.state["last_sent_email"] = sent_email
+    if "recipients" in results.get("whatsapp", {}):
+        failed = [r["recipient"] for r in results["whatsapp"]["recipients"] if not r["success"]]
+        tool_context.state["whatsapp"] = {
+            **whatsapp,
+            "recipients": failed or whatsapp["recipients"],
+            "confirmed": bool(failed),
+        }
+
+    return results
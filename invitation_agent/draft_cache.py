@@ -0,0 +1,171 @@
+"""
+Content-addressed cache of email and WhatsApp drafts
+"""
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from config import config
+from utils.invalidation import invalidator
+from utils.logger import setup_logger
+from utils.prompt import compact
+
+logger = setup_logger(__name__)
+
+# NOTIFY channel of keys whose draft was replaced by another process
+INVALIDATION_CHANNEL = "draft_cache"
+
+# Set per request to skip cached drafts and write fresh ones
+_bypass: ContextVar[bool] = ContextVar("draft_cache_bypass", default=False)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def normalize_invitation_info(invitation_info) -> dict:
+    """invitation_info without empty fields, extra whitespace, or tone casing"""
+    info = _normalize(compact(invitation_info or {}))
+    if info.get("tone"):
+        info["tone"] = info["tone"].casefold()
+    return info
+
+
+def instruction_version(instruction: str) -> str:
+    return hashlib.sha256(instruction.encode()).hexdigest()[:12]
+
+
+class DraftCache:
+    """Drafts keyed by channel, instruction version, invitation_info and sender.
+
+    Lookups go to an in-process LRU first and then to PostgreSQL, so a
+    draft written on one worker is reused by the others. Entries expire
+    after ttl_seconds. Changing an agent's static instruction changes the
+    key, so drafts written under an old prompt are never served. A draft
+    replaced on one worker is dropped from the other workers' LRU through
+    the invalidator.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.pool = None
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        invalidator.subscribe(INVALIDATION_CHANNEL, self.invalidate)
+
+    async def initialize(self, pool):
+        """Create the draft cache table using an existing connection pool"""
+        self.pool = pool
+
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS draft_cache (
+                    key TEXT PRIMARY KEY,
+                    channel TEXT NOT NULL,
+                    draft JSONB NOT NULL,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            await conn.execute('''
+                DELETE FROM draft_cache
+                WHERE created_at < CURRENT_TIMESTAMP - make_interval(secs => $1)
+            ''', float(self.ttl_seconds))
+
+    @staticmethod
+    def key(channel: str, instruction: str, invitation_info, user_context) -> str:
+        data = json.dumps({
+            "channel": channel,
+            "instruction": instruction_version(instruction),
+            "invitation_info": normalize_invitation_info(invitation_info),
+            "sender": _normalize(compact(user_context or {}).get("full_name", "")),
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    @contextmanager
+    def bypass(self, enabled: bool = True):
+        """Skip cached drafts for everything run inside the block"""
+        token = _bypass.set(enabled)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def bypassed(self) -> bool:
+        """True inside a bypass() block"""
+        return _bypass.get()
+
+    async def get(self, key: str) -> Optional[dict]:
+        if self.bypassed() or not config.agent.DRAFT_CACHE_ENABLED:
+            return None
+
+        entry = self._entries.get(key)
+        if entry and time.time() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        if not self.pool:
+            return None
+        try:
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow('''
+                    SELECT draft, EXTRACT(EPOCH FROM created_at) AS created_at
+                    FROM draft_cache
+                    WHERE key = $1 AND created_at > CURRENT_TIMESTAMP - make_interval(secs => $2)
+                ''', key, float(self.ttl_seconds))
+        except Exception as e:
+            logger.error(f"Draft cache lookup failed: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+        draft = json.loads(row['draft'])
+        self._remember(key, draft, float(row['created_at']))
+        return draft
+
+    async def put(self, key: str, channel: str, draft: dict):
+        if not config.agent.DRAFT_CACHE_ENABLED:
+            return
+
+        self._remember(key, draft, time.time())
+        if not self.pool:
+            return
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO draft_cache (key, channel, draft) VALUES ($1, $2, $3::jsonb)
+                    ON CONFLICT (key) DO UPDATE SET draft = EXCLUDED.draft, created_at = CURRENT_TIMESTAMP
+                ''', key, channel, json.dumps(draft, ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"Failed to store draft in cache: {str(e)}")
+            return
+        await invalidator.publish(INVALIDATION_CHANNEL, key)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop a key from the in-process LRU, or every key when None"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _remember(self, key: str, draft: dict, created_at: float):
+        self._entries[key] = (created_at, draft)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+draft_cache = DraftCache(
+    max_entries=config.agent.DRAFT_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.agent.DRAFT_CACHE_TTL_SECONDS,
+)
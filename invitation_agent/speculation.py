@@ -0,0 +1,237 @@
+"""
+Speculative email and WhatsApp drafts, generated while the user confirms invitation_info
+"""
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import BaseModel
+
+from config import config
+from rsvp.models import EMAIL, WHATSAPP
+from shared.model import EmailModel, WhatsAppModel
+from utils.logger import setup_logger
+from utils.metrics import registry
+from utils.prompt import compact, serialize_state
+from .draft_cache import draft_cache
+
+logger = setup_logger(__name__)
+
+# invitation_info fields that must be filled before drafting is worth it
+REQUIRED_FIELDS = ("agenda_name", "location", "scheduled_at", "recipients", "tone")
+
+# Tools that save a sub-agent's draft, and the state fields that make up the draft
+DRAFT_TOOLS = {
+    "update_email_state": (EMAIL, ("subject", "body")),
+    "update_whatsapp_state": (WHATSAPP, ("message",)),
+}
+
+DRAFT_PROMPT = """Write the {channel} invitation now, without asking the user anything.
+
+Here is the current user information:
+{user_context}
+
+Here is current invitation info state:
+{invitation_info}
+"""
+
+registry.describe("speculative_drafts_total", "counter", "Speculative drafts by channel and outcome")
+
+
+class EmailDraft(BaseModel):
+    subject: str
+    body: str
+
+
+class WhatsAppDraft(BaseModel):
+    message: str
+
+
+def is_complete(invitation_info: dict) -> bool:
+    return all(invitation_info.get(field) for field in REQUIRED_FIELDS)
+
+
+def draft_key(invitation_info: dict, user_context: dict) -> str:
+    """Hash of everything a draft depends on"""
+    data = serialize_state("invitation_info", invitation_info) + serialize_state("user_context", user_context)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _present_email(draft: dict, state: dict) -> tuple[dict, str]:
+    email = {**EmailModel().model_dump(), **compact(state.get("email") or {}), **draft, "confirmed": False}
+    text = f"Here is the invitation email:\n\n**Subject:** {draft['subject']}\n\n{draft['body']}\n\n"
+    if not email.get("email_recipients"):
+        text += "What are the email addresses of the recipients? "
+    text += "Shall I use this email, or would you like any changes?"
+    return email, text
+
+
+def _present_whatsapp(draft: dict, state: dict) -> tuple[dict, str]:
+    whatsapp = {**WhatsAppModel().model_dump(), **compact(state.get("whatsapp") or {}), **draft, "confirmed": False}
+    text = f"Here is the WhatsApp message:\n\n{draft['message']}\n\n"
+    if not whatsapp.get("recipients"):
+        text += "Which contacts or phone numbers should receive it? "
+    text += "Shall I use this message, or would you like any changes?"
+    return whatsapp, text
+
+
+class DraftSpeculator:
+    """Generates drafts in the background and serves them when a sub-agent starts.
+
+    Drafts are keyed by a hash of invitation_info and the user context, so a
+    draft is only served while the information it was written from is
+    unchanged. They are kept in process rather than in session state,
+    because writing session state from a background task would conflict
+    with the runner's own updates of the session. A served draft is written
+    to state by the sub-agent's event like any other draft.
+
+    Drafts the user confirmed and drafts written here are also stored in the
+    draft cache, so the same invitation drafted again in any session is
+    served without a model call.
+    """
+
+    def __init__(self, max_entries: int = 256, client=None):
+        self.max_entries = max_entries
+        self._client = client
+        self._writers: dict[str, tuple[str, str, type, Callable]] = {}
+        self._drafts: OrderedDict[tuple[str, str], asyncio.Task] = OrderedDict()
+
+    def register(self, channel: str, instruction: str, model: str):
+        """Register a sub-agent's static instruction and model for drafting"""
+        schema, present = {EMAIL: (EmailDraft, _present_email), WHATSAPP: (WhatsAppDraft, _present_whatsapp)}[channel]
+        self._writers[channel] = (instruction, model, schema, present)
+
+    def schedule(self, invitation_info: dict, user_context: dict):
+        """Start drafting every channel for this invitation_info, unless already started"""
+        key = draft_key(invitation_info, user_context)
+        for channel in self._writers:
+            if (channel, key) in self._drafts:
+                self._drafts.move_to_end((channel, key))
+                continue
+
+            self._drafts[(channel, key)] = asyncio.create_task(
+                self._generate(channel, invitation_info, user_context)
+            )
+            while len(self._drafts) > self.max_entries:
+                _, task = self._drafts.popitem(last=False)
+                task.cancel()
+
+    async def get(self, channel: str, invitation_info: dict, user_context: dict) -> Optional[dict]:
+        """Return the draft for this invitation_info, waiting for it if still being written"""
+        task = self._drafts.get((channel, draft_key(invitation_info, user_context)))
+        if task is None:
+            return None
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception:
+            return None
+
+    async def after_update(self, tool, args: dict, tool_context, tool_response):
+        """after_tool_callback: start drafting once invitation_info is complete"""
+        if tool.name != "update_invitation_info" or not config.agent.SPECULATIVE_DRAFTS_ENABLED:
+            return None
+
+        invitation_info = compact(tool_context.state.get("invitation_info") or {})
+        if is_complete(invitation_info):
+            self.schedule(invitation_info, tool_context.state.get("user_context") or {})
+        return None
+
+    def serve(self, channel: str):
+        """Build a before_model_callback that answers with the ready draft instead of drafting"""
+        async def before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+            if draft_cache.bypassed():
+                # The request asked for a fresh draft; neither speculative nor cached ones count
+                return None
+
+            state = callback_context.state
+            current = compact(state.get(channel) or {})
+            if current.get("body") or current.get("message"):
+                # A draft is already being discussed
+                return None
+
+            invitation_info = compact(state.get("invitation_info") or {})
+            if not is_complete(invitation_info):
+                return None
+
+            user_context = state.get("user_context") or {}
+            draft = await self.get(channel, invitation_info, user_context)
+            if draft is not None:
+                registry.inc("speculative_drafts_total", channel=channel, result="hit")
+            else:
+                draft = await draft_cache.get(self._cache_key(channel, invitation_info, user_context))
+                if draft is None:
+                    registry.inc("speculative_drafts_total", channel=channel, result="miss")
+                    return None
+                registry.inc("speculative_drafts_total", channel=channel, result="cache_hit")
+
+            value, text = self._writers[channel][3](draft, state.to_dict())
+            state[channel] = value
+            logger.info(f"Serving speculative {channel} draft")
+            return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+        return before_model
+
+    async def remember_confirmed(self, tool, args: dict, tool_context, tool_response):
+        """after_tool_callback: store drafts the user confirmed in the draft cache"""
+        if tool.name not in DRAFT_TOOLS:
+            return None
+
+        channel, fields = DRAFT_TOOLS[tool.name]
+        saved = compact(tool_context.state.get(channel) or {})
+        invitation_info = compact(tool_context.state.get("invitation_info") or {})
+        if channel in self._writers and saved.get("confirmed") and all(saved.get(f) for f in fields):
+            key = self._cache_key(channel, invitation_info, tool_context.state.get("user_context") or {})
+            await draft_cache.put(key, channel, {f: saved[f] for f in fields})
+        return None
+
+    def _cache_key(self, channel: str, invitation_info: dict, user_context: dict) -> str:
+        return draft_cache.key(channel, self._writers[channel][0], invitation_info, user_context)
+
+    async def _generate(self, channel: str, invitation_info: dict, user_context: dict) -> Optional[dict]:
+        instruction, model, schema, _ = self._writers[channel]
+        key = self._cache_key(channel, invitation_info, user_context)
+        cached = await draft_cache.get(key)
+        if cached is not None:
+            registry.inc("speculative_drafts_total", channel=channel, result="cache_hit")
+            return cached
+
+        try:
+            if self._client is None:
+                from google import genai
+                self._client = genai.Client()
+
+            response = await self._client.aio.models.generate_content(
+                model=model,
+                contents=DRAFT_PROMPT.format(
+                    channel=channel,
+                    user_context=serialize_state("user_context", user_context),
+                    invitation_info=serialize_state("invitation_info", invitation_info),
+                ),
+                config=types.GenerateContentConfig(
+                    system_instruction=instruction,
+                    response_mime_type="application/json",
+                    response_schema=schema,
+                ),
+            )
+            draft = schema.model_validate(json.loads(response.text)).model_dump()
+        except Exception as e:
+            logger.error(f"Speculative {channel} draft failed: {str(e)}")
+            registry.inc("speculative_drafts_total", channel=channel, result="failed")
+            return None
+
+        registry.inc("speculative_drafts_total", channel=channel, result="generated")
+        await draft_cache.put(key, channel, draft)
+        return draft
+
+
+draft_speculator = DraftSpeculator()
@@ -6,23 +6,21 @@ from email import encoders
 from typing import List, Optional
 from pathlib import Path
 from datetime import datetime
-from icalendar import Calendar, Event
 from google.adk.tools.tool_context import ToolContext
 
 from config import config
 from utils.logger import setup_logger
+from utils.tracing import traced, tracer
 from shared.model import EmailModel
 
 logger = setup_logger(__name__)
 
-# Validate email configuration on import
-config.email.validate()
-
 EMAIL_HOST_USER = config.email.EMAIL_HOST_USER
 EMAIL_HOST_PASSWORD = config.email.EMAIL_HOST_PASSWORD
 SMTP_SERVER = config.email.SMTP_SERVER
 SMTP_PORT = config.email.SMTP_PORT
 
+@traced()
 def send_mail(receiver: List[str], subject: str, body: str, attachments: Optional[List[str]] = None) -> str:
     """
     Send an email to one or more recipients.
@@ -68,10 +66,11 @@ def send_mail(receiver: List[str], subject: str, body: str, attachments: Optiona
                 except Exception as attach_error:
                     logger.error(f"Failed to attach file {file_path}: {str(attach_error)}")
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
-            server.send_message(msg)
+        with tracer.start_as_current_span("smtp.send", attributes={"smtp.server": SMTP_SERVER, "smtp.recipients": len(receiver)}):
+            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+                server.starttls()
+                server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
+                server.send_message(msg)
 
         attachment_info = f" with {len(attachments)} attachment(s)" if attachments else ""
         logger.info(f"Email sent successfully to {', '.join(receiver)}{attachment_info}")
@@ -80,6 +79,7 @@ def send_mail(receiver: List[str], subject: str, body: str, attachments: Optiona
         logger.error(f"Failed to send email: {type(e).__name__}: {str(e)}")
         return f"Failed to send email: {str(e)}"
 
+@traced()
 def update_email_state(email: EmailModel, tool_context: ToolContext):
     """Update email state.
 
@@ -88,6 +88,8 @@ def update_email_state(email: EmailModel, tool_context: ToolContext):
             subject: Subject line of the email
             body: Body of the email
             email_recipients: List of valid email address of recipients
+            attachments: List of file paths to attach, e.g. the calendar invitation
+            confirmed: True once the user confirmed the email
         tool_context: Context for accessing and updating session state.
 
     Returns:
@@ -101,6 +103,7 @@ def update_email_state(email: EmailModel, tool_context: ToolContext):
         "message": f"Updated email state: {email}"
     }
 
+@traced()
 def reset_email_state(tool_context: ToolContext):
     """Reset email in the state.
 
@@ -120,6 +123,7 @@ def reset_email_state(tool_context: ToolContext):
         "message": f"Successfully reset email"
     }
 
+@traced()
 def create_calendar_invitation(
     summary: str,
     start_time: str,
@@ -149,6 +153,9 @@ def create_calendar_invitation(
     logger.info(f"--- Tool: create_calendar_invitation called for event '{summary}' ---")
 
     try:
+        # icalendar is only needed here, so it is not loaded at startup
+        from icalendar import Calendar, Event
+
         # Create calendar
         cal = Calendar()
         cal.add('prodid', '-//Invitation Agent//Calendar Invitation//EN')
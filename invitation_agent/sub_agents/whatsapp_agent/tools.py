@@ -0,0 +1,49 @@
+from google.adk.tools.tool_context import ToolContext
+
+from utils.logger import setup_logger
+from utils.tracing import traced
+from shared.model import WhatsAppModel
+
+logger = setup_logger(__name__)
+
+@traced()
+def update_whatsapp_state(whatsapp: WhatsAppModel, tool_context: ToolContext):
+    """Update whatsapp message state.
+
+    Args:
+        whatsapp:
+            message: The whatsapp invitation message
+            recipients: List of recipient phone numbers (with country code) or JIDs
+            confirmed: True once the user confirmed the message
+        tool_context: Context for accessing and updating session state.
+
+    Returns:
+        A confirmation message
+    """
+    logger.info(f"--- Tool: update_whatsapp_state called for {whatsapp} ---")
+
+    tool_context.state["whatsapp"] = whatsapp
+
+    return {
+        "message": f"Updated whatsapp state: {whatsapp}"
+    }
+
+@traced()
+def reset_whatsapp_state(tool_context: ToolContext):
+    """Reset whatsapp message in the state.
+
+    Args:
+        tool_context: Context for accessing and updating session state.
+
+    Returns:
+        A confirmation message
+    """
+    logger.info(f"--- Tool: reset_whatsapp_state called ---")
+
+    empty_whatsapp = WhatsAppModel()
+
+    tool_context.state["whatsapp"] = empty_whatsapp.model_dump()
+
+    return {
+        "message": f"Successfully reset whatsapp message"
+    }
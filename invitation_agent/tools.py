@@ -1,10 +1,12 @@
 from datetime import datetime
 from utils.logger import setup_logger
+from utils.tracing import traced
 from google.adk.tools.tool_context import ToolContext
 from shared.model import InvitationInfo
 
 logger = setup_logger(__name__)
 
+@traced()
 def get_curent_datetime():
     """Function to get current date time.
 
@@ -19,6 +21,7 @@ def get_curent_datetime():
     logger.debug(f"Current datetime: {current_time}")
     return current_time
 
+@traced()
 def update_invitation_info(invitation_info: InvitationInfo, tool_context: ToolContext):
     """Update invitation info based on information from user.
 
@@ -49,6 +52,7 @@ def update_invitation_info(invitation_info: InvitationInfo, tool_context: ToolCo
 
 
 
+@traced()
 def reset_invitation_info(tool_context: ToolContext):
     """Reset invitation_info in the state.
     
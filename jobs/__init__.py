@@ -0,0 +1,3 @@
+"""
+Background chat jobs for turns that outlive an HTTP request
+"""
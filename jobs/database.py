@@ -0,0 +1,98 @@
+"""
+Chat job queue in PostgreSQL
+"""
+from typing import Optional
+
+from jobs.models import QUEUED, RUNNING, FAILED
+
+
+class JobDatabase:
+    """Chat jobs, claimed by workers with FOR UPDATE SKIP LOCKED.
+
+    Any process with access to the database can run jobs, so API and
+    worker processes can be scaled separately.
+    """
+
+    def __init__(self):
+        self.pool = None
+
+    async def initialize(self, pool):
+        """Create the job table using an existing connection pool"""
+        self.pool = pool
+
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS chat_jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    bypass_cache BOOLEAN NOT NULL DEFAULT FALSE,
+                    webhook_url TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    response TEXT,
+                    error TEXT,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMPTZ,
+                    finished_at TIMESTAMPTZ
+                )
+            ''')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_chat_jobs_queued
+                ON chat_jobs (created_at) WHERE status = 'queued'
+            ''')
+
+    async def create(self, job_id: str, user_id: str, session_id: str, message: str,
+                     bypass_cache: bool = False, webhook_url: Optional[str] = None) -> dict:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                INSERT INTO chat_jobs (id, user_id, session_id, message, bypass_cache, webhook_url)
+                VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING *
+            ''', job_id, user_id, session_id, message, bypass_cache, webhook_url)
+        return dict(row)
+
+    async def get(self, job_id: str, user_id: str) -> Optional[dict]:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                SELECT * FROM chat_jobs WHERE id = $1 AND user_id = $2
+            ''', job_id, user_id)
+        return dict(row) if row else None
+
+    async def claim(self) -> Optional[dict]:
+        """Mark the oldest queued job as running and return it"""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow('''
+                UPDATE chat_jobs SET status = $1, started_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM chat_jobs
+                    WHERE status = $2
+                    ORDER BY created_at
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING *
+            ''', RUNNING, QUEUED)
+        return dict(row) if row else None
+
+    async def finish(self, job_id: str, status: str, response: Optional[str] = None, error: Optional[str] = None):
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                UPDATE chat_jobs
+                SET status = $2, response = $3, error = $4, finished_at = CURRENT_TIMESTAMP
+                WHERE id = $1
+            ''', job_id, status, response, error)
+
+    async def fail_stale(self, older_than_seconds: float) -> int:
+        """Fail running jobs whose worker stopped before finishing them.
+
+        They are not retried, because the turn may already have sent
+        invitations.
+        """
+        async with self.pool.acquire() as conn:
+            result = await conn.execute('''
+                UPDATE chat_jobs
+                SET status = $1, error = 'Worker stopped before the job finished', finished_at = CURRENT_TIMESTAMP
+                WHERE status = $2 AND started_at < CURRENT_TIMESTAMP - make_interval(secs => $3)
+            ''', FAILED, RUNNING, float(older_than_seconds))
+        return int(result.split()[-1])
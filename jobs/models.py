@@ -0,0 +1,7 @@
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+STATUSES = [QUEUED, RUNNING, SUCCEEDED, FAILED]
+FINISHED = [SUCCEEDED, FAILED]
@@ -0,0 +1,62 @@
+"""
+Webhook URL checks that keep job results away from internal services
+"""
+import asyncio
+import ipaddress
+import socket
+from typing import Iterable, NamedTuple
+from urllib.parse import urlsplit
+
+
+class WebhookRejected(Exception):
+    """The webhook URL points somewhere the backend must not call"""
+
+
+class WebhookTarget(NamedTuple):
+    """A webhook URL pinned to the address it was checked against"""
+    url: str
+    # Sent as SNI and the Host header, since the URL carries the address
+    host: str
+    host_header: str
+
+
+def is_public_address(address: str) -> bool:
+    """False for private, loopback, link-local, multicast, reserved and unspecified addresses"""
+    # Scoped IPv6 addresses (fe80::1%eth0) carry the interface after %
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve_webhook(url: str, allowed_hosts: Iterable[str] = ()) -> WebhookTarget:
+    """Resolve the webhook host and return the URL rewritten to a checked address.
+
+    With `allowed_hosts` only those hosts are accepted, wherever they
+    resolve. Without it any host is accepted as long as every address it
+    resolves to is public, so a DNS answer cannot point the request at
+    the metadata service or the local network.
+
+    Raises WebhookRejected.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookRejected("Webhook URL must be an absolute http(s) URL")
+    host = parts.hostname.lower()
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+
+    allowed = {h.strip().lower() for h in allowed_hosts if h.strip()}
+    if allowed and host not in allowed:
+        raise WebhookRejected(f"Webhook host {host} is not allowed")
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise WebhookRejected(f"Webhook host {host} does not resolve: {e.strerror}")
+    addresses = [info[4][0] for info in infos]
+    if not allowed and not all(is_public_address(a) for a in addresses):
+        raise WebhookRejected(f"Webhook host {host} resolves to a non-public address")
+
+    address = addresses[0]
+    netloc = f"[{address}]:{port}" if ":" in address else f"{address}:{port}"
+    return WebhookTarget(parts._replace(netloc=netloc).geturl(), host, parts.netloc.rpartition("@")[2])
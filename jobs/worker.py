@@ -0,0 +1,165 @@
+"""
+Worker pool that runs queued chat jobs and reports results to webhooks
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional
+
+import httpx
+
+from jobs.database import JobDatabase
+from jobs.models import SUCCEEDED, FAILED
+from jobs.webhooks import WebhookRejected, resolve_webhook
+from utils.logger import setup_logger
+from utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+registry.describe("chat_jobs_total", "counter", "Finished chat jobs by status")
+registry.describe("chat_job_wait_seconds", "summary", "Time a chat job waited in the queue before a worker claimed it")
+registry.describe("webhook_deliveries_total", "counter", "Webhook deliveries by result")
+
+
+class JobWorkerPool:
+    """Runs chat jobs from the job table with a fixed number of workers.
+
+    Workers wake up when a job is enqueued in this process and poll the
+    table for jobs enqueued elsewhere. `handler` runs one job and returns
+    the response text; an exception fails the job with its message.
+    Jobs left running longer than `stale_after` by a process that died
+    are failed every `stale_after / 2` seconds.
+    """
+
+    def __init__(self, job_db: JobDatabase, handler: Callable[[dict], Awaitable[str]],
+                 workers: int = 4, poll_interval: float = 1.0, stale_after: float = 600.0,
+                 webhook_timeout: float = 10.0, webhook_secret: str = "",
+                 webhook_allowed_hosts: Iterable[str] = ()):
+        self.job_db = job_db
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.webhook_timeout = webhook_timeout
+        self.webhook_secret = webhook_secret
+        self.webhook_allowed_hosts = tuple(webhook_allowed_hosts)
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def notify(self):
+        """Wake an idle worker for a job that was just enqueued"""
+        self._wakeup.set()
+
+    async def start(self):
+        await self._fail_stale()
+
+        self._client = httpx.AsyncClient(timeout=self.webhook_timeout)
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client:
+            await self._client.aclose()
+
+    async def _fail_stale(self):
+        try:
+            failed = await self.job_db.fail_stale(self.stale_after)
+        except Exception as e:
+            logger.error(f"Failed to sweep stale chat jobs: {str(e)}")
+            return
+        if failed:
+            logger.warning(f"Failed {failed} stale chat job(s)")
+
+    async def _sweep(self):
+        """Fail jobs orphaned by processes that died while this one keeps running"""
+        while True:
+            await asyncio.sleep(self.stale_after / 2)
+            await self._fail_stale()
+
+    async def _work(self, worker_id: int):
+        while True:
+            try:
+                job = await self.job_db.claim()
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: dict):
+        registry.observe("chat_job_wait_seconds", (job['started_at'] - job['created_at']).total_seconds())
+        logger.info(f"Running chat job {job['id']} for session {job['session_id']}")
+        try:
+            response = await self.handler(job)
+            job.update(status=SUCCEEDED, response=response, error=None)
+        except asyncio.CancelledError:
+            await self.job_db.finish(job['id'], FAILED, error="Worker stopped before the job finished")
+            raise
+        except Exception as e:
+            logger.error(f"Chat job {job['id']} failed: {str(e)}")
+            job.update(status=FAILED, response=None, error=str(e) or type(e).__name__)
+
+        await self.job_db.finish(job['id'], job['status'], job['response'], job['error'])
+        registry.inc("chat_jobs_total", status=job['status'])
+        if job['webhook_url']:
+            await self._deliver(job)
+
+    async def _deliver(self, job: dict, attempts: int = 3):
+        """POST the job result to its webhook, retrying with backoff.
+
+        The host is resolved and checked again here, and the request goes
+        to the checked address, so a DNS answer that changed since the job
+        was enqueued cannot redirect it to an internal service.
+        """
+        body = json.dumps({
+            "job_id": job['id'],
+            "session_id": job['session_id'],
+            "status": job['status'],
+            "response": job['response'],
+            "error": job['error'],
+            "finished_at": datetime.now().astimezone().isoformat(),
+        }).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.webhook_secret:
+            signature = hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Signature-256"] = f"sha256={signature}"
+
+        for attempt in range(attempts):
+            try:
+                target = await resolve_webhook(job['webhook_url'], self.webhook_allowed_hosts)
+            except WebhookRejected as e:
+                logger.warning(f"Webhook for job {job['id']} blocked: {str(e)}")
+                registry.inc("webhook_deliveries_total", result="blocked")
+                return
+            try:
+                response = await self._client.post(
+                    target.url,
+                    content=body,
+                    headers={**headers, "Host": target.host_header},
+                    extensions={"sni_hostname": target.host},
+                )
+                if response.status_code < 500:
+                    registry.inc("webhook_deliveries_total", result="delivered" if response.is_success else "rejected")
+                    return
+                logger.warning(f"Webhook for job {job['id']} answered {response.status_code}")
+            except httpx.HTTPError as e:
+                logger.warning(f"Webhook for job {job['id']} failed: {str(e)}")
+            if attempt < attempts - 1:
+                await asyncio.sleep(2 ** attempt)
+
+        registry.inc("webhook_deliveries_total", result="failed")
@@ -0,0 +1,3 @@
+"""
+RSVP tracking for sent invitations (WhatsApp and email replies)
+"""
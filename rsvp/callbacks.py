@@ -0,0 +1,62 @@
+"""
+Report sent invitations to the RSVP tracker
+"""
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from rsvp.models import WHATSAPP, EMAIL
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Set by the backend at startup: async (session_id, user_id, channel, recipients) -> None
+_recorder: Optional[Callable[[str, str, str, list[str]], Awaitable[None]]] = None
+
+
+def set_invitation_recorder(recorder):
+    global _recorder
+    _recorder = recorder
+
+
+def mcp_succeeded(tool_response: Any) -> bool:
+    """Read the success flag of a WhatsApp MCP tool result"""
+    if getattr(tool_response, "isError", False):
+        return False
+
+    structured = getattr(tool_response, "structuredContent", None)
+    if isinstance(structured, dict) and "success" in structured:
+        return bool(structured["success"])
+
+    for content in getattr(tool_response, "content", None) or []:
+        try:
+            return bool(json.loads(getattr(content, "text", "")).get("success"))
+        except (ValueError, AttributeError):
+            continue
+    return False
+
+
+def sent_invitation(tool_name: str, args: dict, tool_response: Any) -> Optional[tuple[str, list[str]]]:
+    """Return (channel, recipients) if the tool call delivered an invitation"""
+    if tool_name == "send_mail":
+        if isinstance(tool_response, str) and tool_response.startswith("Email successfully sent"):
+            return EMAIL, list(args.get("receiver") or [])
+    elif tool_name == "send_message":
+        if mcp_succeeded(tool_response) and args.get("recipient"):
+            return WHATSAPP, [args["recipient"]]
+    return None
+
+
+async def report_sent_invitation(session_id: str, user_id: str, tool_name: str, args: dict, tool_response: Any):
+    """Register recipients for RSVP tracking if a send tool call delivered an invitation"""
+    if _recorder is None:
+        return
+
+    sent = sent_invitation(tool_name, args, tool_response)
+    if not sent:
+        return
+
+    channel, recipients = sent
+    try:
+        await _recorder(session_id, user_id, channel, recipients)
+    except Exception as e:
+        logger.error(f"Failed to record sent invitation for RSVP tracking: {str(e)}")
@@ -0,0 +1,107 @@
+"""
+Classify invitation replies: keyword rules first, the LLM only for ambiguous replies
+"""
+import re
+from typing import Optional
+
+from rsvp.models import ACCEPTED, DECLINED, MAYBE
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# English and Indonesian phrasings, matched on lowercased text
+RULES = {
+    DECLINED: re.compile(
+        r"\b(can'?t (make it|come|attend|join)|cannot (make it|come|attend|join)|won'?t be able|"
+        r"unable to (come|attend|join)|not (coming|attending)|declin(e|ed)|"
+        r"(tidak|tak|gak|nggak|ngga|ga|gk) (bisa|dapat|hadir|datang|ikut)|berhalangan|absen)\b"
+    ),
+    MAYBE: re.compile(
+        r"\b(maybe|might|not sure|perhaps|tentative(ly)?|will try|"
+        r"mungkin|belum (tahu|tau|pasti|bisa pastikan)|diusahakan|(saya )?usahakan)\b"
+    ),
+    ACCEPTED: re.compile(
+        r"\b(yes|yep|yeah|sure|of course|count me in|i'?ll (be there|come|attend|join)|"
+        r"will (be there|come|attend|join)|see you (there|then)|accept(ed)?|confirmed?|"
+        r"hadir|datang|siap|ikut|oke+|ok|okay|insya ?allah)\b"
+    ),
+}
+
+SUBJECT_PREFIXES = {
+    "accepted:": ACCEPTED,
+    "declined:": DECLINED,
+    "tentative:": MAYBE,
+    "tentatively accepted:": MAYBE,
+}
+
+MODEL_PROMPT = """You classify replies to an event invitation.
+Answer with exactly one word: accepted, declined, maybe, or unrelated.
+
+Reply:
+{text}
+"""
+
+
+def classify_by_rules(text: str) -> tuple[Optional[str], bool]:
+    """Classify a reply with keyword rules.
+
+    Returns:
+        (status, ambiguous). status is None when no rule matched or several
+        contradicting rules matched; ambiguous is True in the latter case.
+    """
+    lowered = text.lower()
+
+    for prefix, status in SUBJECT_PREFIXES.items():
+        if lowered.startswith(prefix):
+            return status, False
+
+    matches = [status for status, pattern in RULES.items() if pattern.search(lowered)]
+
+    # "tidak bisa datang" also matches the accept rule through "datang",
+    # so a decline or maybe match wins over an accept match
+    if DECLINED in matches and MAYBE not in matches:
+        return DECLINED, False
+    if MAYBE in matches and DECLINED not in matches:
+        return MAYBE, False
+    if matches == [ACCEPTED]:
+        return ACCEPTED, False
+    return None, bool(matches)
+
+
+class ReplyClassifier:
+    """Rules-first reply classifier with an optional LLM fallback"""
+
+    def __init__(self, model: Optional[str] = None, client=None):
+        self.model = model
+        self._client = client
+
+    async def classify(self, text: str, use_model: bool = True) -> Optional[str]:
+        """Return accepted, declined, maybe, or None if the reply is unrelated"""
+        status, ambiguous = classify_by_rules(text)
+        if status or not use_model or not self.model:
+            return status
+
+        if not ambiguous and len(text) > 500:
+            # Long messages without any RSVP wording are not replies
+            return None
+
+        return await self._classify_with_model(text)
+
+    async def _classify_with_model(self, text: str) -> Optional[str]:
+        try:
+            if self._client is None:
+                from google import genai
+                self._client = genai.Client()
+
+            response = await self._client.aio.models.generate_content(
+                model=self.model,
+                contents=MODEL_PROMPT.format(text=text),
+            )
+            answer = (response.text or "").strip().lower()
+        except Exception as e:
+            logger.error(f"RSVP model classification failed: {str(e)}")
+            return None
+
+        if answer in (ACCEPTED, DECLINED, MAYBE):
+            return answer
+        return None
@@ -0,0 +1,183 @@
+"""
+RSVP storage in PostgreSQL
+"""
+from datetime import datetime
+from typing import Optional
+
+from rsvp.models import PENDING
+
+
+class RsvpDatabase:
+    """Per-recipient RSVP status plus per-session status counters.
+
+    Counters in rsvp_counts are updated in the same transaction as the
+    recipient rows, so dashboards read a handful of rows instead of
+    aggregating every recipient.
+    """
+
+    def __init__(self):
+        self.pool = None
+
+    async def initialize(self, pool):
+        """Create RSVP tables using an existing connection pool"""
+        self.pool = pool
+
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS rsvp_recipients (
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    address TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    reply TEXT,
+                    invited_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    responded_at TIMESTAMPTZ,
+                    PRIMARY KEY (session_id, channel, address)
+                )
+            ''')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_rsvp_recipients_address
+                ON rsvp_recipients (channel, address, invited_at)
+            ''')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_rsvp_recipients_invited_at
+                ON rsvp_recipients (channel, invited_at)
+            ''')
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS rsvp_counts (
+                    session_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (session_id, status)
+                )
+            ''')
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS rsvp_cursors (
+                    source TEXT PRIMARY KEY,
+                    position BIGINT NOT NULL
+                )
+            ''')
+
+    async def add_recipients(self, session_id: str, user_id: str, channel: str, addresses: list[str]) -> int:
+        """Register invited recipients as pending; already known ones are kept as is"""
+        added = 0
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for address in addresses:
+                    inserted = await conn.fetchval('''
+                        INSERT INTO rsvp_recipients (session_id, user_id, channel, address)
+                        VALUES ($1, $2, $3, $4)
+                        ON CONFLICT DO NOTHING
+                        RETURNING 1
+                    ''', session_id, user_id, channel, address)
+                    if inserted:
+                        await self._increment(conn, session_id, PENDING, 1)
+                        added += 1
+        return added
+
+    async def get_invited_addresses(self, channel: str, since: Optional[datetime] = None) -> tuple[set[str], Optional[datetime]]:
+        """Addresses invited on a channel after since (all of them without it).
+
+        Returns:
+            The addresses and the latest invited_at among them (None if there are none)
+        """
+        async with self.pool.acquire() as conn:
+            if since is None:
+                rows = await conn.fetch('''
+                    SELECT address, MAX(invited_at) AS invited_at FROM rsvp_recipients
+                    WHERE channel = $1
+                    GROUP BY address
+                ''', channel)
+            else:
+                rows = await conn.fetch('''
+                    SELECT address, MAX(invited_at) AS invited_at FROM rsvp_recipients
+                    WHERE channel = $1 AND invited_at > $2
+                    GROUP BY address
+                ''', channel, since)
+        latest = max((row['invited_at'] for row in rows), default=None)
+        return {row['address'] for row in rows}, latest
+
+    async def get_status(self, channel: str, address: str, replied_at: datetime) -> Optional[str]:
+        """Status of the latest invitation a reply at replied_at can answer"""
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval('''
+                SELECT status FROM rsvp_recipients
+                WHERE channel = $1 AND address = $2 AND invited_at <= $3
+                ORDER BY invited_at DESC
+                LIMIT 1
+            ''', channel, address, replied_at)
+
+    async def record_reply(self, channel: str, address: str, status: str, reply: str, replied_at: datetime) -> bool:
+        """Apply a classified reply to the latest invitation sent to the address before it.
+
+        Returns:
+            True if a recipient's status changed
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow('''
+                    SELECT session_id, status FROM rsvp_recipients
+                    WHERE channel = $1 AND address = $2 AND invited_at <= $3
+                    ORDER BY invited_at DESC
+                    LIMIT 1
+                    FOR UPDATE
+                ''', channel, address, replied_at)
+
+                if not row:
+                    return False
+
+                await conn.execute('''
+                    UPDATE rsvp_recipients
+                    SET status = $4, reply = $5, responded_at = $6
+                    WHERE session_id = $1 AND channel = $2 AND address = $3
+                ''', row['session_id'], channel, address, status, reply, replied_at)
+
+                if row['status'] == status:
+                    return False
+
+                await self._increment(conn, row['session_id'], row['status'], -1)
+                await self._increment(conn, row['session_id'], status, 1)
+                return True
+
+    async def get_cursor(self, source: str) -> Optional[int]:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval('SELECT position FROM rsvp_cursors WHERE source = $1', source)
+
+    async def set_cursor(self, source: str, position: int):
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                INSERT INTO rsvp_cursors (source, position) VALUES ($1, $2)
+                ON CONFLICT (source) DO UPDATE SET position = EXCLUDED.position
+            ''', source, position)
+
+    async def get_counts(self, session_id: str) -> dict[str, int]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                'SELECT status, count FROM rsvp_counts WHERE session_id = $1',
+                session_id
+            )
+        return {row['status']: row['count'] for row in rows}
+
+    async def get_recipients(self, session_id: str) -> list[dict]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT channel, address, status, reply, invited_at, responded_at
+                FROM rsvp_recipients
+                WHERE session_id = $1
+                ORDER BY channel, address
+            ''', session_id)
+        return [dict(row) for row in rows]
+
+    async def delete_session(self, session_id: str):
+        """Remove RSVP data of a deleted session"""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute('DELETE FROM rsvp_recipients WHERE session_id = $1', session_id)
+                await conn.execute('DELETE FROM rsvp_counts WHERE session_id = $1', session_id)
+
+    async def _increment(self, conn, session_id: str, status: str, delta: int):
+        await conn.execute('''
+            INSERT INTO rsvp_counts (session_id, status, count) VALUES ($1, $2, $3)
+            ON CONFLICT (session_id, status) DO UPDATE SET count = rsvp_counts.count + EXCLUDED.count
+        ''', session_id, status, delta)
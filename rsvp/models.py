@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+PENDING = "pending"
+ACCEPTED = "accepted"
+DECLINED = "declined"
+MAYBE = "maybe"
+
+STATUSES = [PENDING, ACCEPTED, DECLINED, MAYBE]
+
+WHATSAPP = "whatsapp"
+EMAIL = "email"
+
+class Reply(BaseModel):
+    channel: str
+    address: str
+    text: str
+    replied_at: datetime
+    # Status already known from the reply itself (e.g. a calendar REPLY)
+    status: Optional[str] = None
@@ -0,0 +1,159 @@
+"""
+Incremental readers for invitation replies
+"""
+import email
+import imaplib
+import re
+import sqlite3
+from datetime import datetime, timezone
+from email.utils import parseaddr, parsedate_to_datetime
+from typing import Optional
+
+from rsvp.models import Reply, WHATSAPP, EMAIL, ACCEPTED, DECLINED, MAYBE
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PARTSTAT_STATUS = {
+    "ACCEPTED": ACCEPTED,
+    "DECLINED": DECLINED,
+    "TENTATIVE": MAYBE,
+}
+
+
+def normalize_phone(recipient: str) -> str:
+    """Reduce a phone number or WhatsApp JID to the digits the bridge stores as sender"""
+    return re.sub(r"\D", "", recipient.split("@")[0])
+
+
+class WhatsAppReplySource:
+    """Reads messages the WhatsApp bridge stored after a rowid high-water mark.
+
+    The bridge writes with INSERT OR REPLACE, so every new or updated message
+    gets a rowid above all earlier ones and a rowid range scan sees only new
+    rows.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 1000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+
+    def latest_position(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM messages").fetchone()[0]
+        finally:
+            conn.close()
+
+    def fetch(self, after: int, senders: set[str]) -> tuple[list[Reply], int]:
+        """Return incoming messages from senders after the cursor, and the new cursor"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT rowid, sender, content, timestamp, is_from_me
+                FROM messages
+                WHERE rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+            ''', (after, self.batch_size)).fetchall()
+        finally:
+            conn.close()
+
+        replies = []
+        position = after
+        for rowid, sender, content, timestamp, is_from_me in rows:
+            position = rowid
+            if is_from_me or not content or sender not in senders:
+                continue
+            replies.append(Reply(
+                channel=WHATSAPP,
+                address=sender,
+                text=content,
+                replied_at=datetime.fromisoformat(timestamp),
+            ))
+        return replies, position
+
+
+class EmailReplySource:
+    """Reads inbox messages after an IMAP UID high-water mark"""
+
+    def __init__(self, server: str, port: int, username: str, password: str, batch_size: int = 100):
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.batch_size = batch_size
+
+    def latest_position(self) -> int:
+        with self._connect() as imap:
+            _, data = imap.uid("SEARCH", None, "ALL")
+            uids = [int(uid) for uid in data[0].split()]
+            return max(uids) if uids else 0
+
+    def fetch(self, after: int, senders: set[str]) -> tuple[list[Reply], int]:
+        """Return replies from invited addresses after the cursor, and the new cursor"""
+        with self._connect() as imap:
+            _, data = imap.uid("SEARCH", None, f"UID {after + 1}:*")
+            # "n:*" always matches the newest message, even when its UID is below n
+            uids = sorted(int(uid) for uid in data[0].split() if int(uid) > after)[:self.batch_size]
+
+            replies = []
+            position = after
+            for uid in uids:
+                position = uid
+                _, message_data = imap.uid("FETCH", str(uid), "(BODY.PEEK[])")
+                raw = next((part[1] for part in message_data if isinstance(part, tuple)), None)
+                if raw is None:
+                    continue
+
+                reply = self._parse(email.message_from_bytes(raw))
+                if reply and reply.address in senders:
+                    replies.append(reply)
+            return replies, position
+
+    def _connect(self) -> imaplib.IMAP4_SSL:
+        imap = imaplib.IMAP4_SSL(self.server, self.port)
+        imap.login(self.username, self.password)
+        imap.select("INBOX", readonly=True)
+        return imap
+
+    def _parse(self, message) -> Optional[Reply]:
+        address = parseaddr(message.get("From", ""))[1].lower()
+        if not address:
+            return None
+
+        try:
+            replied_at = parsedate_to_datetime(message.get("Date"))
+        except (TypeError, ValueError):
+            replied_at = datetime.now(timezone.utc)
+        if replied_at.tzinfo is None:
+            replied_at = replied_at.replace(tzinfo=timezone.utc)
+
+        subject = message.get("Subject", "")
+        body = ""
+        status = None
+        for part in message.walk():
+            content_type = part.get_content_type()
+            if content_type == "text/calendar":
+                # Calendar clients answer the .ics invitation with a REPLY
+                calendar = part.get_payload(decode=True).decode(errors="ignore")
+                match = re.search(r"PARTSTAT[=:](ACCEPTED|DECLINED|TENTATIVE)", calendar)
+                if match:
+                    status = PARTSTAT_STATUS[match.group(1)]
+            elif content_type == "text/plain" and not body:
+                body = part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8", errors="ignore")
+
+        # Drop quoted text of the original invitation
+        lines = []
+        for line in body.splitlines():
+            if line.startswith(">") or re.match(r"^On .+ wrote:$", line.strip()):
+                break
+            lines.append(line)
+
+        return Reply(
+            channel=EMAIL,
+            address=address,
+            text=f"{subject}\n" + "\n".join(lines).strip(),
+            replied_at=replied_at,
+            status=status,
+        )
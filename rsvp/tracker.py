@@ -0,0 +1,134 @@
+"""
+RSVP tracker: records sent invitations and applies classified replies
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from rsvp.classifier import ReplyClassifier
+from rsvp.database import RsvpDatabase
+from rsvp.models import PENDING, WHATSAPP
+from rsvp.sources import normalize_phone
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# invited_at is the inserting transaction's start time, so a row can commit
+# after rows with later timestamps were read; re-read this much on each scan
+INVITED_OVERLAP = timedelta(minutes=5)
+
+
+class RsvpTracker:
+    """Scans reply sources incrementally and stores RSVP status per recipient.
+
+    Each source keeps a cursor in Postgres. On the first scan the cursor is
+    set to the source's newest message, so history from before tracking
+    started is never read, and later scans only read what arrived since.
+    Invited addresses are cached per channel the same way: the first scan
+    loads them all, later scans only the ones invited since.
+    """
+
+    def __init__(self, rsvp_db: RsvpDatabase, classifier: ReplyClassifier, sources: dict):
+        self.rsvp_db = rsvp_db
+        self.classifier = classifier
+        self.sources = sources
+        self._task: Optional[asyncio.Task] = None
+        self._invited: dict[str, set[str]] = {}
+        self._invited_until: dict[str, Optional[datetime]] = {}
+
+    async def record_invitations(self, session_id: str, user_id: str, channel: str, recipients: list[str]):
+        """Register recipients of a successfully sent invitation"""
+        if channel == WHATSAPP:
+            addresses = [normalize_phone(r) for r in recipients if not r.endswith("@g.us")]
+        else:
+            addresses = [r.strip().lower() for r in recipients]
+        addresses = [a for a in addresses if a]
+
+        if addresses:
+            added = await self.rsvp_db.add_recipients(session_id, user_id, channel, addresses)
+            self._invited.setdefault(channel, set()).update(addresses)
+            logger.info(f"Tracking RSVP for {added} new {channel} recipient(s) in session {session_id}")
+
+    async def scan_once(self) -> int:
+        """Scan every source once and return the number of status changes"""
+        changed = 0
+        for name, source in self.sources.items():
+            try:
+                changed += await self._scan_source(name, source)
+            except Exception as e:
+                logger.error(f"RSVP scan of {name} failed: {str(e)}")
+        return changed
+
+    async def scan_exclusive(self) -> int:
+        """Scan once unless another backend process is scanning already"""
+        async with self.rsvp_db.pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext('rsvp_scan'))"):
+                return 0
+            try:
+                return await self.scan_once()
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext('rsvp_scan'))")
+
+    async def run(self, interval: float):
+        while True:
+            changed = await self.scan_exclusive()
+            if changed:
+                logger.info(f"RSVP scan updated {changed} recipient(s)")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float):
+        self._task = asyncio.create_task(self.run(interval))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _scan_source(self, name: str, source) -> int:
+        cursor = await self.rsvp_db.get_cursor(name)
+        if cursor is None:
+            cursor = await asyncio.to_thread(source.latest_position)
+            await self.rsvp_db.set_cursor(name, cursor)
+            return 0
+
+        senders = await self._invited_addresses(name)
+        changed = 0
+        while True:
+            replies, position = await asyncio.to_thread(source.fetch, cursor, senders)
+            for reply in replies:
+                if await self._apply(reply):
+                    changed += 1
+
+            if position == cursor:
+                break
+            cursor = position
+            await self.rsvp_db.set_cursor(name, cursor)
+        return changed
+
+    async def _invited_addresses(self, channel: str) -> set[str]:
+        """Cached invited addresses of a channel, topped up with new invitations"""
+        until = self._invited_until.get(channel)
+        since = until - INVITED_OVERLAP if until else None
+        addresses, latest = await self.rsvp_db.get_invited_addresses(channel, since)
+        self._invited.setdefault(channel, set()).update(addresses)
+        if latest and (until is None or latest > until):
+            self._invited_until[channel] = latest
+        return self._invited[channel]
+
+    async def _apply(self, reply) -> bool:
+        current = await self.rsvp_db.get_status(reply.channel, reply.address, reply.replied_at)
+        if current is None:
+            return False
+
+        status = reply.status
+        if status is None:
+            # Only pay for a model call on the first answer to an invitation;
+            # later chatter with the same contact must match a rule to count
+            status = await self.classifier.classify(reply.text, use_model=current == PENDING)
+        if status is None:
+            return False
+
+        return await self.rsvp_db.record_reply(reply.channel, reply.address, status, reply.text, reply.replied_at)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import AnyHttpUrl, BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -19,16 +19,34 @@ class EmailModel(BaseModel):
     subject: str = ""
     body: str = ""
     email_recipients: list[str] = []
+    attachments: list[str] = []
+    confirmed: bool = False  # Approved by the user, waiting for send_invitations
+
+class WhatsAppModel(BaseModel):
+    message: str = ""
+    recipients: list[str] = []  # Phone numbers or JIDs
+    confirmed: bool = False  # Approved by the user, waiting for send_invitations
 
 class ChatRequest(BaseModel):
     message: str
     user_id: str = ""
     session_id: Optional[str] = None
+    bypass_cache: bool = False  # Write fresh drafts instead of reusing cached ones
+    webhook_url: Optional[AnyHttpUrl] = None  # Called with the result of an async job
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
 
+class JobResponse(BaseModel):
+    job_id: str
+    session_id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    response: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 class SessionInfo(BaseModel):
     session_id: str
     created_at: datetime
@@ -45,4 +63,17 @@ class ChatMessage(BaseModel):
 
 class ChatHistoryResponse(BaseModel):
     messages: list[ChatMessage]
-    session_id: str
\ No newline at end of file
+    session_id: str
+
+class RsvpRecipient(BaseModel):
+    channel: str  # "whatsapp" or "email"
+    address: str
+    status: str  # "pending", "accepted", "declined" or "maybe"
+    reply: Optional[str] = None
+    invited_at: datetime
+    responded_at: Optional[datetime] = None
+
+class RsvpResponse(BaseModel):
+    session_id: str
+    counts: dict[str, int]
+    recipients: list[RsvpRecipient]
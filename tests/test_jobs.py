@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from jobs.webhooks import WebhookRejected, resolve_webhook
+from jobs.worker import JobWorkerPool
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://localhost:8000/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+])
+def test_webhook_rejects_internal_addresses(url):
+    with pytest.raises(WebhookRejected):
+        asyncio.run(resolve_webhook(url))
+
+
+def test_webhook_pins_public_address():
+    target = asyncio.run(resolve_webhook("https://user:pw@8.8.8.8/hook?x=1"))
+    assert target.url == "https://8.8.8.8:443/hook?x=1"
+    assert target.host_header == "8.8.8.8"
+
+
+def test_webhook_allowlist():
+    target = asyncio.run(resolve_webhook("http://127.0.0.1:9000/hook", ["127.0.0.1"]))
+    assert target.url == "http://127.0.0.1:9000/hook"
+    assert target.host_header == "127.0.0.1:9000"
+
+    with pytest.raises(WebhookRejected):
+        asyncio.run(resolve_webhook("https://8.8.8.8/hook", ["hooks.example.com"]))
+
+
+class FakeJobDatabase:
+    def __init__(self):
+        self.sweeps = 0
+
+    async def claim(self):
+        return None
+
+    async def fail_stale(self, older_than_seconds):
+        self.sweeps += 1
+        return 0
+
+
+def test_stale_jobs_are_swept_while_running():
+    async def run():
+        job_db = FakeJobDatabase()
+        pool = JobWorkerPool(job_db, handler=None, workers=1, poll_interval=0.01, stale_after=0.02)
+        await pool.start()
+        await asyncio.sleep(0.1)
+        await pool.stop()
+        return job_db.sweeps
+
+    assert asyncio.run(run()) > 2
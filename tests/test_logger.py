@@ -0,0 +1,41 @@
+import io
+import json
+import logging
+
+from utils.logger import ContextQueueHandler, JsonFormatter, TextFormatter, log_context
+
+
+def log_exception(formatter: logging.Formatter) -> str:
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(formatter)
+    handler = ContextQueueHandler(None)
+    handler.enqueue = target.handle
+
+    logger = logging.getLogger("tests.logger")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        with log_context(session_id="s1"):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("Failed %s", "turn")
+    finally:
+        logger.removeHandler(handler)
+    return stream.getvalue()
+
+
+def test_json_records_keep_the_exception():
+    entry = json.loads(log_exception(JsonFormatter()))
+    assert entry["message"] == "Failed turn"
+    assert entry["session_id"] == "s1"
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_text_records_keep_the_exception():
+    output = log_exception(TextFormatter())
+    assert output.startswith("Failed turn\nTraceback")
+    assert output.endswith("[session_id=s1]\n")
+    assert output.count("ValueError: boom") == 1
+
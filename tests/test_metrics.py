@@ -0,0 +1,60 @@
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from utils.metrics import TurnMetrics, registry
+from utils.model_policy import ModelPolicy
+from utils.utils import call_agent_async
+
+FLASH = "gemini-2.5-flash"
+MODEL_SECONDS = 0.05
+
+
+class SlowLlm(BaseLlm):
+    model: str = FLASH
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(MODEL_SECONDS)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="Done.")]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=10, candidates_token_count=2),
+        )
+
+
+async def slow_preparation(callback_context, llm_request):
+    # Work before the call, e.g. another callback, is not model latency
+    await asyncio.sleep(2 * MODEL_SECONDS)
+    return None
+
+
+async def run_turn(name: str, policy: ModelPolicy = None) -> TurnMetrics:
+    callbacks = dict(before_model_callback=[slow_preparation, policy.before_model], after_model_callback=policy.after_model) if policy else {}
+    agent = LlmAgent(name=name, model=SlowLlm(), instruction="Answer.", **callbacks)
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="user")
+    metrics = TurnMetrics(session_id=session.id, user_id="user")
+    await call_agent_async(runner, "user", session.id, "hello", metrics)
+    return metrics
+
+
+def test_model_call_seconds_measures_the_call_only():
+    # No models configured: the call is labelled with the agent's own model
+    metrics = asyncio.run(run_turn("timed_agent", ModelPolicy({})))
+
+    latency = registry.quantile("model_call_seconds", 0.5, agent="timed_agent", model=FLASH, turn_type="default")
+    assert latency is not None
+    assert MODEL_SECONDS <= latency < 2 * MODEL_SECONDS
+    assert [sample["model"] for sample in metrics.samples if sample["kind"] == "model"] == [FLASH]
+
+
+def test_calls_without_policy_metadata_use_the_configured_model():
+    metrics = asyncio.run(run_turn("plain_agent"))
+
+    assert [sample["model"] for sample in metrics.samples if sample["kind"] == "model"] == [FLASH]
+    assert registry.quantile("model_call_seconds", 0.5, agent="plain_agent", model="unknown", turn_type="default") is None
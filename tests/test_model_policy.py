@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.cache_metadata import CacheMetadata
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from utils.model_policy import ModelPolicy
+
+FLASH = "gemini-2.5-flash"
+LITE = "gemini-2.5-flash-lite"
+
+
+class CachingLlm(BaseLlm):
+    """Answers every call and, like Gemini, creates caches that belong to the request's model"""
+
+    model: str = FLASH
+    calls: list = []
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        cache = llm_request.cache_metadata
+        self.calls.append((llm_request.model, cache.cache_name if cache else None))
+        if cache is None:
+            cache = CacheMetadata(
+                cache_name=f"cachedContents/{llm_request.model}/{len(self.calls)}",
+                expire_time=time.time() + 600,
+                fingerprint="static",
+                invocations_used=1,
+                cached_contents_count=0,
+            )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="Done.")]),
+            cache_metadata=cache,
+        )
+
+
+async def run_turns(messages: list[str]) -> list:
+    llm = CachingLlm(calls=[])
+    policy = ModelPolicy({"invitation_agent": {"default": FLASH, "confirm": LITE}})
+    agent = LlmAgent(
+        name="invitation_agent",
+        model=llm,
+        instruction="Help the user send invitations.",
+        before_model_callback=policy.before_model,
+        after_model_callback=policy.after_model,
+    )
+    runner = Runner(
+        app=App(name="test", root_agent=agent, context_cache_config=ContextCacheConfig(min_tokens=0)),
+        session_service=InMemorySessionService(),
+    )
+    session = await runner.session_service.create_session(app_name="test", user_id="user")
+    for message in messages:
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=content):
+            pass
+    return llm.calls
+
+
+def test_routed_calls_only_reuse_caches_of_their_model():
+    calls = asyncio.run(run_turns([
+        "Birthday party on Saturday at 7 PM",
+        "yes, send it",
+        "Change the time to 8 PM",
+        "ok",
+    ]))
+
+    assert [model for model, _ in calls] == [FLASH, LITE, FLASH, LITE]
+    for model, cache_name in calls:
+        if cache_name:
+            assert cache_name.startswith(f"cachedContents/{model}/")
+    # Each model keeps reusing its own cache
+    assert calls[2][1] == f"cachedContents/{FLASH}/1"
+    assert calls[3][1] == f"cachedContents/{LITE}/2"
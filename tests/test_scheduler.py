@@ -0,0 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from utils.scheduler import SchedulerBusy, TurnScheduler
+
+
+async def run_turn(scheduler: TurnScheduler, session_id: str, release: asyncio.Event, user_id: str = "u1"):
+    async with scheduler.slot(user_id, session_id):
+        await release.wait()
+
+
+def test_turns_waiting_for_their_session_are_bounded():
+    async def run():
+        scheduler = TurnScheduler(max_concurrent=4, max_per_user=4, max_queued=2)
+        release = asyncio.Event()
+        running = asyncio.create_task(run_turn(scheduler, "s1", release))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(run_turn(scheduler, "s1", release)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SchedulerBusy):
+            await run_turn(scheduler, "s1", release)
+
+        release.set()
+        await asyncio.gather(running, *waiting)
+        assert scheduler._queued == 0
+
+    asyncio.run(run())
+
+
+class SessionHeldElsewhere:
+    """Advisory lock pool whose session lock is busy for the first `busy` tries"""
+
+    def __init__(self, busy: int):
+        self.busy = busy
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetchval(self, query, session_id):
+        self.busy -= 1
+        return self.busy < 0
+
+    async def execute(self, query, session_id):
+        pass
+
+
+def test_turn_gives_its_slot_back_while_session_runs_elsewhere():
+    async def run():
+        scheduler = TurnScheduler(max_concurrent=1, max_per_user=1, lock_poll_interval=0.01)
+        scheduler.pool = SessionHeldElsewhere(busy=3)
+        release = asyncio.Event()
+        blocked = asyncio.create_task(run_turn(scheduler, "s1", release))
+        await asyncio.sleep(0.005)
+        assert scheduler._active == 0
+
+        # Another session on this worker gets the only slot meanwhile
+        scheduler.pool = SessionHeldElsewhere(busy=0)
+        other = asyncio.Event()
+        other.set()
+        await run_turn(scheduler, "s2", other, user_id="u2")
+
+        release.set()
+        await blocked
+
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.sessions.state import State
+
+from invitation_agent.draft_cache import draft_cache
+from invitation_agent.speculation import DraftSpeculator, draft_key
+from rsvp.models import EMAIL
+
+INVITATION_INFO = {
+    "agenda_name": "Rapat Koordinasi Q4",
+    "location": "Ruang Meeting Lt. 3",
+    "scheduled_at": "2025-11-14 10:00",
+    "recipients": ["Andi", "Sari"],
+    "tone": "formal",
+}
+USER_CONTEXT = {"full_name": "Budi Santoso", "username": "budi"}
+DRAFT = {"subject": "Undangan Rapat Koordinasi Q4", "body": "Dengan hormat, ..."}
+
+
+def callback_context() -> SimpleNamespace:
+    state = State({"invitation_info": INVITATION_INFO, "user_context": USER_CONTEXT, EMAIL: {}}, {})
+    return SimpleNamespace(state=state)
+
+
+async def serve_draft(speculator: DraftSpeculator, bypass: bool):
+    with draft_cache.bypass(bypass):
+        return await speculator.serve(EMAIL)(callback_context(), LlmRequest())
+
+
+def speculator_with_draft() -> DraftSpeculator:
+    speculator = DraftSpeculator()
+    speculator.register(EMAIL, "Write invitation emails.", "gemini-2.5-flash")
+    return speculator
+
+
+def test_bypass_skips_in_process_draft():
+    async def run():
+        speculator = speculator_with_draft()
+        ready = asyncio.get_running_loop().create_future()
+        ready.set_result(DRAFT)
+        speculator._drafts[(EMAIL, draft_key(INVITATION_INFO, USER_CONTEXT))] = ready
+        return await serve_draft(speculator, bypass=True), await serve_draft(speculator, bypass=False)
+
+    bypassed, served = asyncio.run(run())
+    assert bypassed is None
+    assert DRAFT["subject"] in served.content.parts[0].text
+
+
+def test_bypass_skips_shared_cache():
+    async def run():
+        speculator = speculator_with_draft()
+        draft_cache._remember(speculator._cache_key(EMAIL, INVITATION_INFO, USER_CONTEXT), DRAFT, time.time())
+        return await serve_draft(speculator, bypass=True), await serve_draft(speculator, bypass=False)
+
+    bypassed, served = asyncio.run(run())
+    assert bypassed is None
+    assert DRAFT["subject"] in served.content.parts[0].text
@@ -0,0 +1,37 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same target as benchmarks/bench_import_time.py; agents load in the lifespan
+STARTUP_TARGET_SECONDS = 1.5
+DEFERRED_MODULES = ["google.adk", "icalendar"]
+
+SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import backend
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "loaded": [m for m in {DEFERRED_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def import_backend() -> dict:
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", SCRIPT],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_backend_imports_within_startup_target():
+    runs = [import_backend() for _ in range(3)]
+    assert all(run["loaded"] == [] for run in runs), runs[0]["loaded"]
+    assert statistics.median(run["seconds"] for run in runs) < STARTUP_TARGET_SECONDS
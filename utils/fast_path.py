@@ -0,0 +1,153 @@
+import asyncio
+import re
+import uuid
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Optional
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from invitation_agent.tools import reset_invitation_info
+from invitation_agent.sub_agents.email_agent.tools import send_mail, reset_email_state
+from invitation_agent.sub_agents.whatsapp_agent.tools import reset_whatsapp_state
+from rsvp.callbacks import report_sent_invitation
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Structured commands, matched against the whole message (an optional leading
+# "/" is allowed). Anything else goes to the agent.
+INTENTS = {
+    "reset": re.compile(r"^/?(reset|start over|new invitation|clear invitation)[.!]?$", re.IGNORECASE),
+    "show": re.compile(r"^/?(show|show (my |the )?(current )?invitation( info)?|what'?s my invitation)[.?!]?$", re.IGNORECASE),
+    "resend": re.compile(r"^/?(resend|resend (the |my )?(last )?email)[.!]?$", re.IGNORECASE),
+    "sessions": re.compile(r"^/?(sessions|list (my )?sessions)[.?!]?$", re.IGNORECASE),
+}
+
+INVITATION_LABELS = {
+    "agenda_name": "Event",
+    "location": "Location",
+    "scheduled_at": "Date & time",
+    "notes": "Notes",
+    "recipients": "Recipients",
+    "tone": "Tone",
+}
+
+
+def match_intent(message: str) -> Optional[str]:
+    """Return the structured intent a message asks for, or None"""
+    text = message.strip()
+    for intent, pattern in INTENTS.items():
+        if pattern.match(text):
+            return intent
+    return None
+
+
+def format_invitation_info(invitation_info: dict) -> str:
+    """Format invitation_info for the user, leaving out empty fields"""
+    lines = []
+    for field, label in INVITATION_LABELS.items():
+        value = invitation_info.get(field)
+        if not value:
+            continue
+        if isinstance(value, list):
+            value = ", ".join(value)
+        lines.append(f"- **{label}:** {value}")
+
+    if not lines:
+        return "You don't have any invitation details yet. Tell me about the event you'd like to invite people to!"
+    return "Here is your current invitation:\n\n" + "\n".join(lines)
+
+
+class FastPathRouter:
+    """Handles structured commands without calling the model.
+
+    Commands reuse the agents' tool functions and are written to the session
+    as a user event and an invitation_agent event carrying the state delta,
+    so the conversation history and state look the same as after an agent
+    turn.
+    """
+
+    def __init__(self, session_service, app_name: str, list_sessions: Callable[[str], Awaitable[list]]):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.list_sessions = list_sessions
+
+    async def handle(self, user_id: str, session_id: str, message: str) -> Optional[str]:
+        """Run a structured command and return its reply, or None to use the agent"""
+        intent = match_intent(message)
+        if not intent:
+            return None
+
+        session = await self.session_service.get_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
+        if not session:
+            return None
+
+        logger.info(f"Fast path: {intent} for session {session_id}")
+        state_delta = {}
+
+        if intent == "reset":
+            tool_context = SimpleNamespace(state=state_delta)
+            reset_invitation_info(tool_context)
+            reset_email_state(tool_context)
+            reset_whatsapp_state(tool_context)
+            state_delta["last_sent_email"] = None
+            response = "I've cleared your invitation details. What event would you like to invite people to?"
+
+        elif intent == "show":
+            response = format_invitation_info(session.state.get("invitation_info") or {})
+
+        elif intent == "resend":
+            response = await self._resend_email(session)
+            if response is None:
+                return None
+
+        else:
+            sessions = await self.list_sessions(user_id)
+            if not sessions:
+                response = "You don't have any saved sessions yet."
+            else:
+                lines = [
+                    f"- {s.preview or 'Untitled invitation'} (last updated {s.updated_at:%Y-%m-%d %H:%M})"
+                    for s in sessions
+                ]
+                response = "Here are your sessions:\n\n" + "\n".join(lines)
+
+        await self._append_turn(session, message, response, state_delta)
+        return response
+
+    async def _resend_email(self, session) -> Optional[str]:
+        """Send the last delivered email again; None lets the agent handle the request"""
+        # Only an email send_invitations delivered, never an unreviewed draft
+        sent = session.state.get("last_sent_email")
+        if not sent or not sent.get("receiver"):
+            return None
+
+        args = {
+            "receiver": sent["receiver"],
+            "subject": sent.get("subject", ""),
+            "body": sent.get("body", ""),
+            "attachments": sent.get("attachments") or None,
+        }
+        result = await asyncio.to_thread(send_mail, **args)
+        await report_sent_invitation(session.id, session.user_id, "send_mail", args, result)
+        return result
+
+    async def _append_turn(self, session, message: str, response: str, state_delta: dict):
+        invocation_id = f"e-{uuid.uuid4()}"
+
+        await self.session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=types.Content(role="user", parts=[types.Part(text=message)]),
+        ))
+        await self.session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author="invitation_agent",
+            content=types.Content(role="model", parts=[types.Part(text=response)]),
+            actions=EventActions(state_delta=state_delta),
+        ))
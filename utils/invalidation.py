@@ -0,0 +1,93 @@
+"""
+Cross-process invalidation of in-memory caches with PostgreSQL LISTEN/NOTIFY
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable, Optional
+
+import asyncpg
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CacheInvalidator:
+    """Tells the other backend processes which cached keys changed.
+
+    Each process listens on one dedicated connection. A cache subscribes a
+    callback to a channel and publishes the keys it changes; every other
+    process then calls the callback with the key. When the listening
+    connection is lost, notifications may have been missed, so callbacks
+    are called with None (drop everything) once it is back.
+    """
+
+    def __init__(self):
+        self.origin: Optional[str] = None
+        self.pool = None
+        self._db_url: Optional[str] = None
+        self._conn: Optional[asyncpg.Connection] = None
+        self._subscribers: dict[str, list[Callable[[Optional[str]], None]]] = {}
+        self._reconnect: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, callback: Callable[[Optional[str]], None]):
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    async def initialize(self, db_url: str, pool):
+        """Start listening; `pool` is used to publish"""
+        # Set here rather than at import, so forked workers get their own
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._db_url = db_url
+        self.pool = pool
+        await self._listen()
+
+    async def close(self):
+        if self._reconnect:
+            self._reconnect.cancel()
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+
+    async def publish(self, channel: str, key: str):
+        if not self.pool:
+            return
+        payload = json.dumps({"origin": self.origin, "key": key})
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+        except Exception as e:
+            logger.error(f"Failed to publish invalidation on {channel}: {str(e)}")
+
+    async def _listen(self):
+        self._conn = await asyncpg.connect(self._db_url)
+        self._conn.add_termination_listener(self._on_terminated)
+        for channel in self._subscribers:
+            await self._conn.add_listener(channel, self._on_notification)
+
+    def _on_notification(self, conn, pid, channel: str, payload: str):
+        message = json.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        for callback in self._subscribers.get(channel, []):
+            callback(message["key"])
+
+    def _on_terminated(self, conn):
+        logger.warning("Cache invalidation connection lost, reconnecting")
+        self._reconnect = asyncio.create_task(self._relisten())
+
+    async def _relisten(self, interval: float = 5.0):
+        while True:
+            try:
+                await self._listen()
+                break
+            except Exception as e:
+                logger.error(f"Cache invalidation reconnect failed: {str(e)}")
+                await asyncio.sleep(interval)
+
+        for callbacks in self._subscribers.values():
+            for callback in callbacks:
+                callback(None)
+
+
+invalidator = CacheInvalidator()
@@ -1,14 +1,130 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import queue
+import random
 import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-def setup_logger(name: str = None, level: int = logging.INFO) -> logging.Logger:
+from config import config
+
+# Session and user of the turn being run, added to every record logged in it
+_log_context: contextvars.ContextVar[dict] = contextvars.ContextVar("log_context", default={})
+
+# Records are written to stdout and log files by one listener thread per
+# destination, so a slow terminal or disk never blocks the event loop
+_listeners: dict[str, QueueListener] = {}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@contextmanager
+def log_context(**fields):
+    """Add fields such as session_id and user_id to the records logged inside the block"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def sampled(rate: float = None) -> bool:
+    """Whether to emit a high-volume debug record, e.g. one per agent event"""
+    rate = config.logging.EVENT_SAMPLE_RATE if rate is None else rate
+    return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the fields set by log_context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic text format, with the log_context fields appended"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        context = getattr(record, "context", None)
+        if context:
+            message += " [" + " ".join(f"{key}={value}" for key, value in context.items()) + "]"
+        return message
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queue handler that captures the log_context of the calling task.
+
+    The context has to be read here, in the caller, since the listener
+    thread formatting the record does not see the caller's context vars.
+    Formatting is left to the listener: QueueHandler.prepare() would format
+    the record on the calling thread and drop exc_info, which loses the
+    JSON "exception" field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Merge the arguments now, while they still hold their logged values
+        record.msg = record.getMessage()
+        record.args = None
+        record.context = _log_context.get()
+        return record
+
+
+def _formatter() -> logging.Formatter:
+    if config.logging.FORMAT == "json":
+        return JsonFormatter()
+    return TextFormatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+
+def _queue_handler(destination: str, create_handler) -> QueueHandler:
+    """Return a queue handler feeding the listener of `destination`, starting it on first use"""
+    listener = _listeners.get(destination)
+    if listener is None:
+        handler = create_handler()
+        handler.setFormatter(_formatter())
+        listener = QueueListener(queue.SimpleQueue(), handler, respect_handler_level=True)
+        listener.start()
+        _listeners[destination] = listener
+    queue_handler = ContextQueueHandler(listener.queue)
+    queue_handler.destination = destination
+    return queue_handler
+
+
+def stop_listeners():
+    """Flush queued records and stop the listener threads"""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+atexit.register(stop_listeners)
+
+
+def setup_logger(name: str = None, level: int = None) -> logging.Logger:
     """
     Setup and configure a centralized logger for the invitation-agent project.
 
+    Records are put on a queue and written to stdout by a listener thread.
+
     Args:
         name: Logger name (typically __name__ from the calling module)
-        level: Logging level (default: INFO)
+        level: Logging level (default: LOG_LEVEL, INFO unless set)
 
     Returns:
         Configured logger instance
@@ -19,20 +135,8 @@ def setup_logger(name: str = None, level: int = logging.INFO) -> logging.Logger:
     if logger.handlers:
         return logger
 
-    logger.setLevel(level)
-
-    # Console handler with formatting
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-
-    # Detailed formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-
-    logger.addHandler(console_handler)
+    logger.setLevel(level if level is not None else config.logging.LEVEL)
+    logger.addHandler(_queue_handler("stdout", lambda: logging.StreamHandler(sys.stdout)))
 
     # Prevent propagation to root logger to avoid duplicate logs
     logger.propagate = False
@@ -40,13 +144,13 @@ def setup_logger(name: str = None, level: int = logging.INFO) -> logging.Logger:
     return logger
 
 
-def setup_file_logger(name: str = None, level: int = logging.INFO, log_file: str = "invitation-agent.log") -> logging.Logger:
+def setup_file_logger(name: str = None, level: int = None, log_file: str = "invitation-agent.log") -> logging.Logger:
     """
     Setup logger with both console and file output.
 
     Args:
         name: Logger name (typically __name__ from the calling module)
-        level: Logging level (default: INFO)
+        level: Logging level (default: LOG_LEVEL, INFO unless set)
         log_file: Path to log file (default: invitation-agent.log)
 
     Returns:
@@ -55,22 +159,11 @@ def setup_file_logger(name: str = None, level: int = logging.INFO, log_file: str
     logger = setup_logger(name, level)
 
     # Check if file handler already exists
-    has_file_handler = any(isinstance(h, logging.FileHandler) for h in logger.handlers)
-    if has_file_handler:
+    log_path = str(Path(log_file).resolve())
+    if any(getattr(h, "destination", None) == log_path for h in logger.handlers):
         return logger
 
-    # File handler
-    log_path = Path(log_file)
-    file_handler = logging.FileHandler(log_path, encoding='utf-8')
-    file_handler.setLevel(level)
-
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    file_handler.setFormatter(formatter)
-
-    logger.addHandler(file_handler)
+    logger.addHandler(_queue_handler(log_path, lambda: logging.FileHandler(log_path, encoding='utf-8')))
 
     return logger
 
@@ -0,0 +1,136 @@
+"""
+Warm, shared MCP client sessions with a cached tool list
+"""
+import asyncio
+import itertools
+from typing import Optional, Union
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager, SseConnectionParams, StreamableHTTPConnectionParams, retry_on_closed_resource
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+from google.adk.tools.tool_context import ToolContext
+from mcp import ClientSession
+from mcp.types import CallToolRequest, CallToolRequestParams, CallToolResult, ClientRequest, ListToolsResult
+from opentelemetry.trace import SpanKind
+
+from utils.logger import setup_logger
+from utils.metrics import registry
+from utils.tracing import inject_context, tracer
+
+logger = setup_logger(__name__)
+
+registry.describe("mcp_reconnects_total", "counter", "MCP client sessions reopened after a failed health check")
+
+
+class McpSessionPool:
+    """A fixed number of MCP client sessions shared by every user.
+
+    Sessions are opened at startup and checked with a ping every
+    health_check_interval seconds; a session that fails is closed and
+    reopened. The tool list is fetched once and kept until a session is
+    reopened, since the server may have been restarted with other tools.
+
+    Used in place of ADK's MCPSessionManager by the tools of
+    PooledMcpToolset, which hands out the sessions round-robin.
+    """
+
+    def __init__(self, connection_params: Union[SseConnectionParams, StreamableHTTPConnectionParams],
+                 size: int = 2, health_check_interval: float = 30.0):
+        self.connection_params = connection_params
+        self.health_check_interval = health_check_interval
+        self._managers = [MCPSessionManager(connection_params) for _ in range(size)]
+        self._next = itertools.cycle(range(size))
+        self._tools: Optional[ListToolsResult] = None
+        self._tools_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def create_session(self, headers: Optional[dict] = None) -> ClientSession:
+        """Return a pooled session, reconnecting it if it was disconnected"""
+        return await self._managers[next(self._next)].create_session(headers)
+
+    async def list_tools(self) -> ListToolsResult:
+        if self._tools is None:
+            async with self._tools_lock:
+                if self._tools is None:
+                    session = await self.create_session()
+                    self._tools = await session.list_tools()
+        return self._tools
+
+    async def start(self):
+        """Open every session and fetch the tool list, then start health checks"""
+        try:
+            await asyncio.gather(*(manager.create_session() for manager in self._managers))
+            tools = await self.list_tools()
+            logger.info(f"MCP pool connected to {self.connection_params.url} with {len(tools.tools)} tool(s)")
+        except Exception as e:
+            # The server may come up later; sessions are opened on first use then
+            logger.warning(f"MCP server {self.connection_params.url} not reachable at startup: {str(e)}")
+        self._health_task = asyncio.create_task(self._check_health())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        for manager in self._managers:
+            await manager.close()
+
+    async def _check_health(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for manager in self._managers:
+                try:
+                    session = await manager.create_session()
+                    await asyncio.wait_for(session.send_ping(), timeout=self.connection_params.timeout)
+                except Exception as e:
+                    logger.warning(f"MCP session health check failed, reconnecting: {str(e)}")
+                    registry.inc("mcp_reconnects_total")
+                    self._tools = None
+                    await manager.close()
+
+
+class TracedMcpTool(MCPTool):
+    """MCPTool that sends the current trace context in the request's _meta.
+
+    SSE connections are shared, so the context cannot travel as HTTP
+    headers; the WhatsApp MCP server reads it from params._meta instead.
+    """
+
+    @retry_on_closed_resource
+    async def _run_async_impl(self, *, args, tool_context: ToolContext, credential):
+        headers = await self._get_headers(tool_context, credential)
+        session = await self._mcp_session_manager.create_session(headers=headers)
+
+        with tracer.start_as_current_span(f"mcp.call_tool {self.name}", kind=SpanKind.CLIENT,
+                                          attributes={"mcp.tool": self.name}):
+            request = CallToolRequest(params=CallToolRequestParams(
+                name=self._mcp_tool.name,
+                arguments=args,
+                _meta=inject_context(),
+            ))
+            return await session.send_request(ClientRequest(request), CallToolResult)
+
+
+class PooledMcpToolset(BaseToolset):
+    """MCP tools backed by a shared McpSessionPool instead of a session per toolset"""
+
+    def __init__(self, pool: McpSessionPool, tool_filter: Optional[list[str]] = None):
+        super().__init__(tool_filter=tool_filter)
+        self.pool = pool
+        self._tools: list[MCPTool] = []
+        self._tools_source: Optional[ListToolsResult] = None
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[BaseTool]:
+        tools_response = await self.pool.list_tools()
+        if tools_response is not self._tools_source:
+            self._tools = [TracedMcpTool(mcp_tool=tool, mcp_session_manager=self.pool) for tool in tools_response.tools]
+            self._tools_source = tools_response
+        return [tool for tool in self._tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self) -> None:
+        # The pool is shared and closed by its owner
+        pass
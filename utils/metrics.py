@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+QUANTILES = (0.5, 0.95)
+
+
+class MetricsRegistry:
+    """In-process counters and summaries rendered in Prometheus text format.
+
+    Summaries keep a bounded window of recent samples per label set and
+    report p50/p95 over that window together with lifetime _sum and _count.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str]] = {}
+        self._counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._samples: dict[str, dict[tuple, deque]] = defaultdict(dict)
+        self._sums: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._counts: dict[str, dict[tuple, int]] = defaultdict(lambda: defaultdict(int))
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[name][key] += value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._samples[name].get(key)
+            if samples is None:
+                samples = self._samples[name][key] = deque(maxlen=self.window)
+            samples.append(value)
+            self._sums[name][key] += value
+            self._counts[name][key] += 1
+
+    def quantile(self, name: str, q: float, **labels) -> Optional[float]:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = sorted(self._samples.get(name, {}).get(key, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(key)} {value}")
+
+            for name, series in sorted(self._samples.items()):
+                self._header(lines, name, "summary")
+                for key, samples in sorted(series.items()):
+                    ordered = sorted(samples)
+                    for q in QUANTILES:
+                        value = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+                        lines.append(f"{name}{_labels(key + (('quantile', str(q)),))} {value}")
+                    lines.append(f"{name}_sum{_labels(key)} {self._sums[name][key]}")
+                    lines.append(f"{name}_count{_labels(key)} {self._counts[name][key]}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list, name: str, default_kind: str):
+        kind, help_text = self._help.get(name, (default_kind, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for k, v in key
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# Shared registry for the backend process
+registry = MetricsRegistry()
+registry.describe("agent_turn_seconds", "summary", "Wall-clock duration of a full agent turn")
+registry.describe("agent_event_seconds", "summary", "Time from the previous event to an event, by authoring agent")
+registry.describe("agent_tokens_total", "counter", "Model tokens by agent and token type (prompt, cached part of prompt, candidates)")
+registry.describe("agent_transfers_total", "counter", "Agent transfers by source and target agent")
+registry.describe("tool_seconds", "summary", "Tool execution time from function call to function response")
+registry.describe("model_call_seconds", "summary", "Model call latency from request to response, by agent, model and turn type")
+registry.describe("model_tokens_total", "counter", "Model tokens by model, turn type and token type")
+registry.describe("tool_tokens_total", "counter", "Model tokens of the calls that invoked a tool, split between the tools of one call, by token type")
+
+
+def configured_models(agent, parent_model: Optional[str] = None) -> dict[str, str]:
+    """Model name of every agent in the tree, by agent name; agents without one use their parent's"""
+    model = getattr(agent, "model", None)
+    model = (model if isinstance(model, str) else getattr(model, "model", None)) or parent_model
+    models = {agent.name: model} if model else {}
+    for sub_agent in getattr(agent, "sub_agents", None) or []:
+        models.update(configured_models(sub_agent, model))
+    return models
+
+
+class TurnMetrics:
+    """Collects timings and token usage for the events of one agent turn.
+
+    Samples are fed to the shared registry as they arrive and kept on the
+    instance so they can be persisted for the session afterwards. Model
+    calls are labelled with the model the model policy recorded, or the
+    agent's configured model from `agent_models` when it recorded none.
+    """
+
+    def __init__(self, session_id: str = "", user_id: str = "", agent_models: Optional[dict[str, str]] = None):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.agent_models = agent_models or {}
+        self.samples: list[dict] = []
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._pending_tools: dict[str, tuple[str, float]] = {}
+        self.agent: Optional[str] = None
+
+    def observe(self, event):
+        now = time.perf_counter()
+        author = event.author or "unknown"
+        if author != "user":
+            # The turn is labelled with the agent that answered last
+            self.agent = author
+
+        elapsed = now - self._last
+        self._last = now
+        registry.observe("agent_event_seconds", elapsed, agent=author)
+
+        usage = getattr(event, "usage_metadata", None)
+        prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+        candidate_tokens = (usage.candidates_token_count or 0) if usage else 0
+        if usage:
+            # Set by the model policy's after_model_callback
+            routing = event.custom_metadata or {}
+            model = routing.get("model") or self.agent_models.get(author) or "unknown"
+            kind = routing.get("turn_type") or "default"
+            latency = routing.get("model_seconds")
+            cached_tokens = usage.cached_content_token_count or 0
+
+            registry.inc("agent_tokens_total", prompt_tokens, agent=author, type="prompt")
+            registry.inc("agent_tokens_total", cached_tokens, agent=author, type="cached")
+            registry.inc("agent_tokens_total", candidate_tokens, agent=author, type="candidates")
+            if latency is not None:
+                registry.observe("model_call_seconds", latency, agent=author, model=model, turn_type=kind)
+            registry.inc("model_tokens_total", prompt_tokens, model=model, turn_type=kind, type="prompt")
+            registry.inc("model_tokens_total", cached_tokens, model=model, turn_type=kind, type="cached")
+            registry.inc("model_tokens_total", candidate_tokens, model=model, turn_type=kind, type="candidates")
+            self._record("model", author, elapsed if latency is None else latency, prompt_tokens, candidate_tokens, model=model)
+
+        calls = event.get_function_calls()
+        for call in calls:
+            self._pending_tools[call.id] = (call.name, now)
+            if usage:
+                # Parallel calls share one model response; count its tokens once
+                registry.inc("tool_tokens_total", prompt_tokens / len(calls), tool=call.name, type="prompt")
+                registry.inc("tool_tokens_total", candidate_tokens / len(calls), tool=call.name, type="candidates")
+
+        for response in event.get_function_responses():
+            name, started = self._pending_tools.pop(response.id, (response.name, now))
+            registry.observe("tool_seconds", now - started, tool=name)
+            self._record("tool", name, now - started)
+
+        transfer = event.actions.transfer_to_agent if event.actions else None
+        if transfer:
+            registry.inc("agent_transfers_total", from_agent=author, to_agent=transfer)
+            self._record("transfer", f"{author}->{transfer}", 0.0)
+
+    def finish(self) -> float:
+        duration = time.perf_counter() - self._start
+        registry.observe("agent_turn_seconds", duration)
+        self._record("turn", self.agent or "unknown", duration)
+        return duration
+
+    def _record(self, kind: str, name: str, duration: float, prompt_tokens: int = 0, candidate_tokens: int = 0, model: Optional[str] = None):
+        self.samples.append({
+            "kind": kind,
+            "name": name,
+            "model": model,
+            "duration_ms": duration * 1000,
+            "prompt_tokens": prompt_tokens,
+            "candidate_tokens": candidate_tokens,
+        })
+
+
+class MetricsDatabase:
+    """Persists per-session turn metrics in PostgreSQL"""
+
+    def __init__(self):
+        self.pool = None
+
+    async def initialize(self, pool):
+        """Create the metrics table using an existing connection pool"""
+        self.pool = pool
+
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS agent_metrics (
+                    id BIGSERIAL PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    duration_ms DOUBLE PRECISION NOT NULL,
+                    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                    candidate_tokens INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            await conn.execute('''
+                ALTER TABLE agent_metrics ADD COLUMN IF NOT EXISTS model TEXT
+            ''')
+            await conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_agent_metrics_session
+                ON agent_metrics (session_id, created_at)
+            ''')
+
+    async def save(self, turn: TurnMetrics):
+        if not self.pool or not turn.samples:
+            return
+
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.executemany('''
+                    INSERT INTO agent_metrics (session_id, user_id, kind, name, model, duration_ms, prompt_tokens, candidate_tokens)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                ''', [
+                    (turn.session_id, turn.user_id, s["kind"], s["name"], s["model"], s["duration_ms"], s["prompt_tokens"], s["candidate_tokens"])
+                    for s in turn.samples
+                ])
+        except Exception as e:
+            logger.error(f"Failed to save agent metrics: {str(e)}")
+
+    async def delete_session(self, session_id: str):
+        """Remove metrics of a deleted session"""
+        async with self.pool.acquire() as conn:
+            await conn.execute('DELETE FROM agent_metrics WHERE session_id = $1', session_id)
@@ -0,0 +1,110 @@
+import re
+import time
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.cache_metadata import CacheMetadata
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CONFIRM = "confirm"
+DEFAULT = "default"
+
+# A turn is a confirmation when every word of the user's message is one of
+# these and at least one of them is affirmative ("yes", "ok, send it",
+# "iya kirim saja"). Anything with other words ("yes but change the time")
+# is a regular turn.
+AFFIRMATIVE_WORDS = {
+    "yes", "yeah", "yep", "y", "ya", "iya", "ok", "oke", "okay", "sure", "confirm", "confirmed",
+    "correct", "benar", "betul", "sip", "setuju", "lanjut", "lanjutkan", "proceed", "send", "kirim",
+    "kirimkan", "good", "great", "fine", "perfect",
+}
+CONFIRMATION_WORDS = AFFIRMATIVE_WORDS | {
+    "it", "now", "please", "thanks", "thank", "you", "go", "ahead", "looks", "sounds", "that's",
+    "thats", "all", "is", "the", "both", "them", "email", "message", "whatsapp", "saja", "aja",
+    "sekarang", "tolong", "makasih", "terima", "kasih", "sudah", "semua",
+}
+
+
+def turn_type(content: Optional[types.Content]) -> str:
+    """Classify the user's message of a turn as a confirmation or a regular turn"""
+    parts = content.parts if content and content.parts else []
+    text = " ".join(part.text for part in parts if part.text)
+    words = re.findall(r"[a-z']+", text.lower())
+    if 0 < len(words) <= 8 and set(words) <= CONFIRMATION_WORDS and set(words) & AFFIRMATIVE_WORDS:
+        return CONFIRM
+    return DEFAULT
+
+
+class ModelPolicy:
+    """Chooses the model of every model call by agent and turn type.
+
+    Used as before_model_callback and after_model_callback of each agent.
+    The model that served the call, the turn type and the call's latency
+    (model_seconds) are stored in the response's custom_metadata so
+    per-model stats can be recorded from the events.
+
+    Each model keeps its own context cache: a cachedContent can only be used
+    with the model it was created for, but ADK hands every call the agent's
+    latest cache whatever model made it.
+    """
+
+    def __init__(self, models: dict):
+        self.models = models
+        # Start time and model of the call in flight, by (invocation, agent)
+        self._calls: dict[tuple[str, str], tuple[float, Optional[str]]] = {}
+
+    def select(self, agent_name: str, kind: str) -> Optional[str]:
+        agent_models = self.models.get(agent_name, {})
+        return agent_models.get(kind) or agent_models.get(DEFAULT)
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        model = self.select(callback_context.agent_name, turn_type(callback_context.user_content))
+        if model and model != llm_request.model:
+            logger.debug("Routing %s call to %s", callback_context.agent_name, model)
+            llm_request.model = model
+        if model and llm_request.cache_config:
+            llm_request.cache_metadata = self._cache_metadata(callback_context, model)
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._calls[key] = (time.perf_counter(), llm_request.model)
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse):
+        kind = turn_type(callback_context.user_content)
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        # Streamed chunks share the call; the final one closes it
+        call = self._calls.get(key) if llm_response.partial else self._calls.pop(key, None)
+        started, model = call or (None, None)
+        metadata = {
+            **(llm_response.custom_metadata or {}),
+            "model": model or self.select(callback_context.agent_name, kind),
+            "turn_type": kind,
+        }
+        if started is not None:
+            metadata["model_seconds"] = time.perf_counter() - started
+        llm_response.custom_metadata = metadata
+        return None
+
+    def _cache_metadata(self, callback_context: CallbackContext, model: str) -> Optional[CacheMetadata]:
+        """The agent's latest context cache created by model, like ADK's context cache processor"""
+        session = callback_context._invocation_context.session
+        for event in reversed(session.events if session else []):
+            if event.author != callback_context.agent_name or event.cache_metadata is None:
+                continue
+            if (event.custom_metadata or {}).get("model") != model:
+                continue
+            if event.invocation_id != callback_context.invocation_id:
+                return event.cache_metadata.model_copy(
+                    update={"invocations_used": event.cache_metadata.invocations_used + 1}
+                )
+            return event.cache_metadata
+        return None
+
+
+model_policy = ModelPolicy(config.agent.MODELS)
@@ -0,0 +1,70 @@
+import json
+import re
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from shared.model import InvitationInfo, EmailModel, WhatsAppModel
+
+if TYPE_CHECKING:
+    from google.adk.agents.readonly_context import ReadonlyContext
+
+# Fields of each state key that are shown to the model, in the order they are
+# rendered. A fixed order keeps identical state byte-identical across turns,
+# which lets implicit prefix caching reuse it.
+PROMPT_FIELDS = {
+    "user_context": ("full_name", "username"),
+    "invitation_info": tuple(InvitationInfo.model_fields),
+    "email": tuple(EmailModel.model_fields),
+    "whatsapp": tuple(WhatsAppModel.model_fields),
+}
+
+STATE_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def compact(value):
+    """Drop empty strings, None, empty lists and empty dicts, recursively"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        items = ((k, compact(v)) for k, v in value.items())
+        return {k: v for k, v in items if v not in ("", None, [], {})}
+    if isinstance(value, (list, tuple)):
+        items = (compact(v) for v in value)
+        return [v for v in items if v not in ("", None, [], {})]
+    return value
+
+
+def serialize_state(key: str, value) -> str:
+    """Serialize a state value as compact JSON without empty fields"""
+    value = compact(value)
+    fields = PROMPT_FIELDS.get(key)
+    if fields and isinstance(value, dict):
+        value = {field: value[field] for field in fields if field in value}
+    if value in (None, "", [], {}):
+        return "{}"
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def render_instruction(template: str, state) -> str:
+    """Fill {key} placeholders with compact state; unknown placeholders are kept"""
+    def replace(match):
+        key = match.group(1)
+        if key not in state:
+            return "{}" if key in PROMPT_FIELDS else match.group(0)
+        return serialize_state(key, state[key])
+
+    return STATE_PATTERN.sub(replace, template)
+
+
+def instruction_with_state(template: str):
+    """Build an InstructionProvider that injects compact session state.
+
+    Replaces ADK's default injection, which inserts str() of each state dict
+    including empty fields.
+    """
+    def provider(context: "ReadonlyContext") -> str:
+        return render_instruction(template, context.state)
+
+    return provider
@@ -0,0 +1,65 @@
+"""
+Startup warm-up results served by the /ready endpoint
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from utils.logger import setup_logger
+from utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+registry.describe("warmup_seconds", "summary", "Time to warm up each dependency at startup")
+
+
+class Readiness:
+    """Runs warm-up steps and records, per dependency, whether it is usable.
+
+    The process is ready once every step has run and every required step
+    succeeded. Optional steps (the WhatsApp MCP server, the model) are
+    reported but do not keep the process out of rotation.
+    """
+
+    def __init__(self):
+        self.checks: dict[str, dict] = {}
+        self.done = False
+
+    async def check(self, name: str, warm_up: Callable[[], Awaitable], required: bool = True,
+                    timeout: float = 60.0) -> bool:
+        start = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(warm_up(), timeout=timeout)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {timeout:g} s"
+        except Exception as e:
+            # MCP and anyio wrap connection errors in exception groups
+            while isinstance(e, ExceptionGroup) and e.exceptions:
+                e = e.exceptions[0]
+            error = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - start
+
+        self.checks[name] = {
+            "ok": error is None,
+            "required": required,
+            "latency_ms": round(elapsed * 1000, 1),
+            "error": error,
+        }
+        registry.observe("warmup_seconds", elapsed, dependency=name)
+        if error:
+            log = logger.error if required else logger.warning
+            log(f"Warm-up of {name} failed after {elapsed:.2f} s: {error}")
+        else:
+            logger.info(f"Warmed up {name} in {elapsed:.2f} s")
+        return error is None
+
+    @property
+    def ready(self) -> bool:
+        return self.done and all(c["ok"] for c in self.checks.values() if c["required"])
+
+    def report(self) -> dict:
+        return {
+            "status": "ready" if self.ready else ("starting" if not self.done else "unavailable"),
+            "dependencies": self.checks,
+        }
@@ -0,0 +1,178 @@
+"""
+Admission control and fair scheduling of agent turns
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from utils.logger import setup_logger
+from utils.metrics import registry
+
+logger = setup_logger(__name__)
+
+registry.describe("turn_queue_seconds", "summary", "Time an agent turn waited for its session and a free slot")
+registry.describe("turns_rejected_total", "counter", "Agent turns rejected because the queue was full")
+
+
+class SchedulerBusy(Exception):
+    """Too many turns are already waiting for a slot"""
+
+
+class TurnScheduler:
+    """Runs agent turns one at a time per session, with per-user and global limits.
+
+    A turn first takes its session's lock, so events of two turns never
+    interleave in the same session. It then waits for one of max_concurrent
+    global slots, which should be sized to the model quota. A user never
+    holds more than max_per_user slots. Waiting turns are queued per user
+    and slots are handed to users round-robin, so a user with many queued
+    turns cannot starve the others.
+
+    At most max_queued turns wait at a time, whether for their session or
+    for a slot; more are rejected with SchedulerBusy.
+
+    Slots are per process. Once initialized with a database, an admitted
+    turn also holds its session with a PostgreSQL advisory lock, so turns of
+    one session are serialized across workers too. The locks live on a
+    dedicated pool with one connection per slot: queued turns hold no
+    connection, and the shared pool stays free for the turns' own queries.
+    A turn whose session is running on another worker gives its slot back
+    and retries every lock_poll_interval seconds, so it does not hold model
+    quota while it waits.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_per_user: int = 2, max_queued: int = 100,
+                 lock_poll_interval: float = 0.2):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queued = max_queued
+        self.lock_poll_interval = lock_poll_interval
+        self._active = 0
+        self._active_by_user: dict[str, int] = {}
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self._queued = 0
+        self._sessions: dict[str, tuple[asyncio.Lock, int]] = {}
+        self.pool = None
+
+    async def initialize(self, db_url: str):
+        """Serialize sessions across processes with advisory locks in this database"""
+        self.pool = await asyncpg.create_pool(db_url, min_size=0, max_size=self.max_concurrent)
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, session_id: str):
+        """Hold the session and a global slot for the duration of one turn"""
+        # Turns waiting for their session count too, so one busy session
+        # cannot pile up requests behind its lock
+        if self._queued >= self.max_queued:
+            registry.inc("turns_rejected_total")
+            raise SchedulerBusy()
+
+        start = time.perf_counter()
+        self._queued += 1
+        queued = True
+        lock = self._acquire_session(session_id)
+        try:
+            async with lock:
+                while True:
+                    await self._admit(user_id)
+                    try:
+                        # Admitted turns never outnumber the lock pool's connections
+                        async with self._session_across_processes(session_id) as held:
+                            if held:
+                                self._queued -= 1
+                                queued = False
+                                registry.observe("turn_queue_seconds", time.perf_counter() - start)
+                                yield
+                                return
+                    finally:
+                        self._release(user_id)
+                    # The session is running on another worker; wait without a slot
+                    await asyncio.sleep(self.lock_poll_interval)
+        finally:
+            if queued:
+                self._queued -= 1
+            self._release_session(session_id)
+
+    @asynccontextmanager
+    async def _session_across_processes(self, session_id: str):
+        """Yield whether the session's advisory lock was taken"""
+        if not self.pool:
+            yield True
+            return
+
+        # Releasing the connection to the pool runs pg_advisory_unlock_all(),
+        # so a lock taken just as the turn is cancelled is not leaked
+        async with self.pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtextextended($1, 0))", session_id):
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtextextended($1, 0))", session_id)
+
+    def _acquire_session(self, session_id: str) -> asyncio.Lock:
+        lock, users = self._sessions.get(session_id) or (asyncio.Lock(), 0)
+        self._sessions[session_id] = (lock, users + 1)
+        return lock
+
+    def _release_session(self, session_id: str):
+        lock, users = self._sessions[session_id]
+        if users <= 1:
+            del self._sessions[session_id]
+        else:
+            self._sessions[session_id] = (lock, users - 1)
+
+    async def _admit(self, user_id: str):
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._forget(user_id, future)
+            else:
+                # The slot was granted just before the waiting turn was cancelled
+                self._release(user_id)
+            raise
+
+    def _forget(self, user_id: str, future: asyncio.Future):
+        waiters = self._waiters.get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._waiters[user_id]
+
+    def _dispatch(self):
+        """Grant free slots to waiting users, round-robin"""
+        while self._active < self.max_concurrent:
+            for user_id, waiters in self._waiters.items():
+                if self._active_by_user.get(user_id, 0) < self.max_per_user:
+                    break
+            else:
+                return
+
+            future = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+
+            self._active += 1
+            self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+            future.set_result(None)
+
+    def _release(self, user_id: str):
+        self._active -= 1
+        self._active_by_user[user_id] -= 1
+        if not self._active_by_user[user_id]:
+            del self._active_by_user[user_id]
+        self._dispatch()
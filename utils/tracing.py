@@ -0,0 +1,104 @@
+"""
+OpenTelemetry tracing of chat turns, tools and WhatsApp MCP calls
+"""
+import functools
+import inspect
+from typing import Optional
+
+from opentelemetry import propagate, trace
+
+from config import config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# ADK records its own spans (invocation, agent_run, call_llm, execute_tool)
+# with the same global provider, so they appear in the same traces
+tracer = trace.get_tracer("invitation-agent")
+
+_provider = None
+
+
+def setup_tracing(service_name: str = "invite-agent-backend"):
+    """Install the span exporter chosen by TRACING_EXPORTER; a no-op for "none".
+
+    console writes spans to stdout, file appends one JSON span per line to
+    TRACING_FILE and otlp sends them to OTEL_EXPORTER_OTLP_ENDPOINT.
+    """
+    global _provider
+    exporter_name = config.tracing.EXPORTER
+    if exporter_name == "none" or _provider is not None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if exporter_name == "console":
+        exporter = ConsoleSpanExporter()
+    elif exporter_name == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(config.tracing.FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif exporter_name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            raise ValueError("TRACING_EXPORTER=otlp needs the otlp extra: uv sync --extra otlp")
+        exporter = OTLPSpanExporter()
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {exporter_name}")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=_sampler(),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"Tracing enabled with the {exporter_name} exporter")
+
+
+def _sampler():
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    return ParentBased(TraceIdRatioBased(config.tracing.SAMPLE_RATE))
+
+
+def shutdown_tracing():
+    """Export the spans still buffered"""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def traced(name: Optional[str] = None):
+    """Run the decorated function, sync or async, in a span named `name`.
+
+    The signature and docstring are kept, so ADK builds the same function
+    declaration for a decorated tool.
+    """
+    def decorate(func):
+        span_name = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def inject_context() -> dict:
+    """The current trace context as W3C headers (traceparent, tracestate)"""
+    carrier = {}
+    propagate.inject(carrier)
+    return carrier
@@ -1,11 +1,21 @@
+import asyncio
+import logging
 from datetime import datetime
 
-from google.genai import types
+from opentelemetry.trace import StatusCode
 
-from utils.logger import setup_logger
+from utils.logger import sampled, setup_logger
+from utils.metrics import TurnMetrics, configured_models, registry
+from utils.tracing import tracer
 
 logger = setup_logger(__name__)
 
+registry.describe("agent_turns_cancelled_total", "counter", "Agent turns cancelled before completion, by reason")
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection before the agent turn finished"""
+
 # TODO: define display state
 # def display_state(
 #     session_service, app_name, user_id, session_id, label="Current State"
@@ -39,18 +49,23 @@ logger = setup_logger(__name__)
 
 async def process_agent_response(event):
     """Process and display agent response events."""
-    logger.info(f"Event ID: {event.id}, Author: {event.author}")
+    # Per-event records are sampled; there are several per turn
+    log_event = logger.isEnabledFor(logging.DEBUG) and sampled()
+    if log_event:
+        logger.debug("Event ID: %s, Author: %s", event.id, event.author)
 
     # Check for specific parts first
     has_specific_part = False
     if event.content and event.content.parts:
         for part in event.content.parts:
             if hasattr(part, "text") and part.text and not part.text.isspace():
-                logger.debug(f"---Specific Parts Text: '{part.text.strip()}' ---")
+                if log_event:
+                    logger.debug("---Specific Parts Text: '%s' ---", part.text.strip())
 
             elif hasattr(part, "tool_response") and part.tool_response:
                 # Print tool response information
-                logger.debug(f"--- Tool Response: {part.tool_response.output} ---")
+                if log_event:
+                    logger.debug("--- Tool Response: %s ---", part.tool_response.output)
                 has_specific_part = True        
     
     # Check for final response after specific parts
@@ -64,32 +79,126 @@ async def process_agent_response(event):
         ):
             final_response = event.content.parts[0].text.strip()
 
-            logger.debug(f"Agent Response: {final_response}")
+            logger.debug("Agent Response: %s", final_response)
         else:
-            logger.debug(f"Final Agent Response: [No text content in final event]")
+            logger.debug("Final Agent Response: [No text content in final event]")
     return final_response
 
 
-async def call_agent_async(runner, user_id, session_id, query):
-    """Call the agent asynchronously with the user's query"""
+async def close_pending_tool_calls(session_service, app_name, user_id, session_id, reason: str):
+    """Answer the function calls of a cancelled turn that never got a response.
+
+    A function call without a response in the session history is rejected by
+    the model on the next turn, so each one gets an error response instead.
+    """
+    from google.adk.events import Event
+    from google.genai import types
+
+    session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if session is None or not session.events:
+        return
+
+    invocation_id = session.events[-1].invocation_id
+    pending = {}
+    for event in session.events:
+        if event.invocation_id != invocation_id:
+            continue
+        for call in event.get_function_calls():
+            pending[call.id] = (event.author, call)
+        for response in event.get_function_responses():
+            pending.pop(response.id, None)
+
+    for author, call in pending.values():
+        logger.warning(f"Closing pending tool call {call.name} ({call.id}) of session {session_id}: {reason}")
+        await session_service.append_event(session, Event(
+            invocation_id=invocation_id,
+            author=author,
+            content=types.Content(role="user", parts=[types.Part(
+                function_response=types.FunctionResponse(
+                    id=call.id,
+                    name=call.name,
+                    response={"status": "cancelled", "error_message": f"The turn was {reason} before this tool finished; its result is unknown."},
+                )
+            )]),
+        ))
+
+
+async def run_until_disconnected(coro, request, timeout: float, poll_interval: float = 0.5):
+    """Await `coro`, cancelling it when the client disconnects or the deadline passes.
+
+    `request` may be None for turns nobody waits on, which only have a deadline.
+
+    Raises ClientDisconnected or asyncio.TimeoutError after the cancelled task
+    has finished its own cleanup.
+    """
+    task = asyncio.ensure_future(coro)
+    deadline = asyncio.get_running_loop().time() + timeout
+    reason = None
+    try:
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                reason = "timeout"
+                break
+            done, _ = await asyncio.wait({task}, timeout=min(poll_interval, remaining))
+            if done:
+                return task.result()
+            if request is not None and await request.is_disconnected():
+                reason = "disconnect"
+                break
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    registry.inc("agent_turns_cancelled_total", reason=reason)
+    if reason == "disconnect":
+        raise ClientDisconnected()
+    raise asyncio.TimeoutError()
+
+
+async def call_agent_async(runner, user_id, session_id, query, metrics: TurnMetrics = None):
+    """Call the agent asynchronously with the user's query.
+
+    Every event is passed to `metrics` (a new TurnMetrics when not given) to
+    record model latency, token usage, agent transfers and tool durations.
+    When the turn is cancelled, tool calls left without a response are closed
+    so the session stays usable.
+    """
+    from google.genai import types
+
+    if metrics is None:
+        metrics = TurnMetrics(session_id=session_id, user_id=user_id)
+    if not metrics.agent_models:
+        metrics.agent_models = configured_models(runner.agent)
 
     content = types.Content(role="user", parts=[types.Part(text=query)])
-    logger.info(f"Running Query: {query}")
+    # The query itself is only logged at debug level
+    logger.info("Running query of %d characters", len(query))
+    logger.debug("Running Query: %s", query)
 
     final_respoonse_text = None
 
-    try:
-        async for event in runner.run_async(
-            user_id=user_id, session_id=session_id,
-            new_message=content
-        ):
-            response = await process_agent_response(event)
-            if response:
-                final_respoonse_text = response
-            
-            logger.info(f"Agent Response: {response}")
-    except Exception as e:
-        logger.error(f"ERROR during agent run: {e}")
-    
+    with tracer.start_as_current_span("agent.turn", attributes={"session.id": session_id, "user.id": user_id}) as span:
+        try:
+            async for event in runner.run_async(
+                user_id=user_id, session_id=session_id,
+                new_message=content
+            ):
+                metrics.observe(event)
+                response = await process_agent_response(event)
+                if response:
+                    final_respoonse_text = response
+        except asyncio.CancelledError:
+            logger.warning("Agent run cancelled for session %s", session_id)
+            await close_pending_tool_calls(runner.session_service, runner.app_name, user_id, session_id, "cancelled")
+            raise
+        except Exception as e:
+            logger.error("ERROR during agent run: %s", e)
+            span.record_exception(e)
+            span.set_status(StatusCode.ERROR, str(e))
+        finally:
+            metrics.finish()
+
     return final_respoonse_text
     
\ No newline at end of file
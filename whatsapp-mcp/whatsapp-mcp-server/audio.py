@@ -1,8 +1,32 @@
+import hashlib
 import os
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-def convert_to_opus_ogg(input_file, output_file=None, bitrate="32k", sample_rate=24000):
+from cache import DiskCache, SingleFlight, file_sha256
+
+# Converted files are cached by content hash so re-sending the same recording
+# does not re-encode it. Each pool worker runs one ffmpeg process at a time,
+# which bounds the number of concurrent conversions.
+AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'whatsapp-mcp-audio-cache'))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+AUDIO_CONVERSION_WORKERS = int(os.getenv('AUDIO_CONVERSION_WORKERS', '2'))
+
+_conversion_pool = ThreadPoolExecutor(max_workers=AUDIO_CONVERSION_WORKERS, thread_name_prefix="ffmpeg")
+_conversions = SingleFlight()
+_cache = None
+
+
+def get_conversion_cache() -> DiskCache:
+    """Return the conversion cache, creating its directory on first use."""
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES)
+    return _cache
+
+def convert_to_opus_ogg(input_file, output_file=None, bitrate="32k", sample_rate=24000, compression_level=10):
     """
     Convert an audio file to Opus format in an Ogg container.
     
@@ -12,6 +36,7 @@ def convert_to_opus_ogg(input_file, output_file=None, bitrate="32k", sample_rate
                                     extension of input_file with .ogg
         bitrate (str, optional): Target bitrate for Opus encoding (default: "32k")
         sample_rate (int, optional): Sample rate for output (default: 24000)
+        compression_level (int, optional): Opus encoder complexity, 0-10 (default: 10)
     
     Returns:
         str: Path to the converted file
@@ -41,7 +66,7 @@ def convert_to_opus_ogg(input_file, output_file=None, bitrate="32k", sample_rate
         "-ar", str(sample_rate),
         "-application", "voip",  # Optimize for voice
         "-vbr", "on",           # Variable bitrate
-        "-compression_level", "10",  # Maximum compression
+        "-compression_level", str(compression_level),  # 10 is maximum compression
         "-frame_duration", "60",     # 60ms frames (good for voice)
         "-y",                        # Overwrite output file if it exists
         output_file
@@ -61,35 +86,61 @@ def convert_to_opus_ogg(input_file, output_file=None, bitrate="32k", sample_rate
         raise RuntimeError(f"Failed to convert audio. You likely need to install ffmpeg {e.stderr}")
 
 
-def convert_to_opus_ogg_temp(input_file, bitrate="32k", sample_rate=24000):
+@contextmanager
+def convert_to_opus_ogg_cached(input_file, bitrate="32k", sample_rate=24000, compression_level=10):
     """
-    Convert an audio file to Opus format in an Ogg container and store in a temporary file.
+    Convert an audio file to Opus format in an Ogg container, reusing earlier conversions.
+    
+    The result is keyed by the SHA256 of the input content and the encoding
+    parameters. Concurrent requests for the same key share one conversion and
+    the conversion itself runs on the bounded ffmpeg worker pool. The file is
+    owned by the cache and pinned until the with block exits, so eviction
+    cannot remove it while the caller is still using it.
     
     Args:
         input_file (str): Path to the input audio file
         bitrate (str, optional): Target bitrate for Opus encoding (default: "32k")
         sample_rate (int, optional): Sample rate for output (default: 24000)
+        compression_level (int, optional): Opus encoder complexity, 0-10 (default: 10)
     
-    Returns:
-        str: Path to the temporary file with the converted audio
+    Yields:
+        str: Path to the cached file with the converted audio
         
     Raises:
         FileNotFoundError: If the input file doesn't exist
         RuntimeError: If the ffmpeg conversion fails
     """
-    # Create a temporary file with .ogg extension
-    temp_file = tempfile.NamedTemporaryFile(suffix=".ogg", delete=False)
-    temp_file.close()
-    
+    if not os.path.isfile(input_file):
+        raise FileNotFoundError(f"Input file not found: {input_file}")
+
+    params = f"{bitrate}:{sample_rate}:{compression_level}"
+    key = hashlib.sha256(f"{file_sha256(input_file)}:{params}".encode()).hexdigest()
+    cache = get_conversion_cache()
+
+    def encode(output_file):
+        _conversion_pool.submit(
+            convert_to_opus_ogg, input_file, output_file, bitrate, sample_rate, compression_level
+        ).result()
+
+    def convert():
+        # Another caller may have finished the same conversion meanwhile
+        return cache.get(key, ".ogg") or cache.put(key, ".ogg", encode)
+
+    path = cache.get(key, ".ogg", pin=True)
+    # A conversion shared with other callers can be evicted before this one
+    # pins it; convert again rather than fail
+    for _ in range(3):
+        if path:
+            break
+        _conversions.do(key, convert)
+        path = cache.get(key, ".ogg", pin=True)
+    if not path:
+        raise RuntimeError("Converted audio was evicted before it could be sent; raise AUDIO_CACHE_MAX_BYTES")
+
     try:
-        # Convert the audio
-        convert_to_opus_ogg(input_file, temp_file.name, bitrate, sample_rate)
-        return temp_file.name
-    except Exception as e:
-        # Clean up the temporary file if conversion fails
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
-        raise e
+        yield path
+    finally:
+        cache.unpin(path)
 
 
 if __name__ == "__main__":
@@ -103,7 +154,8 @@ if __name__ == "__main__":
     input_file = sys.argv[1]
     
     try:
-        result = convert_to_opus_ogg_temp(input_file)
+        output_file = sys.argv[2] if len(sys.argv) > 2 else None
+        result = convert_to_opus_ogg(input_file, output_file)
         print(f"Successfully converted to: {result}")
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,100 @@
+"""
+Benchmark get_contact_chats against the previous JOIN + DISTINCT query.
+
+Usage:
+    python benchmarks/bench_contact_chats.py --messages 1000000 --samples 20
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whatsapp
+from indexes import ensure_indexes
+from generate_history import generate, phone_number
+
+# The query get_contact_chats used before the semi-join rewrite
+LEGACY_QUERY = """
+    SELECT DISTINCT
+        c.jid,
+        c.name,
+        c.last_message_time,
+        m.content as last_message,
+        m.sender as last_sender,
+        m.is_from_me as last_is_from_me
+    FROM chats c
+    JOIN messages m ON c.jid = m.chat_jid
+    WHERE m.sender = ? OR c.jid = ?
+    ORDER BY c.last_message_time DESC
+    LIMIT ? OFFSET ?
+"""
+
+
+def legacy_contact_chats(db_path: str, jid: str, limit: int, page: int = 0) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(LEGACY_QUERY, (jid, jid, limit, page * limit)).fetchall()
+    finally:
+        conn.close()
+
+
+def unique_jids(rows) -> list:
+    """Chat JIDs in result order, without the legacy query's per-message duplicates."""
+    seen = []
+    for jid in rows:
+        if jid not in seen:
+            seen.append(jid)
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-path", default=os.path.join(tempfile.gettempdir(), "bench_contact_chats.db"))
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="Reuse an existing database at --db-path")
+    args = parser.parse_args()
+
+    if not (args.reuse and os.path.exists(args.db_path)):
+        print(f"Generating {args.messages} messages at {args.db_path} ...")
+        generate(args.db_path, contacts=args.contacts, groups=args.groups, messages=args.messages)
+    ensure_indexes(args.db_path)
+    whatsapp.MESSAGES_DB_PATH = args.db_path
+
+    rng = random.Random(7)
+    senders = [phone_number(rng.randrange(args.contacts)) for _ in range(args.samples)]
+
+    legacy_time = 0.0
+    new_time = 0.0
+    mismatches = 0
+    for sender in senders:
+        # Fetch everything so both result sets can be compared chat by chat
+        start = time.perf_counter()
+        legacy_rows = legacy_contact_chats(args.db_path, sender, limit=-1)
+        legacy_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        chats = whatsapp.get_contact_chats(sender, limit=-1)
+        new_time += time.perf_counter() - start
+
+        if sorted(unique_jids(row[0] for row in legacy_rows)) != sorted(chat.jid for chat in chats):
+            mismatches += 1
+            print(f"Result mismatch for sender {sender}")
+
+    print(f"Samples:            {len(senders)}")
+    print(f"Legacy query:       {legacy_time / len(senders) * 1000:.2f} ms/call")
+    print(f"Semi-join query:    {new_time / len(senders) * 1000:.2f} ms/call")
+    print(f"Speedup:            {legacy_time / new_time:.1f}x")
+    print(f"Identical results:  {mismatches == 0}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
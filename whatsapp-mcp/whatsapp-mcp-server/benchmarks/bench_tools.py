@@ -0,0 +1,213 @@
+"""
+Benchmark every MCP tool against synthetic histories of increasing size.
+
+For each --messages size a history is generated with generate_history.py
+(or reused from --data-dir), indexed like the server does at startup, and
+each tool of main.py is called --samples times with arguments drawn from
+that history. The tools that go through the bridge (send_message,
+send_file, send_audio_message, download_media) talk to a local stub of
+its REST API, so they measure the server's own work. p50 and p99 latency
+are printed per tool and size.
+
+subscribe_new_messages is left out: it only registers the calling MCP
+session. Pass --watch to run with the MessagesWatcher caches, as the
+server does by default.
+
+Usage:
+    python benchmarks/bench_tools.py --messages 100000 1000000 10000000 --samples 50
+    python benchmarks/bench_tools.py --messages 1000000 --watch --tools list_messages get_contact_chats
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as server
+import whatsapp
+from indexes import ensure_indexes
+from watcher import MessagesWatcher
+from generate_history import FIRST_NAMES, WORDS, generate
+
+
+class _BridgeStubHandler(BaseHTTPRequestHandler):
+    """Answers /api/send and /api/download like a connected bridge"""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/api/download":
+            path = os.path.join(self.server.media_dir, f"{payload.get('message_id')}.bin")
+            with open(path, "wb") as f:
+                f.write(b"\0" * 1024)
+            body = {"success": True, "message": "Downloaded", "path": path}
+        else:
+            body = {"success": True, "message": "Sent"}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_bridge_stub(media_dir: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _BridgeStubHandler)
+    server.media_dir = media_dir
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def tool_arguments(db_path: str, rng: random.Random, files: dict) -> dict:
+    """Argument factories per tool, drawing chats, contacts and messages from the history"""
+    conn = sqlite3.connect(db_path)
+    try:
+        chats = [row[0] for row in conn.execute("SELECT jid FROM chats ORDER BY RANDOM() LIMIT 500")]
+        messages = conn.execute("SELECT id, chat_jid, timestamp FROM messages ORDER BY RANDOM() LIMIT 500").fetchall()
+        media = conn.execute("SELECT id, chat_jid FROM messages WHERE media_type IS NOT NULL ORDER BY RANDOM() LIMIT 500").fetchall()
+        max_rowid = conn.execute("SELECT MAX(rowid) FROM messages").fetchone()[0] or 0
+    finally:
+        conn.close()
+
+    direct = [jid for jid in chats if jid.endswith("@s.whatsapp.net")] or chats
+    phones = [jid.split("@")[0] for jid in direct]
+
+    def list_messages():
+        # The filters the agents use, alone and combined
+        variant = rng.randrange(4)
+        if variant == 0:
+            return {"query": rng.choice(WORDS)}
+        if variant == 1:
+            return {"chat_jid": rng.choice(chats)}
+        if variant == 2:
+            return {"sender_phone_number": rng.choice(phones), "include_context": False}
+        _, chat_jid, timestamp = rng.choice(messages)
+        return {"chat_jid": chat_jid, "after": timestamp, "limit": 50}
+
+    arguments = {
+        "search_contacts": lambda: {"query": rng.choice([rng.choice(FIRST_NAMES), rng.choice(phones)[:8]])},
+        "list_messages": list_messages,
+        "list_chats": lambda: rng.choice([{}, {"query": rng.choice(FIRST_NAMES)}, {"sort_by": "name"}]),
+        "get_chat": lambda: {"chat_jid": rng.choice(chats)},
+        "get_direct_chat_by_contact": lambda: {"sender_phone_number": rng.choice(phones)},
+        "get_contact_chats": lambda: {"jid": rng.choice(phones)},
+        "get_last_interaction": lambda: {"jid": rng.choice(direct)},
+        "get_message_context": lambda: {"message_id": rng.choice(messages)[0]},
+        "get_new_messages": lambda: {"after_rowid": max(0, max_rowid - rng.randrange(1000)), "limit": 100},
+        "send_message": lambda: {"recipient": rng.choice(phones), "message": "Benchmark message"},
+        "send_file": lambda: {"recipient": rng.choice(phones), "media_path": files["image"]},
+        "send_audio_message": lambda: {"recipient": rng.choice(phones), "media_path": files["audio"]},
+    }
+    if media:
+        arguments["download_media"] = lambda: dict(zip(("message_id", "chat_jid"), rng.choice(media)))
+    return arguments
+
+
+def run_tool(name: str, make_arguments, samples: int) -> list:
+    tool = getattr(server, name)
+    latencies = []
+    # The tools print progress and errors
+    with contextlib.redirect_stdout(io.StringIO()):
+        tool(**make_arguments())  # warm up connections and caches
+        for _ in range(samples):
+            arguments = make_arguments()
+            start = time.perf_counter()
+            tool(**arguments)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def dataset(data_dir: str, messages: int, args) -> str:
+    db_path = os.path.join(data_dir, f"history_{messages}_{args.contacts}_{args.groups}_{args.seed}.db")
+    if args.regenerate or not os.path.exists(db_path):
+        print(f"Generating {messages:,} messages at {db_path} ...")
+        start = time.perf_counter()
+        generate(db_path, contacts=args.contacts, groups=args.groups, messages=messages, seed=args.seed)
+        print(f"  done in {time.perf_counter() - start:.0f} s")
+    ensure_indexes(db_path)
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--tools", nargs="+", help="Only these tools")
+    parser.add_argument("--watch", action="store_true", help="Serve reads from the MessagesWatcher caches")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "whatsapp-mcp-bench"))
+    parser.add_argument("--regenerate", action="store_true", help="Generate histories even if they exist")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    workdir = tempfile.TemporaryDirectory()
+    files = {"image": os.path.join(workdir.name, "invitation.jpg"), "audio": os.path.join(workdir.name, "invitation.ogg")}
+    for path in files.values():
+        with open(path, "wb") as f:
+            f.write(os.urandom(32 * 1024))
+
+    bridge = start_bridge_stub(workdir.name)
+    whatsapp.WHATSAPP_API_BASE_URL = f"http://127.0.0.1:{bridge.server_address[1]}/api"
+    whatsapp.MEDIA_CACHE_DIR = os.path.join(workdir.name, "media-cache")
+
+    results = {}
+    try:
+        for messages in args.messages:
+            db_path = dataset(args.data_dir, messages, args)
+            whatsapp.MESSAGES_DB_PATH = db_path
+
+            watcher = None
+            if args.watch:
+                watcher = MessagesWatcher(db_path)
+                watcher.start()
+                whatsapp.change_feed = watcher
+
+            try:
+                arguments = tool_arguments(db_path, random.Random(args.seed), files)
+                for name, make_arguments in arguments.items():
+                    if args.tools and name not in args.tools:
+                        continue
+                    latencies = run_tool(name, make_arguments, args.samples)
+                    results.setdefault(name, {})[messages] = {
+                        "p50": statistics.median(latencies),
+                        "p99": sorted(latencies)[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+                    }
+            finally:
+                if watcher:
+                    watcher.stop()
+                    whatsapp.change_feed = None
+    finally:
+        bridge.shutdown()
+        workdir.cleanup()
+
+    header = "".join(f"{f'{n:,} p50/p99 ms':>26}" for n in args.messages)
+    print(f"\n{'tool':<28}{header}")
+    for name, by_size in results.items():
+        cells = "".join(
+            f"{by_size[n]['p50'] * 1000:>17.2f} /{by_size[n]['p99'] * 1000:>7.2f}" if n in by_size else f"{'-':>26}"
+            for n in args.messages
+        )
+        print(f"{name:<28}{cells}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Generate a synthetic WhatsApp history database with the bridge's schema.
+
+Messages are spread the way a real account accumulates them:
+- chat activity follows a Zipf distribution, so a few chats hold most messages
+- messages come in conversations of a few quick replies
+- conversations follow a daily and weekly rhythm, and traffic grows over the
+  covered period
+- rows are inserted in time order, like the bridge does
+- about --media-ratio of the messages are images, videos, voice notes or
+  documents, with the bridge's media columns filled in; a share of them are
+  forwards of the same file, with the same SHA256
+
+Generation streams one day at a time, so tens of millions of messages only
+need disk space (about 220 bytes per message before indexes).
+
+Usage:
+    python benchmarks/generate_history.py /tmp/messages.db --messages 1000000
+    python benchmarks/generate_history.py /tmp/big.db --messages 20000000 --contacts 20000 --groups 1000
+"""
+import argparse
+import bisect
+import itertools
+import math
+import os
+import random
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+# Same DDL as NewMessageStore in whatsapp-bridge/main.go
+BRIDGE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chats (
+        jid TEXT PRIMARY KEY,
+        name TEXT,
+        last_message_time TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS messages (
+        id TEXT,
+        chat_jid TEXT,
+        sender TEXT,
+        content TEXT,
+        timestamp TIMESTAMP,
+        is_from_me BOOLEAN,
+        media_type TEXT,
+        filename TEXT,
+        url TEXT,
+        media_key BLOB,
+        file_sha256 BLOB,
+        file_enc_sha256 BLOB,
+        file_length INTEGER,
+        PRIMARY KEY (id, chat_jid),
+        FOREIGN KEY (chat_jid) REFERENCES chats(jid)
+    );
+"""
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S+00:00"
+OWN_NUMBER = "628100000000"
+WORDS = ["hi", "see", "you", "tomorrow", "meeting", "party", "yes", "no", "thanks", "ok", "coming", "late", "lunch", "invite",
+         "besok", "rapat", "jam", "oke", "siap", "terima", "kasih", "kantor", "makan", "siang", "undangan", "hadir"]
+FIRST_NAMES = ["Andi", "Sari", "Dewi", "Budi", "Rina", "Agus", "Putri", "Eko", "Fitri", "Joko", "Lina", "Rudi", "Maya", "Tono", "Wati", "Hendra"]
+LAST_NAMES = ["Santoso", "Wijaya", "Pratama", "Lestari", "Saputra", "Hidayat", "Kusuma", "Nugroho", "Siregar", "Halim"]
+GROUP_NAMES = ["Keluarga", "Kantor", "Alumni", "Arisan", "Project", "Futsal", "RT", "Kelas"]
+
+# Relative traffic per hour of day (UTC+7 local time) and per weekday (Monday first)
+HOUR_WEIGHTS = [1, 0.5, 0.3, 0.2, 0.3, 1, 3, 6, 8, 9, 9, 8, 10, 9, 8, 8, 8, 9, 10, 12, 13, 12, 8, 4]
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.0, 1.1, 1.3, 1.2]
+UTC_OFFSET_HOURS = 7
+
+# (media type, share of media messages, file extension, median size in bytes, content is a caption)
+MEDIA_TYPES = [
+    ("image", 0.60, ".jpg", 150_000, True),
+    ("audio", 0.18, ".ogg", 40_000, False),
+    ("video", 0.12, ".mp4", 4_000_000, True),
+    ("document", 0.10, ".pdf", 500_000, False),
+]
+FORWARDED_RATIO = 0.15  # media messages that reuse an earlier file
+MEAN_REPLY_SECONDS = 45.0
+MEAN_CONVERSATION_LENGTH = 6.0
+
+
+def phone_number(index: int) -> str:
+    return f"62812{index:07d}"
+
+
+def message_id(index: int) -> str:
+    """Unique, random-looking ID in the form of WhatsApp's (multiplication by an odd constant is a bijection)"""
+    return f"3EB0{(index * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF:016X}"
+
+
+def zipf_cumulative_weights(count: int, exponent: float) -> list:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def messages_per_day(total: int, start: datetime, days: int, growth: float) -> list:
+    """Split `total` over the days, weighted by weekday and a linear growth of traffic"""
+    weights = [
+        (1 + growth * day / max(days - 1, 1)) * WEEKDAY_WEIGHTS[(start + timedelta(days=day)).weekday()]
+        for day in range(days)
+    ]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    for day in range(total - sum(counts)):
+        counts[-1 - day % days] += 1
+    return counts
+
+
+class HistoryGenerator:
+    def __init__(self, rng: random.Random, contacts: int, chats: int, groups: int, media_ratio: float, zipf_exponent: float):
+        self.rng = rng
+        self.media_ratio = media_ratio
+        self.contact_names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(contacts)]
+
+        # Direct chats with the first `chats` contacts, then groups of contacts
+        self.chat_jids = [f"{phone_number(i)}@s.whatsapp.net" for i in range(chats)]
+        self.chat_names = list(self.contact_names[:chats])
+        self.members = [[phone_number(i)] for i in range(chats)]
+        for g in range(groups):
+            self.chat_jids.append(f"1203630{g:011d}@g.us")
+            self.chat_names.append(f"{rng.choice(GROUP_NAMES)} {g}")
+            size = min(contacts, max(3, int(rng.lognormvariate(math.log(12), 0.8))))
+            self.members.append([phone_number(i) for i in rng.sample(range(contacts), size)])
+
+        # Activity rank is independent of the chat index
+        self.ranked_chats = list(range(len(self.chat_jids)))
+        rng.shuffle(self.ranked_chats)
+        self.cumulative_weights = zipf_cumulative_weights(len(self.chat_jids), zipf_exponent)
+        self.hour_cumulative = list(itertools.accumulate(HOUR_WEIGHTS))
+        self.media_cumulative = list(itertools.accumulate(share for _, share, _, _, _ in MEDIA_TYPES))
+        self.media_files = []
+        self.index = 0
+
+    def pick_chat(self) -> int:
+        position = bisect.bisect(self.cumulative_weights, self.rng.random() * self.cumulative_weights[-1])
+        return self.ranked_chats[min(position, len(self.ranked_chats) - 1)]
+
+    def conversation_start(self, day_start: datetime) -> datetime:
+        hour = bisect.bisect(self.hour_cumulative, self.rng.random() * self.hour_cumulative[-1])
+        seconds = ((hour - UTC_OFFSET_HOURS) % 24) * 3600 + self.rng.randrange(3600)
+        return day_start + timedelta(seconds=seconds)
+
+    def text(self) -> str:
+        words = max(1, int(self.rng.lognormvariate(math.log(5), 0.7)))
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def media(self, timestamp: datetime) -> tuple:
+        """media_type, filename, url, media_key, file_sha256, file_enc_sha256, file_length and whether it has a caption"""
+        if self.media_files and self.rng.random() < FORWARDED_RATIO:
+            return self.rng.choice(self.media_files)
+
+        position = bisect.bisect(self.media_cumulative, self.rng.random() * self.media_cumulative[-1])
+        media_type, _, extension, median_size, captioned = MEDIA_TYPES[min(position, len(MEDIA_TYPES) - 1)]
+        enc_sha256 = self.rng.randbytes(32)
+        media = (
+            media_type,
+            f"{media_type}_{timestamp:%Y%m%d_%H%M%S}{extension}",
+            f"https://mmg.whatsapp.net/v/t62.7118-24/{enc_sha256.hex()[:24]}.enc?ccb=11-4",
+            self.rng.randbytes(32),
+            self.rng.randbytes(32),
+            enc_sha256,
+            int(self.rng.lognormvariate(math.log(median_size), 0.9)),
+            captioned,
+        )
+        if len(self.media_files) < 10_000:
+            self.media_files.append(media)
+        return media
+
+    def conversation(self, day_start: datetime, limit: int) -> list:
+        """Rows of one burst of messages in a single chat"""
+        chat = self.pick_chat()
+        jid = self.chat_jids[chat]
+        is_group = jid.endswith("@g.us")
+        from_me_ratio = 0.15 if is_group else 0.45
+        length = min(limit, 1 + int(self.rng.expovariate(1 / (MEAN_CONVERSATION_LENGTH - 1))))
+
+        rows = []
+        timestamp = self.conversation_start(day_start)
+        for _ in range(length):
+            timestamp += timedelta(seconds=self.rng.expovariate(1 / MEAN_REPLY_SECONDS))
+            is_from_me = self.rng.random() < from_me_ratio
+            sender = OWN_NUMBER if is_from_me else self.rng.choice(self.members[chat])
+
+            if self.rng.random() < self.media_ratio:
+                media_type, filename, url, media_key, sha256, enc_sha256, length_bytes, captioned = self.media(timestamp)
+                content = self.text() if captioned and self.rng.random() < 0.3 else ""
+            else:
+                media_type = filename = url = media_key = sha256 = enc_sha256 = length_bytes = None
+                content = self.text()
+
+            rows.append((
+                message_id(self.index), jid, sender, content, timestamp, is_from_me,
+                media_type, filename, url, media_key, sha256, enc_sha256, length_bytes,
+            ))
+            self.index += 1
+        return rows
+
+
+def generate(db_path: str, contacts: int = 2000, groups: int = 100, messages: int = 1_000_000, seed: int = 42,
+             days: int = 365, chats: int = None, media_ratio: float = 0.08, growth: float = 1.0,
+             zipf_exponent: float = 1.1, progress: bool = False) -> dict:
+    """Create db_path and fill it with direct chats, group chats and their messages.
+
+    Returns the number of messages per media type ("text" for plain messages).
+    """
+    rng = random.Random(seed)
+    if os.path.exists(db_path):
+        os.unlink(db_path)
+    chats = contacts if chats is None else min(chats, contacts)
+
+    conn = sqlite3.connect(db_path)
+    # Nothing to recover if generation fails halfway
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executescript(BRIDGE_SCHEMA)
+
+    generator = HistoryGenerator(rng, contacts, chats, groups, media_ratio, zipf_exponent)
+    end = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    start = end - timedelta(days=days)
+    last_message_time = {}
+    counts = Counter()
+    started = time.perf_counter()
+
+    for day, day_count in enumerate(messages_per_day(messages, start, days, growth)):
+        day_start = start + timedelta(days=day)
+        rows = []
+        while len(rows) < day_count:
+            rows.extend(generator.conversation(day_start, day_count - len(rows)))
+        rows.sort(key=lambda row: row[4])
+
+        for row in rows:
+            jid, timestamp = row[1], row[4]
+            if jid not in last_message_time or timestamp > last_message_time[jid]:
+                last_message_time[jid] = timestamp
+            counts[row[6] or "text"] += 1
+        conn.executemany(
+            "INSERT INTO messages (id, chat_jid, sender, content, timestamp, is_from_me, media_type, filename, url,"
+            " media_key, file_sha256, file_enc_sha256, file_length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*row[:4], row[4].strftime(TIMESTAMP_FORMAT), *row[5:]) for row in rows],
+        )
+
+        if progress and (day + 1) % 30 == 0:
+            print(f"  {generator.index:,} messages after {day + 1} days ({time.perf_counter() - started:.0f} s)")
+
+    conn.executemany(
+        "INSERT INTO chats (jid, name, last_message_time) VALUES (?, ?, ?)",
+        [
+            (jid, name, last_message_time[jid].strftime(TIMESTAMP_FORMAT) if jid in last_message_time else None)
+            for jid, name in zip(generator.chat_jids, generator.chat_names)
+        ],
+    )
+    conn.commit()
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+    return dict(counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path")
+    parser.add_argument("--contacts", type=int, default=2000)
+    parser.add_argument("--chats", type=int, default=None, help="Direct chats, with the first contacts (default: every contact)")
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--media-ratio", type=float, default=0.08)
+    parser.add_argument("--growth", type=float, default=1.0, help="Extra traffic on the last day relative to the first")
+    parser.add_argument("--zipf-exponent", type=float, default=1.1, help="Skew of messages towards the most active chats")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.db_path, contacts=args.contacts, groups=args.groups, messages=args.messages, seed=args.seed,
+                      days=args.days, chats=args.chats, media_ratio=args.media_ratio, growth=args.growth,
+                      zipf_exponent=args.zipf_exponent, progress=True)
+    chats = (args.contacts if args.chats is None else min(args.chats, args.contacts)) + args.groups
+    print(f"Generated {args.messages} messages in {chats} chats at {args.db_path} in {time.perf_counter() - start:.0f} s")
+    print("  " + ", ".join(f"{kind}: {count:,}" for kind, count in sorted(counts.items())))
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA256 digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in progress wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class DiskCache:
+    """Content-addressed file cache with a size quota and LRU eviction.
+
+    Entries are stored as <key><suffix> in a single directory. The file's
+    modification time is refreshed on every hit, so eviction removes the
+    least recently used files first once the directory exceeds max_bytes.
+    Entries pinned with get(pin=True) are skipped by eviction until every
+    pin is released with unpin(), so a path handed to a caller stays
+    readable while it is in use.
+    """
+
+    PARTIAL_PREFIX = ".partial-"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pins: Dict[str, int] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._remove_partials()
+
+    def path_for(self, key: str, suffix: str = "") -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key: str, suffix: str = "", pin: bool = False) -> Optional[str]:
+        """Return the cached path for key, or None on a miss.
+
+        With pin=True the entry is also pinned; the caller must unpin() it.
+        """
+        path = self.path_for(key, suffix)
+        # Under the lock so eviction cannot remove the entry before it is pinned
+        with self._lock:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+            if pin:
+                self._pins[path] = self._pins.get(path, 0) + 1
+        return path
+
+    def unpin(self, path: str) -> None:
+        """Release a pin taken by get(pin=True)."""
+        with self._lock:
+            pins = self._pins.get(path, 0) - 1
+            if pins > 0:
+                self._pins[path] = pins
+            else:
+                self._pins.pop(path, None)
+
+    def put(self, key: str, suffix: str, produce: Callable[[str], None]) -> str:
+        """Create an entry by letting produce() write to a temporary path.
+
+        The temporary file is moved into place only if produce() succeeds,
+        so readers never observe partially written entries.
+        """
+        path = self.path_for(key, suffix)
+        # Keep the suffix so tools that pick a format by extension still work
+        partial = os.path.join(self.directory, f"{self.PARTIAL_PREFIX}{threading.get_ident()}-{key}{suffix}")
+        try:
+            produce(partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the cache fits its quota.
+
+        Args:
+            keep: Optional path that must survive eviction, e.g. the entry
+                  that was just created and is about to be used
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.is_file() or entry.name.startswith(self.PARTIAL_PREFIX):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep or path in self._pins:
+                    continue
+                try:
+                    os.unlink(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def _remove_partials(self) -> None:
+        """Delete temporary files left behind by an interrupted process."""
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(self.PARTIAL_PREFIX):
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
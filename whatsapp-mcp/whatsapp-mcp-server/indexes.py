@@ -0,0 +1,179 @@
+import os
+import sqlite3
+from typing import List, Tuple
+
+# Secondary indexes matching the access paths used by whatsapp.py. The bridge
+# only creates the (id, chat_jid) primary key, so every filter on chat_jid,
+# sender or timestamp would otherwise scan the whole messages table.
+INDEXES = [
+    ("idx_messages_chat_jid_timestamp", "messages", "(chat_jid, timestamp)"),
+    ("idx_messages_sender_timestamp", "messages", "(sender, timestamp)"),
+    ("idx_messages_timestamp", "messages", "(timestamp)"),
+    ("idx_chats_last_message_time", "chats", "(last_message_time)"),
+]
+
+# Representative tool queries whose plans must not fall back to a full scan.
+# Substring searches (LIKE '%...%') are left out on purpose: no b-tree index
+# can serve them, so they would always be reported. The same goes for the
+# unfiltered listings (list_messages() and list_chats() without a chat or
+# sender): they walk the timestamp index from the newest row until LIMIT,
+# which SQLite reports as a SCAN whatever index exists.
+CHECKED_QUERIES = [
+    ("list_messages(chat_jid)", """
+        SELECT messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, chats.jid, messages.id, messages.media_type
+        FROM messages
+        JOIN chats ON messages.chat_jid = chats.jid
+        WHERE messages.chat_jid = ?
+        ORDER BY messages.timestamp DESC
+        LIMIT 20 OFFSET 0
+    """, ("0@s.whatsapp.net",)),
+    ("list_messages(sender)", """
+        SELECT messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, chats.jid, messages.id, messages.media_type
+        FROM messages
+        JOIN chats ON messages.chat_jid = chats.jid
+        WHERE messages.sender = ?
+        ORDER BY messages.timestamp DESC
+        LIMIT 20 OFFSET 0
+    """, ("0",)),
+    ("get_message_context(before)", """
+        SELECT messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, chats.jid, messages.id, messages.media_type
+        FROM messages
+        JOIN chats ON messages.chat_jid = chats.jid
+        WHERE messages.chat_jid = ? AND messages.timestamp < ?
+        ORDER BY messages.timestamp DESC
+        LIMIT 5
+    """, ("0@s.whatsapp.net", "1970-01-01 00:00:00")),
+    ("get_chat", """
+        SELECT c.jid, c.name, c.last_message_time, m.content, m.sender, m.is_from_me
+        FROM chats c
+        LEFT JOIN messages m ON c.jid = m.chat_jid
+        AND c.last_message_time = m.timestamp
+        WHERE c.jid = ?
+    """, ("0@s.whatsapp.net",)),
+    ("get_contact_chats", """
+        SELECT c.jid, c.name, c.last_message_time, m.content, m.sender, m.is_from_me
+        FROM chats c
+        JOIN messages m ON m.rowid = (
+            SELECT rowid FROM messages WHERE chat_jid = c.jid ORDER BY timestamp DESC LIMIT 1
+        )
+        WHERE c.jid = ? OR c.jid IN (SELECT chat_jid FROM messages WHERE sender = ?)
+        ORDER BY c.last_message_time DESC
+        LIMIT 20 OFFSET 0
+    """, ("0@s.whatsapp.net", "0")),
+    ("get_last_interaction", """
+        SELECT * FROM (
+            SELECT m.timestamp, m.sender, c.name, m.content, m.is_from_me, c.jid, m.id, m.media_type
+            FROM messages m
+            JOIN chats c ON m.chat_jid = c.jid
+            WHERE m.sender = ?
+            ORDER BY m.timestamp DESC
+            LIMIT 1
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT m.timestamp, m.sender, c.name, m.content, m.is_from_me, c.jid, m.id, m.media_type
+            FROM messages m
+            JOIN chats c ON m.chat_jid = c.jid
+            WHERE m.chat_jid = ?
+            ORDER BY m.timestamp DESC
+            LIMIT 1
+        )
+        ORDER BY 1 DESC
+        LIMIT 1
+    """, ("0", "0@s.whatsapp.net")),
+]
+
+
+def ensure_indexes(db_path: str) -> List[str]:
+    """Create the secondary indexes on the bridge database if they are missing.
+
+    Args:
+        db_path: Path to the bridge's messages.db
+
+    Returns:
+        Names of the indexes that were created by this call
+    """
+    if not os.path.isfile(db_path):
+        print(f"Messages database not found at {db_path}, skipping index creation")
+        return []
+
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing = {row[0] for row in cursor.fetchall()}
+
+        created = []
+        for name, table, columns in INDEXES:
+            if name in existing:
+                continue
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}")
+            created.append(name)
+
+        if created:
+            cursor.execute("ANALYZE")
+        conn.commit()
+
+        for name in created:
+            print(f"Created index {name}")
+        return created
+
+    except sqlite3.Error as e:
+        print(f"Database error while creating indexes: {e}")
+        return []
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+
+def find_full_scans(db_path: str) -> List[Tuple[str, str]]:
+    """Run EXPLAIN QUERY PLAN over the tool queries and report full table scans.
+
+    Every SCAN step is reported, including "SCAN ... USING INDEX" and
+    "SCAN ... USING COVERING INDEX": both still read the whole index. Only
+    SEARCH steps, which look rows up by constrained columns, pass. A SCAN of
+    a subquery's result, e.g. "SCAN (subquery-1)", reads only the rows the
+    subquery produced, and the subquery's own steps are checked like any
+    other, so it is not reported.
+
+    Args:
+        db_path: Path to the bridge's messages.db
+
+    Returns:
+        List of (query name, plan detail) pairs for every full scan found
+    """
+    if not os.path.isfile(db_path):
+        return []
+
+    try:
+        conn = sqlite3.connect(db_path, timeout=30)
+        cursor = conn.cursor()
+
+        scans = []
+        for name, sql, params in CHECKED_QUERIES:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            for row in cursor.fetchall():
+                detail = row[-1]
+                if detail.startswith("SCAN ") and not detail.startswith("SCAN (subquery-"):
+                    scans.append((name, detail))
+        return scans
+
+    except sqlite3.Error as e:
+        print(f"Database error while checking query plans: {e}")
+        return []
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+
+def check_query_plans(db_path: str) -> bool:
+    """Log every tool query that still performs a full table scan.
+
+    Returns:
+        True if no full scans were found
+    """
+    scans = find_full_scans(db_path)
+    for name, detail in scans:
+        print(f"Query plan warning: {name} does a full scan ({detail})")
+    return not scans
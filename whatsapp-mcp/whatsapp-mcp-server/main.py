@@ -1,6 +1,9 @@
+import asyncio
+import os
 from typing import List, Dict, Any, Optional
 from dataclasses import asdict
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+import whatsapp
 from whatsapp import (
     search_contacts as whatsapp_search_contacts,
     list_messages as whatsapp_list_messages,
@@ -13,13 +16,24 @@ from whatsapp import (
     send_message as whatsapp_send_message,
     send_file as whatsapp_send_file,
     send_audio_message as whatsapp_audio_voice_message,
-    download_media as whatsapp_download_media
+    download_media as whatsapp_download_media,
+    get_messages_since as whatsapp_get_messages_since,
+    MESSAGES_DB_PATH
 )
+from indexes import ensure_indexes, check_query_plans
+from watcher import MessagesWatcher
+from tracing import setup_tracing, traced_tool
+
+WATCH_MESSAGES_DB = os.getenv('WATCH_MESSAGES_DB', 'true').lower() == 'true'
+
+# Connections that asked to be notified about new messages: (session, event loop)
+_new_message_subscribers = []
 
 # Initialize FastMCP server
 mcp = FastMCP("whatsapp")
 
 @mcp.tool()
+@traced_tool
 def search_contacts(query: str) -> List[Dict[str, Any]]:
     """Search WhatsApp contacts by name or phone number.
 
@@ -30,6 +44,7 @@ def search_contacts(query: str) -> List[Dict[str, Any]]:
     return [asdict(contact) for contact in contacts]
 
 @mcp.tool()
+@traced_tool
 def list_messages(
     after: Optional[str] = None,
     before: Optional[str] = None,
@@ -71,6 +86,7 @@ def list_messages(
     return messages
 
 @mcp.tool()
+@traced_tool
 def list_chats(
     query: Optional[str] = None,
     limit: int = 20,
@@ -97,6 +113,7 @@ def list_chats(
     return [asdict(chat) for chat in chats]
 
 @mcp.tool()
+@traced_tool
 def get_chat(chat_jid: str, include_last_message: bool = True) -> Optional[Dict[str, Any]]:
     """Get WhatsApp chat metadata by JID.
 
@@ -108,6 +125,7 @@ def get_chat(chat_jid: str, include_last_message: bool = True) -> Optional[Dict[
     return asdict(chat) if chat else None
 
 @mcp.tool()
+@traced_tool
 def get_direct_chat_by_contact(sender_phone_number: str) -> Optional[Dict[str, Any]]:
     """Get WhatsApp chat metadata by sender phone number.
 
@@ -118,6 +136,7 @@ def get_direct_chat_by_contact(sender_phone_number: str) -> Optional[Dict[str, A
     return asdict(chat) if chat else None
 
 @mcp.tool()
+@traced_tool
 def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Dict[str, Any]]:
     """Get all WhatsApp chats involving the contact.
 
@@ -130,6 +149,7 @@ def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Dict[str
     return [asdict(chat) for chat in chats]
 
 @mcp.tool()
+@traced_tool
 def get_last_interaction(jid: str) -> str:
     """Get most recent WhatsApp message involving the contact.
     
@@ -140,6 +160,7 @@ def get_last_interaction(jid: str) -> str:
     return message
 
 @mcp.tool()
+@traced_tool
 def get_message_context(
     message_id: str,
     before: int = 5,
@@ -156,6 +177,7 @@ def get_message_context(
     return asdict(context)
 
 @mcp.tool()
+@traced_tool
 def send_message(
     recipient: str,
     message: str
@@ -185,6 +207,7 @@ def send_message(
     }
 
 @mcp.tool()
+@traced_tool
 def send_file(recipient: str, media_path: str) -> Dict[str, Any]:
     """Send a file such as a picture, raw audio, video or document via WhatsApp to the specified recipient. For group messages use the JID.
     
@@ -205,6 +228,7 @@ def send_file(recipient: str, media_path: str) -> Dict[str, Any]:
     }
 
 @mcp.tool()
+@traced_tool
 def send_audio_message(recipient: str, media_path: str) -> Dict[str, Any]:
     """Send any audio file as a WhatsApp audio message to the specified recipient. For group messages use the JID. If it errors due to ffmpeg not being installed, use send_file instead.
     
@@ -223,6 +247,7 @@ def send_audio_message(recipient: str, media_path: str) -> Dict[str, Any]:
     }
 
 @mcp.tool()
+@traced_tool
 def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
     """Download media from a WhatsApp message and get the local file path.
     
@@ -247,6 +272,90 @@ def download_media(message_id: str, chat_jid: str) -> Dict[str, Any]:
             "message": "Failed to download media"
         }
 
+@mcp.tool()
+@traced_tool
+def get_new_messages(after_rowid: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """Get WhatsApp messages received or updated after a cursor, oldest first.
+
+    Args:
+        after_rowid: Cursor returned by the previous call (0 to start from the beginning)
+        limit: Maximum number of messages to return (default 100)
+
+    Returns:
+        A dictionary with the messages and the cursor to pass on the next call
+    """
+    messages, cursor = whatsapp_get_messages_since(after_rowid, limit)
+    return {
+        "messages": [asdict(message) for message in messages],
+        "cursor": cursor
+    }
+
+@mcp.tool()
+@traced_tool
+async def subscribe_new_messages(ctx: Context) -> Dict[str, Any]:
+    """Receive a notification on this connection whenever new WhatsApp messages arrive.
+
+    Returns:
+        A dictionary containing success status, a status message and the current cursor
+    """
+    if whatsapp.change_feed is None:
+        return {
+            "success": False,
+            "message": "Message watcher is not running"
+        }
+
+    # A client that subscribes again keeps a single subscription
+    if not any(session is ctx.session for session, _ in _new_message_subscribers):
+        _new_message_subscribers.append((ctx.session, asyncio.get_running_loop()))
+    return {
+        "success": True,
+        "message": "Subscribed to new messages",
+        "cursor": whatsapp.change_feed.last_message_rowid
+    }
+
+def notify_new_messages(messages) -> None:
+    """Push new messages to subscribed connections as MCP log notifications."""
+    data = {
+        "event": "new_messages",
+        "cursor": whatsapp.change_feed.last_message_rowid,
+        "messages": [
+            {**asdict(message), "timestamp": message.timestamp.isoformat()}
+            for message in messages
+        ]
+    }
+
+    for subscriber in list(_new_message_subscribers):
+        session, loop = subscriber
+        if loop.is_closed():
+            _new_message_subscribers.remove(subscriber)
+            continue
+
+        future = asyncio.run_coroutine_threadsafe(
+            session.send_log_message(level="info", data=data, logger="whatsapp.new_messages"),
+            loop
+        )
+
+        def drop_on_error(f, subscriber=subscriber):
+            # The client went away; stop notifying it
+            if f.exception() is not None and subscriber in _new_message_subscribers:
+                _new_message_subscribers.remove(subscriber)
+
+        future.add_done_callback(drop_on_error)
+
 if __name__ == "__main__":
+    # Make sure the bridge database has indexes for the tool queries
+    ensure_indexes(MESSAGES_DB_PATH)
+    check_query_plans(MESSAGES_DB_PATH)
+
+    # Follow bridge writes so reads hit in-process caches
+    if WATCH_MESSAGES_DB and os.path.isfile(MESSAGES_DB_PATH):
+        watcher = MessagesWatcher(MESSAGES_DB_PATH)
+        watcher.start()
+        watcher.add_listener(notify_new_messages)
+        whatsapp.change_feed = watcher
+
+    # Continue the backend's traces in the tool calls
+    setup_tracing()
+
     # Initialize and run the server
     mcp.run(transport='sse')
\ No newline at end of file
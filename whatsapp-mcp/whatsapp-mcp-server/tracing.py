@@ -0,0 +1,93 @@
+import functools
+import inspect
+import os
+from contextlib import contextmanager, nullcontext
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind
+except ImportError:  # tracing is optional for the server
+    trace = None
+
+from mcp.server.lowlevel.server import request_ctx
+
+# none, console, file (one JSON span per line in TRACING_FILE) or otlp
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'none').lower()
+TRACING_FILE = os.getenv('TRACING_FILE', 'whatsapp-mcp-traces.jsonl')
+
+tracer = trace.get_tracer("whatsapp-mcp-server") if trace else None
+
+
+def setup_tracing(service_name: str = "whatsapp-mcp-server") -> None:
+    """Install the span exporter chosen by TRACING_EXPORTER, if OpenTelemetry is installed."""
+    if TRACING_EXPORTER == 'none' or trace is None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if TRACING_EXPORTER == 'console':
+        exporter = ConsoleSpanExporter()
+    elif TRACING_EXPORTER == 'file':
+        exporter = ConsoleSpanExporter(
+            out=open(TRACING_FILE, 'a', encoding='utf-8'),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif TRACING_EXPORTER == 'otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {TRACING_EXPORTER}")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def span(name: str, **attributes):
+    """A span in the current trace, or a no-op without OpenTelemetry."""
+    if tracer is None:
+        return nullcontext()
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def _caller_context():
+    """Trace context sent by the MCP client in the tools/call request's _meta."""
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        return None
+    if meta is None or not meta.model_extra:
+        return None
+    return propagate.extract(meta.model_extra)
+
+
+@contextmanager
+def _tool_span(name: str):
+    with tracer.start_as_current_span(
+        f"mcp.tool {name}", context=_caller_context(), kind=SpanKind.SERVER, attributes={"mcp.tool": name}
+    ):
+        yield
+
+
+def traced_tool(func):
+    """Run an MCP tool in a span continuing the caller's trace.
+
+    Apply below @mcp.tool() so FastMCP still sees the tool's signature.
+    """
+    if tracer is None:
+        return func
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with _tool_span(func.__name__):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _tool_span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
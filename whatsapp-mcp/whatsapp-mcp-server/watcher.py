@@ -0,0 +1,381 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from whatsapp import Chat, Message
+
+# inotify event flags from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+
+class _DirectoryNotifier:
+    """Block until something in a directory changes.
+
+    Uses inotify through libc when available (Linux) and falls back to
+    comparing file stats of the watched files at a fixed interval.
+    """
+
+    def __init__(self, directory: str, files: List[str], poll_interval: float):
+        self.directory = directory
+        self.files = files
+        self.poll_interval = poll_interval
+        self._fd = None
+        self._signature = None
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+            if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            self._fd = fd
+        except (OSError, AttributeError, TypeError):
+            self._signature = self._stat_signature()
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds and return True if a change was seen."""
+        if self._fd is not None:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                return False
+            self._drain()
+            return True
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            signature = self._stat_signature()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        return False
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _drain(self) -> None:
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _stat_signature(self) -> Tuple:
+        signature = []
+        for path in self.files:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+
+class MessagesWatcher:
+    """Follow writes the bridge makes to messages.db and keep read caches current.
+
+    The bridge writes with INSERT OR REPLACE, so a new or replaced row
+    normally lands above every earlier rowid. The newest row can still change
+    without moving: an UPDATE keeps its rowid (the bridge fills in media
+    fields later), and once the newest row is deleted its rowid is handed
+    out again. The watcher remembers the highest rowid it has seen for chats
+    and messages and, whenever the database directory changes, reads the
+    rows from those high-water marks on. The message at the mark itself is
+    read again and reported only if it changed.
+
+    Caches maintained:
+        chat names by JID (used for sender names and contact search)
+        last message per chat (used by get_chat and list_chats)
+
+    Listeners registered with add_listener() are called from the watcher
+    thread with the list of new messages after each batch.
+    """
+
+    def __init__(self, db_path: str, poll_interval: float = 1.0, debounce: float = 0.05):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        self.last_chat_rowid = 0
+        self.last_message_rowid = 0
+        # Message row at last_message_rowid, to tell a rewrite in place from a re-read
+        self._last_message_row: Optional[Tuple] = None
+        self._chat_names: Dict[str, Optional[str]] = {}
+        self._chat_last_time: Dict[str, Optional[str]] = {}
+        self._names_by_phone: Dict[str, Optional[str]] = {}
+        self._last_messages: Dict[str, Message] = {}
+
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[Message]], None]] = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._notifier = None
+
+    def start(self) -> None:
+        """Load the current state and start following changes in the background."""
+        self._load_chats()
+        self._load_last_message_row()
+
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
+        files = [self.db_path, self.db_path + "-wal", self.db_path + "-journal"]
+        self._notifier = _DirectoryNotifier(db_dir, files, self.poll_interval)
+
+        self._thread = threading.Thread(target=self._run, name="messages-watcher", daemon=True)
+        self._thread.start()
+        mode = "inotify" if self._notifier.uses_inotify else "stat polling"
+        print(f"Watching {self.db_path} for new messages ({mode})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._notifier:
+            self._notifier.close()
+
+    def add_listener(self, listener: Callable[[List[Message]], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[List[Message]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_sender_name(self, sender_jid: str) -> Optional[str]:
+        """Return the cached chat name for a sender JID or phone number."""
+        with self._lock:
+            name = self._chat_names.get(sender_jid)
+            if name:
+                return name
+            phone_part = sender_jid.split('@')[0]
+            return self._names_by_phone.get(phone_part)
+
+    def search_contacts(self, query: str, limit: int = 50) -> List[Tuple[str, Optional[str]]]:
+        """Search cached direct chats by name or JID, like whatsapp.search_contacts."""
+        query = query.lower()
+        with self._lock:
+            matches = [
+                (jid, name) for jid, name in self._chat_names.items()
+                if not jid.endswith("@g.us") and (query in (name or "").lower() or query in jid.lower())
+            ]
+        # SQLite sorts NULL names first
+        matches.sort(key=lambda contact: (contact[1] is not None, contact[1] or "", contact[0]))
+        return matches[:limit]
+
+    def get_last_message(self, chat_jid: str) -> Optional[Message]:
+        """Return the cached last message of a chat, if the watcher has seen it."""
+        with self._lock:
+            return self._last_messages.get(chat_jid)
+
+    def get_chat(self, chat_jid: str, include_last_message: bool = True) -> Optional[Chat]:
+        """Return a chat from the caches, like whatsapp.get_chat."""
+        with self._lock:
+            if chat_jid not in self._chat_names:
+                return None
+            return self._chat(chat_jid, include_last_message)
+
+    def list_chats(
+        self,
+        query: Optional[str] = None,
+        limit: int = 20,
+        page: int = 0,
+        include_last_message: bool = True,
+        sort_by: str = "last_active"
+    ) -> List[Chat]:
+        """List chats from the caches, like whatsapp.list_chats."""
+        query = query.lower() if query else None
+        with self._lock:
+            jids = [
+                jid for jid, name in self._chat_names.items()
+                if query is None or query in (name or "").lower() or query in jid.lower()
+            ]
+            # Same order as SQLite: NULL sorts last in DESC and first in ASC
+            if sort_by == "last_active":
+                jids.sort(key=lambda jid: self._chat_last_time[jid] or "", reverse=True)
+            else:
+                jids.sort(key=lambda jid: (self._chat_names[jid] is not None, self._chat_names[jid] or ""))
+            offset = page * limit
+            return [self._chat(jid, include_last_message) for jid in jids[offset:offset + limit]]
+
+    def poll(self) -> List[Message]:
+        """Read rows written since the last poll and update the caches."""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT rowid, jid, name, last_message_time
+                FROM chats
+                WHERE rowid >= ?
+                ORDER BY rowid
+            """, (self.last_chat_rowid,))
+            chat_rows = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT messages.rowid, messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, messages.chat_jid, messages.id, messages.media_type
+                FROM messages
+                LEFT JOIN chats ON messages.chat_jid = chats.jid
+                WHERE messages.rowid >= ?
+                ORDER BY messages.rowid
+            """, (self.last_message_rowid,))
+            message_rows = cursor.fetchall()
+
+        except sqlite3.Error as e:
+            print(f"Database error while polling for changes: {e}")
+            return []
+        finally:
+            if 'conn' in locals():
+                conn.close()
+
+        new_messages = []
+        with self._lock:
+            for rowid, jid, name, last_message_time in chat_rows:
+                self._set_chat(jid, name, last_message_time)
+                self.last_chat_rowid = max(self.last_chat_rowid, rowid)
+
+            for row in message_rows:
+                if row[0] == self.last_message_rowid and self._message_row(row) == self._last_message_row:
+                    continue
+                message = Message(
+                    timestamp=datetime.fromisoformat(row[1]),
+                    sender=row[2],
+                    chat_name=row[3],
+                    content=row[4],
+                    is_from_me=row[5],
+                    chat_jid=row[6],
+                    id=row[7],
+                    media_type=row[8]
+                )
+                self._update_last_message(message, row[1])
+                self.last_message_rowid = row[0]
+                self._last_message_row = self._message_row(row)
+                new_messages.append(message)
+
+            listeners = list(self._listeners)
+
+        if new_messages:
+            for listener in listeners:
+                try:
+                    listener(new_messages)
+                except Exception as e:
+                    print(f"New message listener failed: {e}")
+
+        return new_messages
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self._notifier.wait(self.poll_interval):
+                continue
+            # Let the bridge finish a burst of writes before reading
+            time.sleep(self.debounce)
+            self.poll()
+
+    def _load_chats(self) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT chats.rowid, chats.jid, chats.name, chats.last_message_time, messages.timestamp, messages.sender, messages.content, messages.is_from_me, messages.id, messages.media_type
+                FROM chats
+                LEFT JOIN messages ON chats.jid = messages.chat_jid
+                AND chats.last_message_time = messages.timestamp
+                ORDER BY messages.rowid
+            """)
+            # With several messages at the last timestamp, the latest written one wins
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error while loading chats: {e}")
+            return
+        finally:
+            if 'conn' in locals():
+                conn.close()
+
+        with self._lock:
+            for rowid, jid, name, last_message_time, *last in rows:
+                self._set_chat(jid, name, last_message_time)
+                self.last_chat_rowid = max(self.last_chat_rowid, rowid)
+                if last[0] is not None:
+                    self._last_messages[jid] = Message(
+                        timestamp=datetime.fromisoformat(last[0]),
+                        sender=last[1],
+                        chat_name=name,
+                        content=last[2],
+                        is_from_me=last[3],
+                        chat_jid=jid,
+                        id=last[4],
+                        media_type=last[5]
+                    )
+
+    def _load_last_message_row(self) -> None:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            row = conn.execute("""
+                SELECT messages.rowid, messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, messages.chat_jid, messages.id, messages.media_type
+                FROM messages
+                LEFT JOIN chats ON messages.chat_jid = chats.jid
+                ORDER BY messages.rowid DESC
+                LIMIT 1
+            """).fetchone()
+        except sqlite3.Error as e:
+            print(f"Database error while reading messages high-water mark: {e}")
+            return
+        finally:
+            if 'conn' in locals():
+                conn.close()
+
+        if row is not None:
+            self.last_message_rowid = row[0]
+            self._last_message_row = self._message_row(row)
+
+    @staticmethod
+    def _message_row(row: Tuple) -> Tuple:
+        # The chat name comes from the join and changes with the chat, not the message
+        return row[:3] + row[4:]
+
+    def _chat(self, jid: str, include_last_message: bool) -> Chat:
+        last_message_time = self._chat_last_time.get(jid)
+        chat = Chat(
+            jid=jid,
+            name=self._chat_names.get(jid),
+            last_message_time=datetime.fromisoformat(last_message_time) if last_message_time else None
+        )
+        last = self._last_messages.get(jid) if include_last_message else None
+        if last is not None:
+            chat.last_message = last.content
+            chat.last_sender = last.sender
+            chat.last_is_from_me = last.is_from_me
+        return chat
+
+    def _set_chat(self, jid: str, name: Optional[str], last_message_time: Optional[str]) -> None:
+        self._chat_names[jid] = name
+        self._chat_last_time[jid] = last_message_time
+        if not jid.endswith("@g.us"):
+            self._names_by_phone[jid.split('@')[0]] = name
+
+    def _update_last_message(self, message: Message, raw_timestamp: str) -> None:
+        cached = self._last_messages.get(message.chat_jid)
+        if cached is not None:
+            if message.timestamp >= cached.timestamp:
+                self._last_messages[message.chat_jid] = message
+        elif raw_timestamp == self._chat_last_time.get(message.chat_jid):
+            # History sync can insert old messages, so only trust a message as
+            # the last one when it matches the chat's last_message_time
+            self._last_messages[message.chat_jid] = message
@@ -4,14 +4,27 @@ from dataclasses import dataclass
 from typing import Optional, List, Tuple
 import os
 import os.path
+import shutil
+from contextlib import ExitStack
 import requests
 import json
 import audio
+from cache import DiskCache, SingleFlight, file_sha256
+from tracing import span
 
 # Get configuration from environment variables with fallback to local paths
 MESSAGES_DB_PATH = os.getenv('MESSAGES_DB_PATH',
     os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'whatsapp-bridge', 'store', 'messages.db'))
 WHATSAPP_API_BASE_URL = os.getenv('WHATSAPP_BRIDGE_URL', 'http://localhost:8080') + '/api'
+MEDIA_CACHE_DIR = os.getenv('MEDIA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'whatsapp-bridge', 'store', 'media-cache'))
+MEDIA_CACHE_MAX_BYTES = int(os.getenv('MEDIA_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+_media_cache = None
+_media_downloads = SingleFlight()
+
+# Set by main.py to a running watcher.MessagesWatcher; serves reads from its caches
+change_feed = None
 
 @dataclass
 class Message:
@@ -51,6 +64,11 @@ class MessageContext:
     after: List[Message]
 
 def get_sender_name(sender_jid: str) -> str:
+    if change_feed is not None:
+        name = change_feed.get_sender_name(sender_jid)
+        if name:
+            return name
+
     try:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
         cursor = conn.cursor()
@@ -226,6 +244,55 @@ def list_messages(
             conn.close()
 
 
+def get_messages_since(after_rowid: int = 0, limit: int = 100) -> Tuple[List[Message], int]:
+    """Get messages written after a rowid high-water mark, oldest first.
+
+    The bridge writes with INSERT OR REPLACE, so new and replaced messages
+    normally get a rowid above every earlier one. A change to the message at
+    the cursor that keeps its rowid is not returned again; the watcher
+    behind subscribe_new_messages reports those too.
+
+    Returns:
+        The messages and the rowid to pass as after_rowid on the next call
+    """
+    try:
+        conn = sqlite3.connect(MESSAGES_DB_PATH)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT messages.rowid, messages.timestamp, messages.sender, chats.name, messages.content, messages.is_from_me, messages.chat_jid, messages.id, messages.media_type
+            FROM messages
+            LEFT JOIN chats ON messages.chat_jid = chats.jid
+            WHERE messages.rowid > ?
+            ORDER BY messages.rowid
+            LIMIT ?
+        """, (after_rowid, limit))
+
+        result = []
+        cursor_rowid = after_rowid
+        for msg in cursor.fetchall():
+            cursor_rowid = msg[0]
+            result.append(Message(
+                timestamp=datetime.fromisoformat(msg[1]),
+                sender=msg[2],
+                chat_name=msg[3],
+                content=msg[4],
+                is_from_me=msg[5],
+                chat_jid=msg[6],
+                id=msg[7],
+                media_type=msg[8]
+            ))
+
+        return result, cursor_rowid
+
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return [], after_rowid
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+
 def get_message_context(
     message_id: str,
     before: int = 5,
@@ -327,6 +394,9 @@ def list_chats(
     sort_by: str = "last_active"
 ) -> List[Chat]:
     """Get chats matching the specified criteria."""
+    if change_feed is not None:
+        return change_feed.list_chats(query, limit, page, include_last_message, sort_by)
+
     try:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
         cursor = conn.cursor()
@@ -395,6 +465,12 @@ def list_chats(
 
 def search_contacts(query: str) -> List[Contact]:
     """Search contacts by name or phone number."""
+    if change_feed is not None:
+        return [
+            Contact(phone_number=jid.split('@')[0], name=name, jid=jid)
+            for jid, name in change_feed.search_contacts(query)
+        ]
+
     try:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
         cursor = conn.cursor()
@@ -437,6 +513,11 @@ def search_contacts(query: str) -> List[Contact]:
 
 def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Chat]:
     """Get all chats involving the contact.
+
+    A chat matches when it is the contact's own chat or when the contact sent
+    at least one message in it. Matching is a semi-join on the sender index and
+    each chat's last message is looked up separately, so no per-message rows
+    are produced and each chat appears exactly once.
     
     Args:
         jid: The contact's JID to search for
@@ -448,7 +529,7 @@ def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Chat]:
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT DISTINCT
+            SELECT
                 c.jid,
                 c.name,
                 c.last_message_time,
@@ -456,8 +537,15 @@ def get_contact_chats(jid: str, limit: int = 20, page: int = 0) -> List[Chat]:
                 m.sender as last_sender,
                 m.is_from_me as last_is_from_me
             FROM chats c
-            JOIN messages m ON c.jid = m.chat_jid
-            WHERE m.sender = ? OR c.jid = ?
+            JOIN messages m ON m.rowid = (
+                SELECT rowid
+                FROM messages
+                WHERE chat_jid = c.jid
+                ORDER BY timestamp DESC
+                LIMIT 1
+            )
+            WHERE c.jid = ?
+                OR c.jid IN (SELECT chat_jid FROM messages WHERE sender = ?)
             ORDER BY c.last_message_time DESC
             LIMIT ? OFFSET ?
         """, (jid, jid, limit, page * limit))
@@ -492,20 +580,28 @@ def get_last_interaction(jid: str) -> str:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
         cursor = conn.cursor()
         
+        # The newest message sent by the contact and the newest one in its
+        # chat, each read from its own index; an OR over both columns would
+        # scan every chat
         cursor.execute("""
-            SELECT 
-                m.timestamp,
-                m.sender,
-                c.name,
-                m.content,
-                m.is_from_me,
-                c.jid,
-                m.id,
-                m.media_type
-            FROM messages m
-            JOIN chats c ON m.chat_jid = c.jid
-            WHERE m.sender = ? OR c.jid = ?
-            ORDER BY m.timestamp DESC
+            SELECT * FROM (
+                SELECT m.timestamp, m.sender, c.name, m.content, m.is_from_me, c.jid, m.id, m.media_type
+                FROM messages m
+                JOIN chats c ON m.chat_jid = c.jid
+                WHERE m.sender = ?
+                ORDER BY m.timestamp DESC
+                LIMIT 1
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT m.timestamp, m.sender, c.name, m.content, m.is_from_me, c.jid, m.id, m.media_type
+                FROM messages m
+                JOIN chats c ON m.chat_jid = c.jid
+                WHERE m.chat_jid = ?
+                ORDER BY m.timestamp DESC
+                LIMIT 1
+            )
+            ORDER BY 1 DESC
             LIMIT 1
         """, (jid, jid))
         
@@ -537,6 +633,9 @@ def get_last_interaction(jid: str) -> str:
 
 def get_chat(chat_jid: str, include_last_message: bool = True) -> Optional[Chat]:
     """Get chat metadata by JID."""
+    if change_feed is not None:
+        return change_feed.get_chat(chat_jid, include_last_message)
+
     try:
         conn = sqlite3.connect(MESSAGES_DB_PATH)
         cursor = conn.cursor()
@@ -625,6 +724,12 @@ def get_direct_chat_by_contact(sender_phone_number: str) -> Optional[Chat]:
         if 'conn' in locals():
             conn.close()
 
+def bridge_post(url: str, payload: dict) -> requests.Response:
+    """POST to the bridge API in a span of the current trace."""
+    path = url[len(WHATSAPP_API_BASE_URL):]
+    with span(f"bridge POST /api{path}", **{"http.method": "POST", "http.url": url}):
+        return requests.post(url, json=payload)
+
 def send_message(recipient: str, message: str) -> Tuple[bool, str]:
     try:
         # Validate input
@@ -637,7 +742,7 @@ def send_message(recipient: str, message: str) -> Tuple[bool, str]:
             "message": message,
         }
         
-        response = requests.post(url, json=payload)
+        response = bridge_post(url, payload)
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -671,7 +776,7 @@ def send_file(recipient: str, media_path: str) -> Tuple[bool, str]:
             "media_path": media_path
         }
         
-        response = requests.post(url, json=payload)
+        response = bridge_post(url, payload)
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -699,26 +804,28 @@ def send_audio_message(recipient: str, media_path: str) -> Tuple[bool, str]:
         if not os.path.isfile(media_path):
             return False, f"Media file not found: {media_path}"
 
-        if not media_path.endswith(".ogg"):
-            try:
-                media_path = audio.convert_to_opus_ogg_temp(media_path)
-            except Exception as e:
-                return False, f"Error converting file to opus ogg. You likely need to install ffmpeg: {str(e)}"
-        
-        url = f"{WHATSAPP_API_BASE_URL}/send"
-        payload = {
-            "recipient": recipient,
-            "media_path": media_path
-        }
-        
-        response = requests.post(url, json=payload)
-        
-        # Check if the request was successful
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("success", False), result.get("message", "Unknown response")
-        else:
-            return False, f"Error: HTTP {response.status_code} - {response.text}"
+        # A converted file stays pinned in the conversion cache until the bridge has read it
+        with ExitStack() as stack:
+            if not media_path.endswith(".ogg"):
+                try:
+                    media_path = stack.enter_context(audio.convert_to_opus_ogg_cached(media_path))
+                except Exception as e:
+                    return False, f"Error converting file to opus ogg. You likely need to install ffmpeg: {str(e)}"
+
+            url = f"{WHATSAPP_API_BASE_URL}/send"
+            payload = {
+                "recipient": recipient,
+                "media_path": media_path
+            }
+
+            response = bridge_post(url, payload)
+
+            # Check if the request was successful
+            if response.status_code == 200:
+                result = response.json()
+                return result.get("success", False), result.get("message", "Unknown response")
+            else:
+                return False, f"Error: HTTP {response.status_code} - {response.text}"
             
     except requests.RequestException as e:
         return False, f"Request error: {str(e)}"
@@ -727,8 +834,56 @@ def send_audio_message(recipient: str, media_path: str) -> Tuple[bool, str]:
     except Exception as e:
         return False, f"Unexpected error: {str(e)}"
 
+def get_media_cache() -> DiskCache:
+    """Return the media cache, creating its directory on first use."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = DiskCache(MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES)
+    return _media_cache
+
+
+def get_media_info(message_id: str, chat_jid: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Get the filename and hex file SHA256 the bridge stored for a media message."""
+    try:
+        conn = sqlite3.connect(MESSAGES_DB_PATH)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT filename, file_sha256
+            FROM messages
+            WHERE id = ? AND chat_jid = ?
+        """, (message_id, chat_jid))
+
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        filename, sha256 = row
+        return filename, sha256.hex() if sha256 else None
+
+    except sqlite3.Error as e:
+        print(f"Database error while getting media info: {e}")
+        return None
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hard link source to destination, copying when linking is not possible."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
 def download_media(message_id: str, chat_jid: str) -> Optional[str]:
     """Download media from a message and return the local file path.
+
+    Downloads are cached by the file SHA256 the bridge recorded for the
+    message, so repeated requests (or forwarded copies of the same file in
+    other messages) return the cached file without asking the bridge again.
+    Concurrent requests for the same media share a single bridge download.
     
     Args:
         message_id: The ID of the message containing the media
@@ -737,6 +892,43 @@ def download_media(message_id: str, chat_jid: str) -> Optional[str]:
     Returns:
         The local file path if download was successful, None otherwise
     """
+    media_info = get_media_info(message_id, chat_jid)
+    filename, sha256 = media_info if media_info else (None, None)
+
+    if not sha256:
+        return _media_downloads.do(f"{chat_jid}/{message_id}",
+                                   lambda: _download_media_from_bridge(message_id, chat_jid))
+
+    cache = get_media_cache()
+    suffix = os.path.splitext(filename or "")[1]
+
+    cached = cache.get(sha256, suffix)
+    if cached:
+        return cached
+
+    def download():
+        cached = cache.get(sha256, suffix)
+        if cached:
+            return cached
+
+        path = _download_media_from_bridge(message_id, chat_jid)
+        if not path:
+            return None
+
+        try:
+            if file_sha256(path) != sha256:
+                print(f"Downloaded media does not match stored SHA256, not caching: {path}")
+                return path
+            return cache.put(sha256, suffix, lambda destination: _link_or_copy(path, destination))
+        except OSError as e:
+            print(f"Failed to cache media {path}: {str(e)}")
+            return path
+
+    return _media_downloads.do(sha256, download)
+
+
+def _download_media_from_bridge(message_id: str, chat_jid: str) -> Optional[str]:
+    """Ask the bridge to download and decrypt media, returning its local path."""
     try:
         url = f"{WHATSAPP_API_BASE_URL}/download"
         payload = {
@@ -744,7 +936,7 @@ def download_media(message_id: str, chat_jid: str) -> Optional[str]:
             "chat_jid": chat_jid
         }
         
-        response = requests.post(url, json=payload)
+        response = bridge_post(url, payload)
         
         if response.status_code == 200:
             result = response.json()